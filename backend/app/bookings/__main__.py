@@ -0,0 +1,42 @@
+"""Maintain the monthly partitions of bookings now, without the job queue.
+
+    python -m app.bookings list
+    python -m app.bookings ensure                        # like the daily job, minus archiving
+    python -m app.bookings archive --before 2025-01-01   # detach into bookings_archive
+    python -m app.bookings archive --before 2025-01-01 --drop
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.bookings.partitions import archive_partitions, ensure_partitions, list_partitions
+from app.database import async_session_maker, engine
+
+
+async def main(args) -> None:
+    async with async_session_maker() as db:
+        if args.command == "list":
+            for name, lower, upper in await list_partitions(db):
+                print(f"{name:24} {lower or 'DEFAULT'} .. {upper or ''}")
+        elif args.command == "ensure":
+            created = await ensure_partitions(db, date.today())
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+        else:
+            archived = await archive_partitions(db, args.before, drop=args.drop)
+            print(f"{'Dropped' if args.drop else 'Archived'} {len(archived)} partitions: {', '.join(archived) or '-'}")
+    await engine.dispose()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="partitions and their booking_date ranges")
+    commands.add_parser("ensure", help="create missing months, splitting rows out of the default partition")
+    archive = commands.add_parser("archive", help="detach the months ending on or before a date")
+    archive.add_argument("--before", type=date.fromisoformat, required=True, metavar="YYYY-MM-DD")
+    archive.add_argument("--drop", action="store_true", help="drop the detached tables instead of keeping them")
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
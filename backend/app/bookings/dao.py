@@ -1,9 +1,20 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, lambda_stmt, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
-from app.bookings.models import Bookings
-from app.bookings.schemas import BookingCreate, BookingResponse
+from app.bookings.models import BookingCapacity, Bookings, ConfirmedHire
+from app.bookings.periods import (
+    booking_date_bounds, booking_period, day_start, days_covered, days_period, overlaps, series_dates, venue_time
+)
+from app.bookings.schemas import (
+    BookingCreate, BookingMode, BookingResponse, BookingSeriesCreate, BookingSeriesOutcome, BookingSeriesResponse
+)
+from app.notifications.dao import NotificationDAO
+from app.popularity.tasks import queue_refresh
+from app.realtime.broker import publish_booking_event, publish_booking_events
 from app.restaurants.models import Restaurant
 from app.users.models import Users
 from datetime import timedelta, date
@@ -11,6 +22,117 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+class BookingCapacityDAO:
+    """Per-day guest counters of shared venues (booking_capacity)."""
+
+    @staticmethod
+    async def first_full_day(
+        db: AsyncSession,
+        restaurant_id: int,
+        days: List[date],
+        guests: int,
+        capacity: Optional[int]
+    ) -> Optional[date]:
+        """The first of `days` without room for `guests` more, None if all have room."""
+        if guests > (capacity or 0):
+            return days[0]
+        result = await db.execute(
+            select(BookingCapacity.day).filter(
+                BookingCapacity.restaurant_id == restaurant_id,
+                BookingCapacity.day.in_(days),
+                BookingCapacity.booked + guests > capacity
+            ).order_by(BookingCapacity.day).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def reserve(
+        db: AsyncSession,
+        restaurant_id: int,
+        days: List[date],
+        guests: int,
+        capacity: Optional[int]
+    ) -> Optional[date]:
+        """Add `guests` to every day, each only if it stays within capacity.
+
+        Returns the first day that had no room; days before it were already
+        incremented, so the caller rolls back. Days go in date order so two
+        multi-day reservations lock rows in the same order.
+        """
+        days = sorted(days)
+        await db.execute(
+            insert(BookingCapacity)
+            .values([{"restaurant_id": restaurant_id, "day": day} for day in days])
+            .on_conflict_do_nothing()
+        )
+        for day in days:
+            result = await db.execute(
+                update(BookingCapacity)
+                .where(
+                    BookingCapacity.restaurant_id == restaurant_id,
+                    BookingCapacity.day == day,
+                    BookingCapacity.booked + guests <= capacity
+                )
+                .values(booked=BookingCapacity.booked + guests)
+                .returning(BookingCapacity.booked)
+            )
+            if result.first() is None:
+                return day
+        return None
+
+    @staticmethod
+    async def release(db: AsyncSession, restaurant_id: int, days: Iterable[date], guests: int) -> None:
+        await db.execute(
+            update(BookingCapacity)
+            .where(BookingCapacity.restaurant_id == restaurant_id, BookingCapacity.day.in_(list(days)))
+            .values(booked=BookingCapacity.booked - guests)
+        )
+
+    @staticmethod
+    async def full_days(
+        db: AsyncSession,
+        restaurant_id: int,
+        start_date: date,
+        end_date: date,
+        capacity: Optional[int]
+    ) -> List[date]:
+        result = await db.execute(
+            select(BookingCapacity.day).filter(
+                BookingCapacity.restaurant_id == restaurant_id,
+                BookingCapacity.day.between(start_date, end_date),
+                BookingCapacity.booked >= (capacity or 0)
+            )
+        )
+        return list(result.scalars())
+
+
+class ConfirmedHireDAO:
+    """Periods of confirmed venue hires (confirmed_hires), kept in step with the bookings' status."""
+
+    @staticmethod
+    async def hire(db: AsyncSession, booking: Bookings) -> bool:
+        """Record the booking's period; False if it overlaps another confirmed hire of the venue.
+
+        confirmed_hires_no_overlap decides, atomically with any concurrent confirmation
+        (which it waits for). On False the transaction is aborted; the caller rolls back.
+        """
+        try:
+            await db.execute(insert(ConfirmedHire).values(
+                booking_id=booking.id, restaurant_id=booking.restaurant_id,
+                starts_at=booking.starts_at, ends_at=booking.ends_at
+            ))
+        except IntegrityError as e:
+            if "confirmed_hires_no_overlap" in str(e.orig):
+                return False
+            raise
+        return True
+
+    @staticmethod
+    async def release(db: AsyncSession, booking_id: int) -> None:
+        await db.execute(delete(ConfirmedHire).where(ConfirmedHire.booking_id == booking_id))
+
+
 class BookingDAO:
     @staticmethod
     async def create_booking(
@@ -23,21 +145,49 @@ class BookingDAO:
         if not restaurant:
             raise HTTPException(status_code=404, detail="Restaurant not found")
 
-        # Check if the restaurant is already booked and confirmed for this date
-        existing_booking = await db.execute(
-            select(Bookings).filter(
-                Bookings.restaurant_id == booking_data.restaurant_id,
-                Bookings.booking_date == booking_data.booking_date,
-                Bookings.status == "confirmed"
+        try:
+            starts_at, ends_at = booking_period(booking_data.booking_date, booking_data.slot, booking_data.end_date)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        guests = booking_data.number_of_guests
+        if restaurant.capacity is not None and guests > restaurant.capacity:
+            raise HTTPException(status_code=400, detail=f"The restaurant seats at most {restaurant.capacity} guests")
+
+        shared = restaurant.booking_mode == BookingMode.SHARED
+        if shared:
+            # Counted against the day's remaining seats; confirming reserves them for real
+            if guests < 1:
+                raise HTTPException(status_code=400, detail="number_of_guests must be at least 1")
+            full_day = await BookingCapacityDAO.first_full_day(
+                db, restaurant.id, days_covered(starts_at, ends_at), guests, restaurant.capacity
             )
-        )
-        if existing_booking.scalar_one_or_none():
-            raise HTTPException(status_code=400, detail="Restaurant already booked for this date")
+            if full_day is not None:
+                raise HTTPException(status_code=400, detail=f"Not enough capacity left on {full_day}")
+        else:
+            # Check if a confirmed booking already overlaps the requested time
+            covered = days_covered(starts_at, ends_at)
+            first_day, last_day = booking_date_bounds(covered[0], covered[-1])
+            existing_booking = await db.execute(
+                select(Bookings.id).filter(
+                    Bookings.restaurant_id == booking_data.restaurant_id,
+                    Bookings.booking_date.between(first_day, last_day),
+                    Bookings.status == "confirmed",
+                    ~Bookings.shared,
+                    overlaps(Bookings.starts_at, Bookings.ends_at, starts_at, ends_at)
+                ).limit(1)
+            )
+            if existing_booking.first():
+                raise HTTPException(status_code=400, detail="Restaurant already booked for this date")
 
         booking = Bookings(
             user_id=user_id,
             restaurant_id=booking_data.restaurant_id,
             booking_date=booking_data.booking_date,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            slot=booking_data.slot,
+            shared=shared,
             booking_username = booking_data.booking_username,
             email = booking_data.email,
             phone_number = booking_data.phone_number,
@@ -47,6 +197,9 @@ class BookingDAO:
             status="pending"
         )
         db.add(booking)
+        await db.flush()
+        NotificationDAO.queue_booking_notifications(db, booking, restaurant, "booking.created")
+        await publish_booking_event(db, booking, "booking.created")
         await db.commit()
         await db.refresh(booking)
 
@@ -56,6 +209,10 @@ class BookingDAO:
             restaurant_id=booking.restaurant_id,
             booking_date=booking.booking_date,
             status=booking.status,
+            slot=booking.slot,
+            shared=booking.shared,
+            starts_at=booking.starts_at,
+            ends_at=booking.ends_at,
             booking_username=booking.booking_username,
             email=booking.email,
             phone_number=booking.phone_number,
@@ -64,6 +221,114 @@ class BookingDAO:
             additional_information=booking.additional_information
         )
     
+    @staticmethod
+    async def create_series(
+        db: AsyncSession,
+        user_id: int,
+        series: BookingSeriesCreate
+    ) -> BookingSeriesResponse:
+        """Create pending bookings for a series of dates in one transaction.
+
+        Conflicts for every date come from one query (the confirmed bookings
+        overlapping the series' span, or the day counters of a shared venue)
+        and the bookings go in as one multi-row INSERT. With all_or_nothing a
+        single conflict creates nothing and answers 409 with the outcomes.
+        """
+        restaurant = await db.get(Restaurant, series.restaurant_id)
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+
+        try:
+            dates = series_dates(series.dates, series.start_date, series.recurrence)
+            periods = {day: booking_period(day, series.slot) for day in dates}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        guests = series.number_of_guests
+        if restaurant.capacity is not None and guests > restaurant.capacity:
+            raise HTTPException(status_code=400, detail=f"The restaurant seats at most {restaurant.capacity} guests")
+
+        shared = restaurant.booking_mode == BookingMode.SHARED
+        if shared:
+            if guests < 1:
+                raise HTTPException(status_code=400, detail="number_of_guests must be at least 1")
+            covered = {day: days_covered(*period) for day, period in periods.items()}
+            counters = await db.execute(
+                select(BookingCapacity.day, BookingCapacity.booked).filter(
+                    BookingCapacity.restaurant_id == restaurant.id,
+                    BookingCapacity.day.in_({d for days in covered.values() for d in days})
+                )
+            )
+            booked = dict(counters.all())
+            unavailable = {
+                day: "full" for day, days in covered.items()
+                if any(booked.get(d, 0) + guests > (restaurant.capacity or 0) for d in days)
+            }
+        else:
+            first_start, last_end = periods[dates[0]][0], periods[dates[-1]][1]
+            first_day, last_day = booking_date_bounds(dates[0], dates[-1] + timedelta(days=1))
+            existing = (await db.execute(
+                select(Bookings.starts_at, Bookings.ends_at).filter(
+                    Bookings.restaurant_id == restaurant.id,
+                    Bookings.booking_date.between(first_day, last_day),
+                    Bookings.status == "confirmed",
+                    ~Bookings.shared,
+                    overlaps(Bookings.starts_at, Bookings.ends_at, first_start, last_end)
+                )
+            )).all()
+            taken = [(venue_time(row.starts_at), venue_time(row.ends_at)) for row in existing]
+            unavailable = {
+                day: "conflict" for day, (starts_at, ends_at) in periods.items()
+                if any(taken_start < ends_at and taken_end > starts_at for taken_start, taken_end in taken)
+            }
+
+        if unavailable and series.all_or_nothing:
+            outcomes = [
+                BookingSeriesOutcome(booking_date=day, status=unavailable.get(day, "skipped")) for day in dates
+            ]
+            raise HTTPException(status_code=409, detail={
+                "message": "Some dates are not available, nothing was booked",
+                "outcomes": [outcome.model_dump(mode="json") for outcome in outcomes]
+            })
+
+        rows = [
+            {
+                "user_id": user_id,
+                "restaurant_id": restaurant.id,
+                "booking_date": day,
+                "starts_at": periods[day][0],
+                "ends_at": periods[day][1],
+                "slot": series.slot,
+                "shared": shared,
+                "booking_username": series.booking_username,
+                "email": series.email,
+                "phone_number": series.phone_number,
+                "event_type": series.event_type,
+                "number_of_guests": guests,
+                "additional_information": series.additional_information,
+                "status": "pending",
+            }
+            for day in dates if day not in unavailable
+        ]
+        created = {}
+        if rows:
+            # ORM bulk insert: one INSERT ... VALUES (...), (...) RETURNING for the whole series
+            result = await db.scalars(insert(Bookings).returning(Bookings), rows)
+            created = {booking.booking_date: booking for booking in result.all()}
+            for booking in created.values():
+                NotificationDAO.queue_booking_notifications(db, booking, restaurant, "booking.created")
+            await publish_booking_events(db, created.values(), "booking.created")
+            await db.commit()
+
+        return BookingSeriesResponse(
+            created=len(created),
+            outcomes=[
+                BookingSeriesOutcome(booking_date=day, status="created", booking_id=created[day].id)
+                if day in created else BookingSeriesOutcome(booking_date=day, status=unavailable[day])
+                for day in dates
+            ]
+        )
+
     @staticmethod
     async def get_bookings_by_restaurant(
         db: AsyncSession,
@@ -94,7 +359,11 @@ class BookingDAO:
                 additional_information = booking.additional_information,
                 restaurant_id=booking.restaurant_id,
                 booking_date=booking.booking_date,
-                status=booking.status
+                status=booking.status,
+                slot=booking.slot,
+                shared=booking.shared,
+                starts_at=booking.starts_at,
+                ends_at=booking.ends_at
             ) for booking in bookings
         ] if bookings else []
     
@@ -127,11 +396,30 @@ class BookingDAO:
                 additional_information = booking.additional_information,
                 restaurant_id=booking.restaurant_id,
                 booking_date=booking.booking_date,
-                status=booking.status
+                status=booking.status,
+                slot=booking.slot,
+                shared=booking.shared,
+                starts_at=booking.starts_at,
+                ends_at=booking.ends_at
             ) for booking in bookings
         ] if bookings else []
 
 
+    @staticmethod
+    async def lock_booking(db: AsyncSession, booking_id: int) -> Optional[Bookings]:
+        """The booking, row-locked until commit and re-read even if the session already holds it.
+
+        Confirm and reject decide from the current status whether to reserve or
+        release capacity; concurrent ones wait here and then see each other's result.
+        """
+        result = await db.execute(
+            select(Bookings)
+            .where(Bookings.id == booking_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def confirm_booking(
         db: AsyncSession,
@@ -139,23 +427,29 @@ class BookingDAO:
         admin_id: int
     ) -> BookingResponse:
         """Confirm a booking (admin only)"""
-        booking = await db.get(Bookings, booking_id)
+        booking = await BookingDAO.lock_booking(db, booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
 
-        # Check if already confirmed for this date by another booking
-        existing_confirmed = await db.execute(
-            select(Bookings).filter(
-                Bookings.restaurant_id == booking.restaurant_id,
-                Bookings.booking_date == booking.booking_date,
-                Bookings.status == "confirmed",
-                Bookings.id != booking_id
-            )
-        )
-        if existing_confirmed.scalar_one_or_none():
-            raise HTTPException(status_code=400, detail="Restaurant already confirmed for this date")
+        restaurant = await db.get(Restaurant, booking.restaurant_id)
+        if booking.shared:
+            if booking.status != "confirmed":
+                full_day = await BookingCapacityDAO.reserve(
+                    db, booking.restaurant_id, days_covered(booking.starts_at, booking.ends_at),
+                    booking.number_of_guests, restaurant.capacity
+                )
+                if full_day is not None:
+                    await db.rollback()
+                    raise HTTPException(status_code=400, detail=f"Not enough capacity left on {full_day}")
+        elif booking.status != "confirmed":
+            if not await ConfirmedHireDAO.hire(db, booking):
+                await db.rollback()
+                raise HTTPException(status_code=400, detail="Restaurant already confirmed for this date")
 
         booking.status = "confirmed"
+        NotificationDAO.queue_booking_notifications(db, booking, restaurant, "booking.confirmed")
+        await publish_booking_event(db, booking, "booking.confirmed")
+        await queue_refresh(db, booking.restaurant_id)
         await db.commit()
         await db.refresh(booking)
 
@@ -165,6 +459,10 @@ class BookingDAO:
             restaurant_id=booking.restaurant_id,
             booking_date=booking.booking_date,
             status=booking.status,
+            slot=booking.slot,
+            shared=booking.shared,
+            starts_at=booking.starts_at,
+            ends_at=booking.ends_at,
             booking_username=booking.booking_username,
             email=booking.email,
             phone_number=booking.phone_number,
@@ -180,11 +478,22 @@ class BookingDAO:
         admin_id: int
     ) -> BookingResponse:
         """Reject a booking (admin only)"""
-        booking = await db.get(Bookings, booking_id)
+        booking = await BookingDAO.lock_booking(db, booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
 
+        was_confirmed = booking.status == "confirmed"
         booking.status = "rejected"
+        if was_confirmed and booking.shared:
+            await BookingCapacityDAO.release(
+                db, booking.restaurant_id, days_covered(booking.starts_at, booking.ends_at), booking.number_of_guests
+            )
+        elif was_confirmed:
+            await ConfirmedHireDAO.release(db, booking.id)
+        NotificationDAO.queue_booking_notifications(db, booking, await db.get(Restaurant, booking.restaurant_id), "booking.rejected")
+        await publish_booking_event(db, booking, "booking.rejected")
+        if was_confirmed:
+            await queue_refresh(db, booking.restaurant_id)
         await db.commit()
         await db.refresh(booking)
 
@@ -194,6 +503,10 @@ class BookingDAO:
             restaurant_id=booking.restaurant_id,
             booking_date=booking.booking_date,
             status=booking.status,
+            slot=booking.slot,
+            shared=booking.shared,
+            starts_at=booking.starts_at,
+            ends_at=booking.ends_at,
             booking_username=booking.booking_username,
             email=booking.email,
             phone_number=booking.phone_number,
@@ -214,14 +527,25 @@ class BookingDAO:
         if not restaurant:
             raise HTTPException(status_code=404, detail="Restaurant not found")
 
-        booked_dates = await db.execute(
-            select(Bookings.booking_date).filter(
-                Bookings.restaurant_id == restaurant_id,
-                Bookings.booking_date.between(start_date, end_date),
-                Bookings.status == "confirmed"
-            )
-        )
-        booked_dates = {row.booking_date for row in booked_dates}
+        if restaurant.booking_mode == BookingMode.SHARED:
+            # A shared venue is free until its day's counter reaches capacity
+            booked_dates = set(await BookingCapacityDAO.full_days(
+                db, restaurant_id, start_date, end_date, restaurant.capacity
+            ))
+        else:
+            window_start, window_end = days_period(start_date, end_date)
+            first_day, last_day = booking_date_bounds(start_date, end_date)
+            booked = await db.execute(lambda_stmt(
+                lambda: select(Bookings.starts_at, Bookings.ends_at).filter(
+                    Bookings.restaurant_id == restaurant_id,
+                    Bookings.booking_date.between(first_day, last_day),
+                    Bookings.status == "confirmed",
+                    ~Bookings.shared,
+                    overlaps(Bookings.starts_at, Bookings.ends_at, window_start, window_end)
+                )
+            ))
+            # A day with any confirmed booking (even one slot) is not offered as free
+            booked_dates = {day for row in booked for day in days_covered(row.starts_at, row.ends_at)}
 
         all_dates = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
         free_dates = [d for d in all_dates if d not in booked_dates]
@@ -233,13 +557,21 @@ class BookingDAO:
         db: AsyncSession,
         booking_date: date
     ) -> list[int]:
-        """Get IDs of restaurants already reserved (confirmed) on a specific date"""
-        booked = await db.execute(
-            select(Bookings.restaurant_id).filter(
-                Bookings.booking_date == booking_date,
-                Bookings.status == "confirmed"
+        """Get IDs of restaurants already reserved (confirmed) on a specific date, or full if shared"""
+        day_starts, day_ends = days_period(booking_date, booking_date)
+        first_day, last_day = booking_date_bounds(booking_date, booking_date)
+        booked = await db.execute(lambda_stmt(
+            lambda: select(Bookings.restaurant_id).filter(
+                Bookings.booking_date.between(first_day, last_day),
+                Bookings.status == "confirmed",
+                ~Bookings.shared,
+                overlaps(Bookings.starts_at, Bookings.ends_at, day_starts, day_ends)
+            ).union(
+                select(BookingCapacity.restaurant_id)
+                .join(Restaurant, Restaurant.id == BookingCapacity.restaurant_id)
+                .filter(BookingCapacity.day == booking_date, BookingCapacity.booked >= Restaurant.capacity)
             )
-        )
+        ))
         return [row.restaurant_id for row in booked]
     
     @staticmethod
@@ -254,20 +586,27 @@ class BookingDAO:
         if not restaurant:
             raise HTTPException(status_code=404, detail="Restaurant not found")
 
-        query = select(Bookings.booking_date).filter(
+        query = select(Bookings.starts_at, Bookings.ends_at).filter(
             Bookings.restaurant_id == restaurant_id,
             Bookings.status.in_(["pending", "confirmed"])
         )
 
-        # Apply date range filtering if provided
-        if start_date and end_date:
-            query = query.filter(Bookings.booking_date.between(start_date, end_date))
-        elif start_date:
-            query = query.filter(Bookings.booking_date >= start_date)
-        elif end_date:
-            query = query.filter(Bookings.booking_date <= end_date)
+        # Apply date range filtering if provided; the booking_date bounds prune partitions
+        if start_date:
+            query = query.filter(
+                Bookings.ends_at > day_start(start_date),
+                Bookings.booking_date >= booking_date_bounds(start_date, start_date)[0]
+            )
+        if end_date:
+            query = query.filter(
+                Bookings.starts_at < day_start(end_date + timedelta(days=1)),
+                Bookings.booking_date <= end_date
+            )
 
         result = await db.execute(query)
-        booked_dates = {row.booking_date for row in result}
+        booked_dates = {
+            day for row in result for day in days_covered(row.starts_at, row.ends_at)
+            if (not start_date or day >= start_date) and (not end_date or day <= end_date)
+        }
 
         return sorted(list(booked_dates))
\ No newline at end of file
@@ -1,13 +1,21 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Enum, String
+from sqlalchemy import DDL, Boolean, CheckConstraint, Column, Integer, ForeignKey, Date, Enum, Index, String, TIMESTAMP, event, false, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Bookings(Base):
     __tablename__ = "bookings"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
-    booking_date = Column(Date, nullable=False)  # Date of the booking
+    # Date of the booking (its first day for multi-day events); the monthly partition key, so part of the primary key
+    booking_date = Column(Date, primary_key=True)
+    # What is reserved: [starts_at, ends_at), a slot or whole days in VENUE_TIMEZONE (app/bookings/periods.py)
+    starts_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    ends_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    slot = Column(String, nullable=False, server_default="day")  # "day" or a BOOKING_SLOTS name
+    # Taken at a "shared" venue: counted against capacity in booking_capacity instead of hiring the venue
+    shared = Column(Boolean, nullable=False, server_default=false())
     status = Column(String, default="pending")  # e.g., "confirmed", "cancelled"
     booking_username = Column(String, nullable=False, server_default="")  
     email = Column(String, nullable=False, server_default="")
@@ -19,4 +27,83 @@ class Bookings(Base):
     
     user = relationship("Users", back_populates="bookings")
    
-    restaurant = relationship("Restaurant", back_populates="bookings")
\ No newline at end of file
+    restaurant = relationship("Restaurant", back_populates="bookings")
+
+    __table_args__ = (
+        # Per-restaurant availability: free days, booked dates, conflict checks
+        Index("ix_bookings_restaurant_date_status", "restaurant_id", "booking_date", "status"),
+        # Restaurants reserved on a day, answered from the index alone
+        Index(
+            "ix_bookings_confirmed_date", "booking_date",
+            postgresql_include=["restaurant_id"],
+            postgresql_where=text("status = 'confirmed'")
+        ),
+        CheckConstraint("ends_at > starts_at", name="ck_bookings_period"),
+        # Availability lookups of confirmed venue hires (the overlaps() predicate). A partitioned
+        # table can't have the exclusion constraint this used to back; ConfirmedHire carries it.
+        Index(
+            "ix_bookings_confirmed_period", restaurant_id, func.tstzrange(starts_at, ends_at),
+            postgresql_using="gist",
+            postgresql_where=text("status = 'confirmed' AND NOT shared")
+        ),
+        # Monthly range partitions (app/bookings/partitions.py), so old months can be detached
+        {"postgresql_partition_by": "RANGE (booking_date)"},
+    )
+
+    # Rows are still identified by id alone (unique only by the sequence: the primary key is (id, booking_date))
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class BookingCapacity(Base):
+    """Guests of confirmed shared bookings per venue and day.
+
+    Reserving is a single conditional UPDATE (booked + n <= capacity) on this
+    row, so concurrent confirmations queue on one row lock instead of summing
+    bookings, and the check cannot be raced.
+    """
+    __tablename__ = "booking_capacity"
+
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)  # Venue-local day (VENUE_TIMEZONE)
+    booked = Column(Integer, nullable=False, server_default="0")
+
+    __table_args__ = (
+        CheckConstraint("booked >= 0", name="ck_booking_capacity_booked"),
+        # Venues full on a day, for the reserved-restaurants lookup
+        Index("ix_booking_capacity_day", "day", "restaurant_id"),
+    )
+
+
+class ConfirmedHire(Base):
+    """The period of every confirmed venue hire (a booking that isn't shared).
+
+    bookings is partitioned by month, so an exclusion constraint there would only
+    see one month at a time; this table isn't, and confirmed_hires_no_overlap lets
+    the database refuse overlapping hires of a venue, concurrent or not, whoever
+    writes them. A row is added in the transaction that confirms the booking and
+    removed in the one that rejects it.
+    """
+    __tablename__ = "confirmed_hires"
+
+    booking_id = Column(Integer, primary_key=True, autoincrement=False)  # bookings.id; no foreign key, months get detached
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False)
+    starts_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    ends_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    __table_args__ = (
+        ExcludeConstraint(
+            (restaurant_id, "="),
+            (func.tstzrange(starts_at, ends_at), "&&"),
+            name="confirmed_hires_no_overlap",
+            using="gist"
+        ),
+    )
+
+
+# create_all needs btree_gist for the integer columns in the GiST index and constraint, and a
+# partition to insert into: everything lands in the default one until ensure_partitions() splits off months
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+event.listen(
+    Bookings.__table__, "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS bookings_default PARTITION OF bookings DEFAULT")
+)
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""Monthly partitions of bookings (RANGE on booking_date).
+
+Months are named bookings_YYYY_MM; bookings_default takes any date no month
+exists for yet. ensure_partitions() creates the months from the oldest row in
+the default partition up to BOOKINGS_PARTITION_MONTHS_AHEAD, moving that
+month's rows out of the default partition first (ATTACH refuses otherwise).
+archive_partitions() detaches months that ended before a cutoff and moves them
+to the bookings_archive schema, where no query of the app reaches them; their
+confirmed_hires rows go with them.
+"""
+import logging
+import re
+import zlib
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bookings.periods import day_start
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "bookings_default"
+ARCHIVE_SCHEMA = "bookings_archive"
+# Serializes maintenance runs (job, CLI); each step is its own short transaction
+MAINTENANCE_LOCK_KEY = zlib.crc32(b"restaurant-app:bookings-partitions")
+# DDL on bookings waits at most this long for running queries, then fails and is retried later
+LOCK_TIMEOUT = "5s"
+
+_BOUNDS = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+Partition = Tuple[str, Optional[date], Optional[date]]  # (name, first day, day after); no bounds for the default
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    years, month_index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, month_index + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"bookings_{month:%Y_%m}"
+
+
+def archive_cutoff(today: date) -> Optional[date]:
+    """First month to keep attached, None while archiving is off."""
+    if settings.BOOKINGS_ARCHIVE_AFTER_MONTHS is None:
+        return None
+    # Popularity counts the last 365 days of bookings, so at least 13 months stay
+    return add_months(month_start(today), -max(settings.BOOKINGS_ARCHIVE_AFTER_MONTHS, 13))
+
+
+async def _begin_maintenance(db: AsyncSession) -> None:
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+    await db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+
+
+async def list_partitions(db: AsyncSession) -> List[Partition]:
+    rows = await db.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = 'bookings'::regclass ORDER BY c.relname"
+    ))
+    partitions = []
+    for name, bound in rows:
+        match = _BOUNDS.search(bound)
+        if match:
+            partitions.append((name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+async def create_partition(db: AsyncSession, month: date) -> int:
+    """Attach the partition for `month`, with its rows moved over from the default partition; returns rows moved."""
+    name, lower, upper = partition_name(month), month, add_months(month, 1)
+    await _begin_maintenance(db)
+    await db.execute(text(f"CREATE TABLE {name} (LIKE bookings INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = await db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE booking_date >= :lower AND booking_date < :upper "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ), {"lower": lower, "upper": upper})
+    # Indexes and foreign keys of bookings are cloned onto the partition here
+    await db.execute(text(
+        f"ALTER TABLE bookings ATTACH PARTITION {name} FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    ))
+    await db.commit()
+    logger.info(f"Created partition {name} ({moved.rowcount} rows moved from {DEFAULT_PARTITION})")
+    return moved.rowcount
+
+
+async def ensure_partitions(db: AsyncSession, today: date) -> List[str]:
+    """Create the missing months up to BOOKINGS_PARTITION_MONTHS_AHEAD; returns the partitions created."""
+    existing = {name for name, _, _ in await list_partitions(db)}
+    first = month_start(today)
+    oldest = (await db.execute(text(f"SELECT min(booking_date) FROM {DEFAULT_PARTITION}"))).scalar()
+    await db.rollback()
+    if oldest is not None and oldest < first:
+        first = month_start(oldest)
+    cutoff = archive_cutoff(today)
+    if cutoff is not None:
+        first = max(first, cutoff)
+
+    created = []
+    month = first
+    last = add_months(month_start(today), settings.BOOKINGS_PARTITION_MONTHS_AHEAD)
+    while month <= last:
+        if partition_name(month) not in existing:
+            await create_partition(db, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+async def archive_partitions(db: AsyncSession, before: date, drop: bool = False) -> List[str]:
+    """Detach every month ending on or before `before`, then move it to ARCHIVE_SCHEMA (or drop it)."""
+    archived = []
+    for name, _, upper in await list_partitions(db):
+        if upper is None or upper > before:
+            continue
+        await _begin_maintenance(db)
+        await db.execute(text(f"ALTER TABLE bookings DETACH PARTITION {name}"))
+        # Whatever ends before the month does is a booking of it or of an older month
+        await db.execute(text("DELETE FROM confirmed_hires WHERE ends_at <= :upper"), {"upper": day_start(upper)})
+        if drop:
+            await db.execute(text(f"DROP TABLE {name}"))
+        else:
+            await db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            await db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        await db.commit()
+        logger.info(f"{'Dropped' if drop else 'Archived'} partition {name}")
+        archived.append(name)
+    return archived
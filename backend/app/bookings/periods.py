@@ -0,0 +1,136 @@
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from dateutil.rrule import rrule, rrulestr
+from sqlalchemy import Boolean
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.config import settings
+
+# A booking without a slot takes the venue for the whole day(s)
+FULL_DAY = "day"
+
+Period = Tuple[datetime, datetime]  # [starts_at, ends_at)
+
+# Recurrences a booking series accepts; it books whole dates, so nothing finer than daily
+SERIES_FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+
+def venue_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.VENUE_TIMEZONE)
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=venue_timezone())
+
+
+def days_period(first_day: date, last_day: date) -> Period:
+    """Midnight to midnight in the venue's timezone, both days included."""
+    return day_start(first_day), day_start(last_day + timedelta(days=1))
+
+
+def booking_period(booking_date: date, slot: str = FULL_DAY, end_date: Optional[date] = None) -> Period:
+    """The time range a booking request covers; ValueError for an unknown slot or inverted dates."""
+    if end_date is not None and end_date < booking_date:
+        raise ValueError("end_date is before booking_date")
+    if end_date is not None and (end_date - booking_date).days >= settings.BOOKING_MAX_DAYS:
+        raise ValueError(f"A booking can span at most {settings.BOOKING_MAX_DAYS} days")
+    if slot == FULL_DAY:
+        return days_period(booking_date, end_date or booking_date)
+    if slot not in settings.BOOKING_SLOTS:
+        raise ValueError(f"Unknown slot {slot!r}, expected {FULL_DAY!r} or one of {sorted(settings.BOOKING_SLOTS)}")
+    if end_date not in (None, booking_date):
+        raise ValueError("Only full-day bookings can span several days")
+    opens, closes = (time.fromisoformat(value) for value in settings.BOOKING_SLOTS[slot])
+    starts_at = datetime.combine(booking_date, opens, tzinfo=venue_timezone())
+    # A slot that closes "earlier" than it opens runs past midnight
+    ends_at = datetime.combine(booking_date + timedelta(days=closes <= opens), closes, tzinfo=venue_timezone())
+    return starts_at, ends_at
+
+
+def booking_date_bounds(first_day: date, last_day: date) -> Tuple[date, date]:
+    """booking_date range of the bookings that can touch [first_day, last_day].
+
+    bookings is partitioned by booking_date (a booking's first day), so every
+    range lookup also filters on this to prune the months it cannot be in;
+    no booking runs longer than BOOKING_MAX_DAYS.
+    """
+    return first_day - timedelta(days=settings.BOOKING_MAX_DAYS), last_day
+
+
+def venue_time(moment: datetime) -> datetime:
+    return moment.astimezone(venue_timezone())
+
+
+def local_date(moment: datetime) -> date:
+    return venue_time(moment).date()
+
+
+def days_covered(starts_at: datetime, ends_at: datetime) -> List[date]:
+    """Every venue-local day the range touches (ends_at is exclusive)."""
+    first, last = local_date(starts_at), local_date(ends_at - timedelta(microseconds=1))
+    return [first + timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def series_dates(
+    dates: Optional[List[date]] = None,
+    start_date: Optional[date] = None,
+    recurrence: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[date]:
+    """The sorted, distinct dates of a booking series: an explicit list, or an
+    RFC 5545 rule such as "FREQ=WEEKLY;COUNT=8" starting at start_date.
+
+    ValueError for neither/both, a bad rule, or more than `limit` dates.
+    A rule must be bounded (COUNT or UNTIL) and repeat at most DAILY, as
+    a series books whole dates.
+    """
+    limit = limit or settings.BOOKING_SERIES_MAX_DATES
+    if (dates is None) == (recurrence is None):
+        raise ValueError("Give either dates or recurrence")
+    if recurrence is not None:
+        if start_date is None:
+            raise ValueError("recurrence needs a start_date")
+        try:
+            rule = rrulestr(recurrence, dtstart=datetime.combine(start_date, time.min))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid recurrence {recurrence!r}: {e}")
+        if not isinstance(rule, rrule):
+            raise ValueError("recurrence must be a single RRULE")
+        # str(rule) is "DTSTART:...\nRRULE:FREQ=...;..." with the rule as parsed
+        parts = dict(part.split("=", 1) for part in str(rule).splitlines()[-1].removeprefix("RRULE:").split(";"))
+        if parts["FREQ"] not in SERIES_FREQUENCIES:
+            raise ValueError(f"recurrence FREQ must be one of {', '.join(SERIES_FREQUENCIES)}")
+        if "COUNT" not in parts and "UNTIL" not in parts:
+            raise ValueError("recurrence needs COUNT or UNTIL")
+        dates = []
+        for moment in rule:  # Ascending; BYHOUR and the like only repeat a date
+            if not dates or moment.date() != dates[-1]:
+                dates.append(moment.date())
+                if len(dates) > limit:
+                    break
+    dates = sorted(set(dates))
+    if not dates:
+        raise ValueError("The series has no dates")
+    if len(dates) > limit:
+        raise ValueError(f"A series can have at most {limit} dates")
+    return dates
+
+
+class overlaps(FunctionElement):
+    """`overlaps(starts_at, ends_at, start, end)`: the half-open ranges [starts_at, ends_at) and [start, end) intersect.
+
+    Compares tstzrange(starts_at, ends_at), the exact expression
+    ix_bookings_confirmed_period indexes, so lookups use that GiST index.
+    """
+    type = Boolean()
+    name = "overlaps"
+    inherit_cache = True
+
+
+@compiles(overlaps)
+def _compile_overlaps(element, compiler, **kw):
+    starts_at, ends_at, start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"tstzrange({starts_at}, {ends_at}) && tstzrange({start}, {end})"
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.bookings.schemas import BookingCreate, BookingResponse
+from app.bookings.schemas import BookingCreate, BookingResponse, BookingSeriesCreate, BookingSeriesResponse, OccupancyResponse
 from app.bookings.dao import BookingDAO
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.users.auth import get_current_user
 from app.users.models import Users
 from datetime import date
@@ -38,6 +39,24 @@ async def book_restaurant(
         logger.error(f"Error creating booking: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating booking: {str(e)}")
 
+@router.post("/series", response_model=BookingSeriesResponse)
+async def book_restaurant_series(
+    series: BookingSeriesCreate,
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Book a restaurant on several dates at once (each pending admin confirmation)"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        return await BookingDAO.create_series(db, current_user.id, series)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error creating booking series: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating booking series: {str(e)}")
+
 @router.put("/{booking_id}/confirm", response_model=BookingResponse)
 async def confirm_booking(
     booking_id: int,
@@ -112,7 +131,7 @@ async def reject_booking(
 async def get_bookings_by_restaurant(
     restaurant_id: int,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all bookings for a specific restaurant"""
     if not current_user:
@@ -136,7 +155,7 @@ async def get_bookings_by_restaurant(
 @router.get("/restaurant/", response_model=List[BookingResponse])
 async def get_bookings_by_restaurant(
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all bookings for a specific restaurant"""
     if not current_user:
@@ -160,7 +179,7 @@ async def get_bookings_by_restaurant(
 @router.get("/reserved/{booking_date}", response_model=List[int])
 async def get_reserved_restaurants(
     booking_date: date,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get restaurants already reserved (confirmed) for a specific day"""
     try:
@@ -170,13 +189,35 @@ async def get_reserved_restaurants(
         logger.error(f"Error retrieving reserved restaurants: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving reserved restaurants: {str(e)}")
 
+@router.get("/occupancy", response_model=OccupancyResponse)
+async def get_occupancy(
+    start_date: date,
+    end_date: date,
+    restaurant_id: Optional[List[int]] = Query(None, description="Restaurants to include (default: all)"),
+    category: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Free/pending/confirmed matrix of restaurants x days for a calendar or heatmap"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    if (end_date - start_date).days >= settings.OCCUPANCY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"The window can span at most {settings.OCCUPANCY_MAX_DAYS} days")
+
+    # NumPy only loads with the first occupancy request, not at API boot
+    from app.bookings.occupancy import get_occupancy as build_occupancy
+    try:
+        return await build_occupancy(db, start_date, end_date, restaurant_id, category)
+    except Exception as e:
+        logger.error(f"Error building occupancy: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error building occupancy: {str(e)}")
+
 @router.get("/booked-dates/{restaurant_id}", response_model=List[date])
 async def get_booked_dates(
     restaurant_id: int,
     start_date: Optional[date] = Query(None, description="Start date for filtering"),
     end_date: Optional[date] = Query(None, description="End date for filtering"),
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all booked dates (pending and confirmed) for a specific restaurant"""
     if not current_user:
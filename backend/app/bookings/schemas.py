@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 from enum import Enum
 
 class BookingStatus(str, Enum):
@@ -8,9 +8,15 @@ class BookingStatus(str, Enum):
     CONFIRMED = "confirmed"
     REJECTED = "rejected"
 
+class BookingMode(str, Enum):
+    EXCLUSIVE = "exclusive"  # A booking hires the whole venue
+    SHARED = "shared"  # Bookings share each day up to the venue's capacity
+
 class BookingCreate(BaseModel):
     restaurant_id: int
     booking_date: date
+    slot: str = "day"  # "day" (whole day) or a BOOKING_SLOTS name such as "lunch"
+    end_date: Optional[date] = None  # Last day of a multi-day, full-day booking
     booking_username: str
     email: str
     phone_number: str  # Contact number
@@ -18,6 +24,39 @@ class BookingCreate(BaseModel):
     number_of_guests: int  # Number of guests for the booking
     additional_information: Optional[str] = None  # Optional field for any additional information
 
+class BookingSeriesCreate(BaseModel):
+    restaurant_id: int
+    dates: Optional[List[date]] = None  # Either explicit dates...
+    start_date: Optional[date] = None
+    recurrence: Optional[str] = None  # ...or an RFC 5545 rule from start_date, e.g. "FREQ=WEEKLY;COUNT=8"
+    slot: str = "day"  # The same slot on every date
+    all_or_nothing: bool = True  # False: book the dates that are free and report the others
+    booking_username: str
+    email: str
+    phone_number: str
+    event_type: str
+    number_of_guests: int
+    additional_information: Optional[str] = None
+
+class BookingSeriesOutcome(BaseModel):
+    booking_date: date
+    status: str  # "created", "conflict" (venue booked), "full" (shared venue at capacity) or "skipped"
+    booking_id: Optional[int] = None
+
+class BookingSeriesResponse(BaseModel):
+    created: int
+    outcomes: List[BookingSeriesOutcome]
+
+class OccupancyResponse(BaseModel):
+    start_date: date
+    days: int
+    restaurant_ids: List[int]  # Row order of the bitsets
+    row_bytes: int  # ceil(days / 8): bytes per restaurant row
+    # Base64 np.packbits rows, most significant bit first: bit d of row r is day start_date + d.
+    # A day in neither bitset is free.
+    pending: str  # Pending requests, or a shared venue partly booked
+    confirmed: str  # A confirmed booking, or a shared venue at capacity
+
 class BookingResponse(BaseModel):
     id: int
     booking_username: str
@@ -30,6 +69,10 @@ class BookingResponse(BaseModel):
     restaurant_id: int
     booking_date: date
     status: str
+    slot: str = "day"
+    shared: bool = False
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,23 @@
+from datetime import date
+
+from app.bookings.partitions import archive_cutoff, archive_partitions, ensure_partitions
+from app.database import async_session_maker
+from app.jobs.queue import enqueue_periodic, task
+
+
+@task("bookings.maintain_partitions")
+async def maintain_partitions(payload: dict) -> dict:
+    """Daily: create the coming months' partitions and archive the months past BOOKINGS_ARCHIVE_AFTER_MONTHS."""
+    today = date.today()
+    async with async_session_maker() as db:
+        created = await ensure_partitions(db, today)
+        cutoff = archive_cutoff(today)
+        archived = await archive_partitions(db, cutoff) if cutoff is not None else []
+    if payload.get("periodic"):
+        await schedule_partition_maintenance(next_period=True)
+    return {"created": created, "archived": archived}
+
+
+async def schedule_partition_maintenance(next_period: bool = False) -> None:
+    async with async_session_maker() as db:
+        await enqueue_periodic(db, "bookings.maintain_partitions", 86400, {"periodic": True}, next_period)
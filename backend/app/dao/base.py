@@ -1,5 +1,5 @@
 
-from sqlalchemy import insert, select
+from sqlalchemy import insert, lambda_stmt, select
 
 from app.database import async_session_maker
 
@@ -9,8 +9,10 @@ class BaseDAO:
     
     @classmethod
     async def find_by_id(cls, model_id:int):
+        model = cls.model
         async with async_session_maker() as session:
-            query = select(cls.model).filter_by(id=model_id)
+            # Runs on every authenticated request (get_current_user); the lambda skips rebuilding the select
+            query = lambda_stmt(lambda: select(model).filter_by(id=model_id))
             result = await session.execute(query)
             return result.scalar_one_or_none()
     
@@ -1,30 +1,219 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import itertools
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import TIMESTAMP, Column, Integer, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import NullPool
+from starlette.datastructures import MutableHeaders
 from app.config import settings
+from app.monitoring.metrics import instrument_engine
+from app.overload.deadlines import propagate_to_statements
+from app.users.tokens import scope_subject
 
-engine = create_async_engine(
-    settings.DATABASE_URL, 
-    echo=True,  # Set to False in production
-    poolclass=NullPool,  # Helps with connection management in async contexts
-    future=True  # Enables 2.0 style SQL execution
-)
+logger = logging.getLogger(__name__)
 
-async_session_maker = sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
-)
+# Set after a successful write; while it's valid the client's reads go to the primary.
+# Only browsers that send cookies keep it; Bearer-token clients are pinned in primary_pins.
+STICKY_COOKIE = "db_primary_until"
+
+
+def _pool_options() -> dict:
+    if settings.DB_POOL_SIZE <= 0:
+        return {"poolclass": NullPool}
+    # Long-lived connections keep asyncpg's prepared statements warm between requests
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    new_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,  # Enables 2.0 style SQL execution
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args={
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+        **_pool_options()
+    )
+    if settings.METRICS_ENABLED or settings.QUERY_BUDGET_MODE != "off":
+        instrument_engine(new_engine)
+    if settings.OVERLOAD_ENABLED:
+        propagate_to_statements(new_engine)
+    return new_engine
+
+
+def _session_maker(bind: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        bind, 
+        class_=AsyncSession, 
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+async_session_maker = _session_maker(engine)
+
+# Streaming replicas for read-only endpoints (DB_REPLICA_URLS), used round-robin
+replica_engines: List[AsyncEngine] = [_create_engine(url) for url in settings.DB_REPLICA_URLS]
+replica_session_makers = [_session_maker(replica) for replica in replica_engines]
+_next_replica = itertools.cycle(replica_session_makers)
 
 
 class Base(DeclarativeBase):
     pass
 
+
+class PrimaryPin(Base):
+    """A user whose own recent write may not have reached the replicas yet; one row per user."""
+    __tablename__ = "primary_pins"
+
+    user_id = Column(Integer, primary_key=True)
+    until = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
 async def get_db():
     async with async_session_maker() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+def _user_id(scope) -> Optional[int]:
+    subject = scope_subject(scope)
+    return int(subject) if subject and subject.isdigit() else None
+
+
+class PinCache:
+    """This process's copy of the unexpired primary_pins, as epoch seconds per user.
+
+    Reads check it instead of the primary: the whole table is re-read at most every
+    DB_PRIMARY_PINS_REFRESH_SECONDS, and pins this process writes count at once.
+    A pin written by another worker can take up to that long to be seen here.
+    """
+
+    def __init__(self):
+        self.until: Dict[int, float] = {}
+        self.loaded_at: Optional[float] = None
+
+    def add(self, user_id: int, until: float) -> None:
+        self.until[user_id] = max(until, self.until.get(user_id, 0))
+
+    async def refresh(self) -> None:
+        # Set first, so requests arriving meanwhile use what is here instead of reloading too
+        self.loaded_at = time.monotonic()
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                select(PrimaryPin.user_id, func.extract("epoch", PrimaryPin.until)).where(PrimaryPin.until > func.now())
+            )
+            loaded = {user_id: float(until) for user_id, until in rows}
+        now = time.time()
+        # Keep pins added while the query ran
+        for user_id, until in self.until.items():
+            if until > now:
+                loaded[user_id] = max(until, loaded.get(user_id, 0))
+        self.until = loaded
+
+    async def pinned(self, user_id: int) -> bool:
+        if self.loaded_at is None or time.monotonic() - self.loaded_at >= settings.DB_PRIMARY_PINS_REFRESH_SECONDS:
+            await self.refresh()
+        return self.until.get(user_id, 0) > time.time()
+
+
+primary_pins = PinCache()
+
+
+async def pin_to_primary(user_id: int, seconds: float) -> None:
+    stmt = insert(PrimaryPin).values(user_id=user_id, until=func.now() + timedelta(seconds=seconds))
+    stmt = stmt.on_conflict_do_update(index_elements=[PrimaryPin.user_id], set_={"until": stmt.excluded.until})
+    async with engine.begin() as conn:
+        await conn.execute(stmt)
+    primary_pins.add(user_id, time.time() + seconds)
+
+
+async def reads_from_primary(request: Request) -> bool:
+    """True while the client's own recent write may not have reached the replicas yet.
+
+    The cookie costs nothing to check; a signed-in user is looked up in
+    primary_pins (PinCache), which costs one query per refresh interval per
+    process rather than one per read.
+    """
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user_id = _user_id(request.scope)
+    if user_id is None:
+        return False
+    return await primary_pins.pinned(user_id)
+
+
+async def get_read_db(request: Request):
+    """Session for endpoints that only read: a replica when configured, else the primary."""
+    maker = async_session_maker
+    if replica_session_makers and not await reads_from_primary(request):
+        maker = next(_next_replica)
+    async with maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
+class StickyPrimaryMiddleware:
+    """Read-your-writes: after a successful write, pin the client's reads to the primary.
+
+    The signed-in user (from the Bearer token the API authenticates with) gets a
+    primary_pins row, written before the response goes out so every worker sees
+    it (PinCache); the cookie covers anonymous browsers. Other clients keep reading from the
+    replicas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_engines or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                seconds = settings.DB_STICKY_PRIMARY_SECONDS
+                user_id = _user_id(scope)
+                if user_id is not None:
+                    try:
+                        await pin_to_primary(user_id, seconds)
+                    except Exception:
+                        # The write itself succeeded; at worst the next read is a little stale
+                        logger.exception(f"Could not pin user {user_id} to the primary")
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={time.time() + seconds:.3f}; Max-Age={math.ceil(seconds)}; Path=/; HttpOnly; SameSite=lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
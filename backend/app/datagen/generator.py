@@ -0,0 +1,275 @@
+import bisect
+import itertools
+import math
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.bookings.periods import days_period
+from app.geo.geocoders import BUILTIN_PLACES
+
+# Current production size: the six STATIC_RESTAURANTS in app/restaurants/router.py
+BASE_RESTAURANTS = 6
+
+# (value, weight) pairs, roughly matching what the frontend filters offer
+CITIES = [
+    ("Almaty", 30), ("Astana", 25), ("Shymkent", 14), ("Karagandy", 10), ("Aktobe", 6),
+    ("Pavlodar", 5), ("Aktau", 4), ("Atyrau", 3), ("Kostanay", 3),
+]
+DISTRICTS = ["Downtown", "Old Town", "Riverside", "Business District", "Lakeside", "University", "Airport", "Hills"]
+CATEGORIES = [
+    ("Fine Dining", 18), ("Modern", 26), ("Classic", 22), ("Luxury", 10), ("Rooftop", 8), ("Seafood", 6),
+    ("Banquet Hall", 10),
+]
+CUISINES = [
+    ("Kazakh", 30), ("European", 22), ("Italian", 16), ("Uzbek", 12), ("Georgian", 10), ("Japanese", 8),
+    ("Turkish", 8), ("Chinese", 7), ("Korean", 5), ("French", 5), ("American", 4), ("Indian", 3),
+]
+FEATURES = [
+    ("Parking", 60), ("Wi-Fi", 70), ("Live Music", 35), ("Stage", 25), ("Dance Floor", 30), ("Projector", 20),
+    ("Terrace", 15), ("Kids Zone", 10), ("Karaoke", 18), ("VIP Room", 12), ("Wheelchair Access", 25),
+]
+EVENT_TYPES = [("Wedding", 30), ("Birthday", 28), ("Corporate", 16), ("Anniversary", 10), ("Party", 10), ("Graduation", 6)]
+
+# (min capacity, max capacity, min price, max price) per category
+CATEGORY_PROFILES = {
+    "Fine Dining": (40, 150, 60, 180),
+    "Modern": (30, 200, 25, 90),
+    "Classic": (50, 250, 20, 70),
+    "Luxury": (100, 600, 90, 300),
+    "Rooftop": (30, 120, 40, 120),
+    "Seafood": (30, 150, 35, 110),
+    "Banquet Hall": (150, 1000, 15, 60),
+}
+
+# Demand multipliers: wedding season peaks in summer and early autumn, plus the December party season
+MONTH_WEIGHTS = {1: 0.5, 2: 0.6, 3: 0.8, 4: 0.9, 5: 1.1, 6: 1.4, 7: 1.5, 8: 1.6, 9: 1.4, 10: 1.0, 11: 0.8, 12: 1.5}
+WEEKDAY_WEIGHTS = {0: 0.3, 1: 0.3, 2: 0.4, 3: 0.6, 4: 1.6, 5: 2.2, 6: 1.2}
+
+NAME_ADJECTIVES = ["Golden", "Azure", "Royal", "Silk", "Velvet", "Grand", "Emerald", "Crystal", "Silver", "Amber", "Steppe", "Sapphire"]
+NAME_NOUNS = ["Hall", "Pavilion", "Garden", "Lounge", "Terrace", "Palace", "Room", "House", "Court", "Tent", "Yurt", "Manor"]
+IMAGE_HOST = "https://images.example.com/restaurants"
+
+
+class DatasetSpec(BaseModel):
+    seed: int = 42
+    users: int = 1000
+    admins: int = 50
+    restaurants: int = 200
+    min_images: int = 1
+    max_images: int = 8
+    reviews: int = 10000
+    bookings: int = 20000
+    # Bookings are spread over [today - past_days, today + future_days]
+    past_days: int = 365
+    future_days: int = 365
+    # Zipf exponent for venue popularity; higher means a few venues get most reviews/bookings
+    popularity_skew: float = 1.1
+    password: str = "synthetic-password"
+    today: Optional[date] = None
+
+    @classmethod
+    def scaled(cls, factor: float, **overrides) -> "DatasetSpec":
+        """Spec sized as a multiple of the current catalogue (six venues)."""
+        restaurants = max(1, round(BASE_RESTAURANTS * factor))
+        sizes = {
+            "restaurants": restaurants,
+            "admins": max(1, restaurants // 4),
+            "users": restaurants * 20,
+            "reviews": restaurants * 40,
+            "bookings": restaurants * 100,
+        }
+        sizes.update(overrides)
+        return cls(**sizes)
+
+
+def admin_phone(n: int) -> str:
+    return f"synthetic-admin-{n}"
+
+
+def user_phone(n: int) -> str:
+    return f"synthetic-user-{n}"
+
+
+class _WeightedChoice:
+    """O(log n) weighted sampling from precomputed cumulative weights."""
+
+    def __init__(self, rng: random.Random, options: List[Tuple[object, float]]):
+        self.rng = rng
+        self.values = [value for value, _ in options]
+        self.cumulative = list(itertools.accumulate(weight for _, weight in options))
+
+    def __call__(self):
+        return self.values[bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])]
+
+    def sample(self, k: int) -> List:
+        """k distinct values, still biased by weight."""
+        chosen = []
+        while len(chosen) < min(k, len(self.values)):
+            value = self()
+            if value not in chosen:
+                chosen.append(value)
+        return chosen
+
+
+class DatasetGenerator:
+    """Deterministic synthetic data; the same spec always yields the same rows.
+
+    Rows are plain dicts keyed by column name with 1-based local ids. Foreign keys
+    reference those local ids, so the loader can shift them onto an existing database.
+    """
+
+    def __init__(self, spec: DatasetSpec, password_hash: str = ""):
+        self.spec = spec
+        self.password_hash = password_hash
+        self.today = spec.today or date.today()
+        self._restaurants: Optional[List[Dict]] = None
+
+    def _rng(self, stream: str) -> random.Random:
+        # Independent stream per table so changing one volume doesn't reshuffle the others
+        return random.Random(f"{self.spec.seed}:{stream}")
+
+    def users(self) -> Iterator[Dict]:
+        for n in range(self.spec.admins):
+            yield {
+                "id": n + 1,
+                "username": f"owner{n}",
+                "email": f"owner{n}@example.com",
+                "phone": admin_phone(n),
+                "hashed_password": self.password_hash,
+                "role": "admin",
+            }
+        for n in range(self.spec.users):
+            yield {
+                "id": self.spec.admins + n + 1,
+                "username": f"guest{n}",
+                "email": f"guest{n}@example.com",
+                "phone": user_phone(n),
+                "hashed_password": self.password_hash,
+                "role": "user",
+            }
+
+    def restaurants(self) -> List[Dict]:
+        if self._restaurants is not None:
+            return self._restaurants
+
+        rng = self._rng("restaurants")
+        # Own stream so adding coordinates left every other column unchanged
+        coordinates = self._rng("coordinates")
+        city = _WeightedChoice(rng, CITIES)
+        category = _WeightedChoice(rng, CATEGORIES)
+        cuisine = _WeightedChoice(rng, CUISINES)
+        feature = _WeightedChoice(rng, FEATURES)
+        rows = []
+        for n in range(self.spec.restaurants):
+            venue_category = category()
+            min_capacity, max_capacity, min_price, max_price = CATEGORY_PROFILES[venue_category]
+            venue_city = city()
+            quality = min(5.0, max(2.5, rng.gauss(4.1, 0.45)))
+            center_lat, center_lng = BUILTIN_PLACES[venue_city.lower()]
+            rows.append({
+                "id": n + 1,
+                "name": f"{rng.choice(NAME_ADJECTIVES)} {rng.choice(NAME_NOUNS)} {n + 1}",
+                "description": f"{venue_category} venue in {venue_city}",
+                "location": f"{rng.choice(DISTRICTS)}, {venue_city}",
+                "address": f"{rng.randint(1, 250)} {rng.choice(['Abay', 'Dostyk', 'Satpayev', 'Tole Bi', 'Kabanbay Batyr'])} St",
+                "category": venue_category,
+                # Capacities cluster at the low end of each category's range
+                "capacity": int(min_capacity + (max_capacity - min_capacity) * rng.random() ** 2),
+                "rating": round(quality, 1),
+                "price_range": str(rng.randint(min_price, max_price)),
+                "features": ",".join(feature.sample(rng.randint(2, 5))),
+                "cuisines": ",".join(cuisine.sample(rng.randint(1, 3))),
+                "contact_phone": f"+7 7{rng.randint(0, 99):02d} {rng.randint(0, 9999999):07d}",
+                "contact_email": f"venue{n + 1}@example.com",
+                "owner_id": rng.randrange(self.spec.admins) + 1 if self.spec.admins else None,
+                # Spread over roughly 10 km around the city centre
+                "latitude": round(center_lat + coordinates.gauss(0, 0.045), 6),
+                "longitude": round(center_lng + coordinates.gauss(0, 0.06), 6),
+            })
+        self._restaurants = rows
+        return rows
+
+    def _popularity(self, rng: random.Random) -> _WeightedChoice:
+        """Zipf-distributed popularity over venues in a random (but seeded) order."""
+        restaurants = self.restaurants()
+        ranks = list(range(1, len(restaurants) + 1))
+        rng.shuffle(ranks)
+        return _WeightedChoice(rng, [
+            (restaurant, 1 / rank ** self.spec.popularity_skew)
+            for restaurant, rank in zip(restaurants, ranks)
+        ])
+
+    def images(self) -> Iterator[Dict]:
+        rng = self._rng("images")
+        image_id = itertools.count(1)
+        for restaurant in self.restaurants():
+            for position in range(rng.randint(self.spec.min_images, self.spec.max_images)):
+                yield {
+                    "id": next(image_id),
+                    "url": f"{IMAGE_HOST}/{restaurant['id']}/{position}.jpg",
+                    "restaurant_id": restaurant["id"],
+                }
+
+    def reviews(self) -> Iterator[Dict]:
+        rng = self._rng("reviews")
+        popular = self._popularity(rng)
+        comments = [None, "Great venue", "Friendly staff", "Food could be better", "Perfect for our wedding", "Too noisy"]
+        for n in range(self.spec.reviews):
+            restaurant = popular()
+            yield {
+                "id": n + 1,
+                "username": f"guest{rng.randrange(max(1, self.spec.users))}",
+                # Individual ratings scatter around the venue's overall rating
+                "rating": min(5, max(1, round(rng.gauss(restaurant["rating"], 0.9)))),
+                "comment": rng.choice(comments),
+                "restaurant_id": restaurant["id"],
+            }
+
+    def _booking_dates(self, rng: random.Random) -> _WeightedChoice:
+        start = self.today - timedelta(days=self.spec.past_days)
+        days = [start + timedelta(days=offset) for offset in range(self.spec.past_days + self.spec.future_days + 1)]
+        return _WeightedChoice(rng, [
+            (day, MONTH_WEIGHTS[day.month] * WEEKDAY_WEIGHTS[day.weekday()])
+            for day in days
+        ])
+
+    def bookings(self) -> Iterator[Dict]:
+        rng = self._rng("bookings")
+        popular = self._popularity(rng)
+        booking_date = self._booking_dates(rng)
+        event_type = _WeightedChoice(rng, EVENT_TYPES)
+        # Full-day bookings, so at most one confirmed per venue and day (confirm_booking refuses overlaps)
+        confirmed = set()
+        for n in range(self.spec.bookings):
+            restaurant = popular()
+            day = booking_date()
+            roll = rng.random()
+            if day < self.today:
+                status = "confirmed" if roll < 0.7 else "rejected"
+            else:
+                status = "pending" if roll < 0.55 else "confirmed" if roll < 0.9 else "rejected"
+            if status == "confirmed":
+                if (restaurant["id"], day) in confirmed:
+                    status = "rejected" if day < self.today else "pending"
+                else:
+                    confirmed.add((restaurant["id"], day))
+            guest = rng.randrange(max(1, self.spec.users))
+            yield {
+                "id": n + 1,
+                "user_id": self.spec.admins + guest + 1,
+                "restaurant_id": restaurant["id"],
+                "booking_date": day,
+                "starts_at": days_period(day, day)[0],
+                "ends_at": days_period(day, day)[1],
+                "slot": "day",
+                "status": status,
+                "booking_username": f"guest{guest}",
+                "email": f"guest{guest}@example.com",
+                "phone_number": f"+7 7{guest % 100:02d} {guest:07d}",
+                "event_type": event_type(),
+                "number_of_guests": max(5, min(restaurant["capacity"], int(rng.lognormvariate(math.log(60), 0.6)))),
+                "additional_information": None,
+            }
@@ -0,0 +1,131 @@
+import itertools
+import logging
+from typing import Dict, Iterable
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.bookings.models import Bookings, ConfirmedHire
+from app.datagen.generator import DatasetGenerator
+from app.restaurants.models import Restaurant, RestaurantImage
+from app.reviews.models import Reviews
+from app.users.models import Users
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 10000
+
+# Foreign key column -> table whose id offset it must follow
+FOREIGN_KEYS = {
+    "restaurants": {"owner_id": "users"},
+    "restaurant_images": {"restaurant_id": "restaurants"},
+    "reviews": {"restaurant_id": "restaurants"},
+    "bookings": {"user_id": "users", "restaurant_id": "restaurants"},
+}
+# Unique columns a second load would repeat; tagged with the table's id offset
+UNIQUE_COLUMNS = {
+    "users": ("username", "email", "phone"),
+}
+
+
+def tag_unique(column: str, value: str, offset: int) -> str:
+    """owner3 -> owner3-5500, owner3@example.com -> owner3+5500@example.com; unchanged for offset 0."""
+    if not offset or value is None:
+        return value
+    if column == "email":
+        local, _, domain = value.partition("@")
+        return f"{local}+{offset}@{domain}"
+    return f"{value}-{offset}"
+
+
+def _chunks(rows: Iterable[Dict], size: int):
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def _copy_rows(conn: AsyncConnection, table, rows):
+    """COPY is several times faster than multi-row INSERT on Postgres."""
+    columns = list(rows[0])
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(row[column] for column in columns) for row in rows],
+        columns=columns,
+    )
+
+
+def confirmed_hires(bookings: Iterable[Dict]) -> list:
+    """confirmed_hires rows of the confirmed venue hires among `bookings`, as confirm_booking writes them."""
+    return [
+        {"booking_id": row["id"], "restaurant_id": row["restaurant_id"], "starts_at": row["starts_at"], "ends_at": row["ends_at"]}
+        for row in bookings if row["status"] == "confirmed" and not row.get("shared")
+    ]
+
+
+async def _write(conn: AsyncConnection, table, rows, use_copy: bool) -> None:
+    if use_copy:
+        await _copy_rows(conn, table, rows)
+    else:
+        await conn.execute(insert(table), rows)
+
+
+async def load_dataset(conn: AsyncConnection, generator: DatasetGenerator, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+    """Bulk-load a generated dataset, appending after any rows already in the tables.
+
+    Ids are assigned client-side (shifted past the current max id) so child rows can
+    reference parents without a round trip, then the id sequences are moved forward.
+    On a non-empty database the unique user columns are tagged with that offset
+    (tag_unique), so only the first load's logins match admin_phone/user_phone.
+    Confirmed venue hires go into confirmed_hires too, so confirmed_hires_no_overlap
+    fails the load if they overlap each other or what is already there.
+    """
+    tables = [
+        (Users.__table__, generator.users()),
+        (Restaurant.__table__, generator.restaurants()),
+        (RestaurantImage.__table__, generator.images()),
+        (Reviews.__table__, generator.reviews()),
+        (Bookings.__table__, generator.bookings()),
+    ]
+    offsets = {
+        table.name: await conn.scalar(select(func.coalesce(func.max(table.c.id), 0)))
+        for table, _ in tables
+    }
+    use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+
+    counts = {}
+    for table, rows in tables:
+        foreign_keys = FOREIGN_KEYS.get(table.name, {})
+        unique_columns = UNIQUE_COLUMNS.get(table.name, ())
+        count = 0
+        for chunk in _chunks(rows, chunk_size):
+            # Copy before shifting: the generator keeps restaurant rows around for later tables
+            chunk = [
+                {
+                    **row,
+                    "id": row["id"] + offsets[table.name],
+                    **{
+                        column: row[column] + offsets[parent]
+                        for column, parent in foreign_keys.items() if row[column] is not None
+                    },
+                    **{column: tag_unique(column, row[column], offsets[table.name]) for column in unique_columns},
+                }
+                for row in chunk
+            ]
+            await _write(conn, table, chunk, use_copy)
+            if table is Bookings.__table__:
+                hires = confirmed_hires(chunk)
+                if hires:
+                    await _write(conn, ConfirmedHire.__table__, hires, use_copy)
+                    counts[ConfirmedHire.__tablename__] = counts.get(ConfirmedHire.__tablename__, 0) + len(hires)
+            count += len(chunk)
+        counts[table.name] = count
+        logger.info(f"Loaded {count} rows into {table.name}")
+
+    if conn.dialect.name == "postgresql":
+        for table, _ in tables:
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+            ))
+    return counts
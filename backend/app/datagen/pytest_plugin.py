@@ -0,0 +1,25 @@
+"""Pytest fixtures for synthetic datasets.
+
+Enable with `pytest_plugins = ["app.datagen.pytest_plugin"]` in a conftest.py, then:
+
+    def test_catalogue(synthetic_dataset):
+        generator = synthetic_dataset(restaurants=50, bookings=2000)
+        assert len(generator.restaurants()) == 50
+
+To put one in a database, pass it to app.datagen.loader.load_dataset with an
+AsyncConnection of your own (e.g. inside `async with engine.begin() as conn`).
+"""
+import pytest
+
+from app.datagen.generator import DatasetGenerator, DatasetSpec
+
+
+@pytest.fixture
+def synthetic_dataset():
+    """Factory for small deterministic datasets; keyword arguments override DatasetSpec fields."""
+
+    def make(password_hash: str = "", **overrides) -> DatasetGenerator:
+        spec = DatasetSpec(**{"users": 50, "admins": 5, "restaurants": 20, "reviews": 200, "bookings": 500, **overrides})
+        return DatasetGenerator(spec, password_hash=password_hash)
+
+    return make
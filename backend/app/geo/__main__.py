@@ -0,0 +1,55 @@
+"""Geocode restaurants offline with the configured GEOCODER_BACKEND.
+
+    python -m app.geo               # restaurants without coordinates
+    python -m app.geo --all         # recompute every restaurant
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.database import async_session_maker, engine
+from app.geo.geocoders import geocode_restaurant, get_geocoder
+from app.restaurants.models import Restaurant
+from app.reviews.models import Reviews  # noqa: F401, Restaurant.reviews needs it mapped
+from app.bookings.models import Bookings  # noqa: F401
+from app.users.models import Users  # noqa: F401
+
+
+async def main(args) -> None:
+    started = time.perf_counter()
+    geocoder = get_geocoder()
+    found = missing = 0
+    last_id = 0
+    while True:
+        async with async_session_maker() as db:
+            query = select(Restaurant).where(Restaurant.id > last_id).order_by(Restaurant.id).limit(args.batch_size)
+            if not args.all:
+                query = query.where(Restaurant.latitude.is_(None))
+            batch = (await db.execute(query)).scalars().all()
+            if not batch:
+                break
+            for restaurant in batch:
+                coordinates = await asyncio.to_thread(geocode_restaurant, geocoder, restaurant.address, restaurant.location)
+                if coordinates is None:
+                    missing += 1
+                    print(f"Not found: #{restaurant.id} {restaurant.address!r}, {restaurant.location!r}")
+                    continue
+                restaurant.latitude, restaurant.longitude = coordinates
+                found += 1
+            await db.commit()
+            last_id = batch[-1].id
+    await engine.dispose()
+    print(f"Geocoded {found} restaurants, {missing} not found, in {time.perf_counter() - started:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="also recompute restaurants that have coordinates")
+    parser.add_argument("--batch-size", type=int, default=500)
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,113 @@
+import csv
+import functools
+import logging
+from typing import Dict, Optional, Protocol, Tuple
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]  # (latitude, longitude)
+
+# Places the catalogue already uses; GEOCODER_GAZETTEER_PATH adds to or overrides these
+BUILTIN_PLACES: Dict[str, Coordinates] = {
+    "almaty": (43.2389, 76.8897),
+    "astana": (51.1694, 71.4491),
+    "shymkent": (42.3417, 69.5901),
+    "karagandy": (49.8047, 73.1094),
+    "aktobe": (50.2839, 57.1670),
+    "pavlodar": (52.2873, 76.9674),
+    "aktau": (43.6481, 51.1722),
+    "atyrau": (47.1164, 51.8833),
+    "kostanay": (53.2144, 63.6246),
+    "new york": (40.7128, -74.0060),
+    "downtown, new york": (40.7075, -74.0113),
+    "san francisco": (37.7749, -122.4194),
+    "marina, san francisco": (37.8037, -122.4368),
+    "los angeles": (34.0522, -118.2437),
+    "beverly hills, los angeles": (34.0736, -118.4004),
+    "chicago": (41.8781, -87.6298),
+    "midtown, chicago": (41.8916, -87.6270),
+    "new orleans": (29.9511, -90.0715),
+    "french quarter, new orleans": (29.9584, -90.0644),
+    "miami": (25.7617, -80.1918),
+    "south beach, miami": (25.7826, -80.1341),
+}
+
+
+class Geocoder(Protocol):
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        """Coordinates for a free-text place such as "Downtown, Almaty", None if unknown."""
+
+
+def _normalize(query: str) -> str:
+    return ", ".join(part.strip().lower() for part in query.split(",") if part.strip())
+
+
+class GazetteerGeocoder:
+    """Offline lookup in a table of known places.
+
+    Tries the full text first, then drops the most specific part until
+    something matches, so "12 Abay St, Downtown, Almaty" falls back to
+    "downtown, almaty" and then to the city centroid.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.places = dict(BUILTIN_PLACES)
+        if path:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):  # Columns: place, latitude, longitude
+                    self.places[_normalize(row["place"])] = (float(row["latitude"]), float(row["longitude"]))
+
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        parts = _normalize(query).split(", ")
+        for start in range(len(parts)):
+            coordinates = self.places.get(", ".join(parts[start:]))
+            if coordinates is not None:
+                return coordinates
+        return None
+
+
+class NominatimGeocoder:
+    """A self-hosted Nominatim instance (GEOCODER_URL); never a public endpoint, they forbid bulk use."""
+
+    def __init__(self, url: str):
+        # Thread-safe: geocode() runs in worker threads (asyncio.to_thread)
+        self.client = httpx.Client(base_url=url, timeout=settings.GEOCODER_TIMEOUT_SECONDS)
+
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        try:
+            response = self.client.get("/search", params={"q": query, "format": "jsonv2", "limit": 1})
+            response.raise_for_status()
+            results = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Geocoding {query!r} failed: {e}")
+            return None
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+BACKENDS = {
+    "gazetteer": lambda: GazetteerGeocoder(settings.GEOCODER_GAZETTEER_PATH),
+    "nominatim": lambda: NominatimGeocoder(settings.GEOCODER_URL),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_geocoder() -> Geocoder:
+    """One per process, so jobs share the Nominatim client and its connections instead of leaking one each."""
+    return BACKENDS[settings.GEOCODER_BACKEND]()
+
+
+def geocode_restaurant(geocoder: Geocoder, address: Optional[str], location: Optional[str]) -> Optional[Coordinates]:
+    """Street address within its location first, then the location alone."""
+    queries = [", ".join(part for part in (address, location) if part), location]
+    for query in queries:
+        if query:
+            coordinates = geocoder.geocode(query)
+            if coordinates is not None:
+                return coordinates
+    return None
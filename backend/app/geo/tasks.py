@@ -0,0 +1,21 @@
+import asyncio
+
+from app.database import async_session_maker
+from app.geo.geocoders import geocode_restaurant, get_geocoder
+from app.jobs.queue import task
+from app.restaurants.models import Restaurant
+
+
+@task("geo.geocode_restaurant")
+async def geocode_restaurant_task(payload: dict) -> dict:
+    """(Re)compute a restaurant's coordinates from its address and location."""
+    async with async_session_maker() as db:
+        restaurant = await db.get(Restaurant, payload["restaurant_id"])
+        if restaurant is None:
+            return {"status": "missing"}
+        # Geocoders may block (file or HTTP lookups)
+        coordinates = await asyncio.to_thread(geocode_restaurant, get_geocoder(), restaurant.address, restaurant.location)
+        # Not found after an address change: stale coordinates would be worse than none
+        restaurant.latitude, restaurant.longitude = coordinates or (None, None)
+        await db.commit()
+    return {"latitude": restaurant.latitude, "longitude": restaurant.longitude}
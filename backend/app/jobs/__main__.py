@@ -0,0 +1,40 @@
+"""Run a standalone background job worker.
+
+    python -m app.jobs --concurrency 8
+    python -m app.jobs --queues default
+
+Start as many as needed next to (or instead of) the in-process worker; SIGTERM
+stops claiming new jobs and waits for running ones to finish.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.config import settings
+from app.database import engine
+from app.jobs.worker import Worker
+
+
+async def main(args) -> None:
+    worker = Worker(queues=args.queues, concurrency=args.concurrency)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+    try:
+        await worker.run()
+        await worker.drain(settings.JOBS_SHUTDOWN_TIMEOUT_SECONDS)
+    finally:
+        await engine.dispose()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queues", nargs="*", help="queues to consume (default: all)")
+    parser.add_argument("--concurrency", type=int, default=settings.JOBS_CONCURRENCY)
+    return parser
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, JSON, Text, TIMESTAMP, text
+from app.database import Base
+
+
+class Job(Base):
+    """Persistent background job, claimed by workers with FOR UPDATE SKIP LOCKED."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String, nullable=False, server_default="default")
+    name = Column(String, nullable=False)  # Registered task name, e.g. "restaurants.upload_image"
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, server_default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="5")
+    dedupe_key = Column(String, unique=True, nullable=True)  # Enqueueing the same key twice is a no-op
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    result = Column(JSON, nullable=True)
+    last_error = Column(Text, nullable=True)
+    run_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    locked_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    locked_by = Column(String, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers only ever scan runnable jobs of their queues, oldest first
+        Index("ix_jobs_runnable", "queue", "run_at", postgresql_where=text("status IN ('queued', 'running')")),
+    )
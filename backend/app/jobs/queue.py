@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[Optional[dict]]]
+
+
+class Task:
+    def __init__(self, name: str, handler: Handler, max_attempts: int, queue: str):
+        self.name = name
+        self.handler = handler
+        self.max_attempts = max_attempts
+        self.queue = queue
+
+
+TASKS: Dict[str, Task] = {}
+
+# Wakes an in-process worker as soon as something is enqueued instead of waiting for the next poll
+_wakeup = asyncio.Event()
+
+
+def task(name: str, max_attempts: Optional[int] = None, queue: str = "default"):
+    """Register an async handler taking the job payload; whatever dict it returns is stored as the result."""
+    def decorator(handler: Handler) -> Handler:
+        TASKS[name] = Task(name, handler, max_attempts or settings.JOBS_MAX_ATTEMPTS, queue)
+        return handler
+    return decorator
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def enqueue(
+    db: AsyncSession,
+    name: str,
+    payload: dict,
+    delay: float = 0,
+    dedupe_key: Optional[str] = None,
+    user_id: Optional[int] = None,
+    commit: bool = True,
+) -> Optional[int]:
+    """Queue a job and return its id (None if `dedupe_key` was already queued).
+
+    With commit=False the job is only written when the caller commits, so it
+    happens exactly when the caller's own changes do.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+    registered = TASKS[name]
+    stmt = insert(Job).values(
+        queue=registered.queue,
+        name=name,
+        payload=payload,
+        max_attempts=registered.max_attempts,
+        dedupe_key=dedupe_key,
+        user_id=user_id,
+        run_at=utcnow() + timedelta(seconds=delay),
+    )
+    if dedupe_key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.dedupe_key])
+    job_id = (await db.execute(stmt.returning(Job.id))).scalar_one_or_none()
+    if commit:
+        await db.commit()
+    _wakeup.set()
+    return job_id
+
+
+async def enqueue_periodic(db: AsyncSession, name: str, period: float, payload: dict, next_period: bool = False) -> Optional[int]:
+    """Queue a run for the current (or next) `period`-second slot; the slot number in the dedupe key makes it one run per slot cluster-wide."""
+    now = time.time()
+    slot = int(now // period) + (1 if next_period else 0)
+    return await enqueue(
+        db, name, payload,
+        delay=max(0.0, slot * period - now) if next_period else 0,
+        dedupe_key=f"{name}:{slot}",
+    )
+
+
+async def enqueue_debounced(db: AsyncSession, name: str, payload: dict, key: str, window: float) -> Optional[int]:
+    """Queue one run at the end of the current `window`-second slot per key, however often this is called within it.
+
+    Call it before committing the change it reacts to (commit is left to the
+    caller): the run starts after the slot ends, so it sees that change.
+    """
+    now = time.time()
+    slot = int(now // window) + 1
+    return await enqueue(
+        db, name, payload,
+        delay=slot * window - now + 1,  # A second of slack for transactions committing at the boundary
+        dedupe_key=f"{name}:{key}:{slot}",
+        commit=False,
+    )
+
+
+async def get_job(db: AsyncSession, job_id: int) -> Optional[Job]:
+    result = await db.execute(select(Job).where(Job.id == job_id))
+    return result.scalar_one_or_none()
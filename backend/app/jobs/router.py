@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.jobs.queue import get_job
+from app.jobs.schemas import JobResponse
+from app.users.auth import get_current_user
+from app.users.models import Users
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: int,
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Status of a job queued by one of the 202 endpoints"""
+    job = await get_job(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
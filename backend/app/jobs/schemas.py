@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: int
+    name: str
+    status: str
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,196 @@
+import asyncio
+import importlib
+import logging
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, or_, and_, select, update
+
+from app.config import settings
+from app.database import async_session_maker
+from app.jobs import queue
+from app.jobs.models import Job
+from app.monitoring.metrics import REGISTRY, Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Modules whose @task handlers a worker must know about
+TASK_MODULES = [
+    "app.restaurants.tasks",
+    "app.geo.tasks",
+    "app.recommendations.tasks",
+    "app.popularity.tasks",
+    "app.bookings.tasks",
+]
+
+JOBS_PROCESSED = REGISTRY.register(Counter(
+    "jobs_processed_total",
+    "Background jobs finished, by outcome (done, retry, failed)",
+    ("task", "outcome")
+))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "job_duration_seconds",
+    "Time spent running a background job handler",
+    ("task",)
+))
+
+CLEANUP_INTERVAL_SECONDS = 60
+
+
+def import_task_modules() -> None:
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter, so failed jobs don't retry in lockstep."""
+    delay = min(settings.JOBS_BACKOFF_MAX_SECONDS, settings.JOBS_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class Worker:
+    """Claims runnable jobs and runs up to `concurrency` of them at once on the event loop.
+
+    Any number of workers, in the API process or standalone, can share the jobs
+    table: SKIP LOCKED hands each job to exactly one of them. A job whose worker
+    died is picked up again once its lock is older than the visibility timeout.
+    """
+
+    def __init__(
+        self,
+        queues: Optional[Sequence[str]] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.queues = list(queues) if queues else None  # None: every queue
+        self.concurrency = concurrency or settings.JOBS_CONCURRENCY
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        # A handler gets JOBS_TIMEOUT_SECONDS; only locks well past that are considered abandoned
+        self.visibility_timeout = timedelta(seconds=settings.JOBS_TIMEOUT_SECONDS * 2)
+        self._running = False
+        self._active: set = set()
+        self._last_cleanup = 0.0
+
+    async def run(self) -> None:
+        import_task_modules()
+        self._running = True
+        logger.info(f"Job worker {self.name} started (queues={self.queues or 'all'}, concurrency={self.concurrency})")
+        while self._running:
+            # Cleared before claiming so an enqueue during the claim still wakes the next wait
+            queue._wakeup.clear()
+            free = self.concurrency - len(self._active)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await self._claim(free)
+                    await self._cleanup()
+                except Exception:
+                    logger.exception("Failed to claim jobs")
+            for job in claimed:
+                running = asyncio.create_task(self._execute(job))
+                self._active.add(running)
+                running.add_done_callback(self._active.discard)
+            await self._idle(saturated=len(self._active) >= self.concurrency)
+
+    async def _idle(self, saturated: bool) -> None:
+        """Wait for a free slot when busy, otherwise for new work or the next poll."""
+        if saturated:
+            await asyncio.wait(self._active, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            return
+        try:
+            await asyncio.wait_for(queue._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        self._running = False
+        queue._wakeup.set()
+
+    async def drain(self, timeout: float) -> None:
+        """Wait for running handlers; unfinished jobs are retried by another worker after the visibility timeout."""
+        if self._active:
+            await asyncio.wait(self._active, timeout=timeout)
+        for running in list(self._active):
+            running.cancel()
+
+    async def _claim(self, limit: int) -> List[Job]:
+        now = queue.utcnow()
+        runnable = or_(
+            and_(Job.status == "queued", Job.run_at <= now),
+            and_(Job.status == "running", Job.locked_at < now - self.visibility_timeout),
+        )
+        candidates = select(Job.id).where(runnable)
+        if self.queues:
+            candidates = candidates.where(Job.queue.in_(self.queues))
+        candidates = candidates.order_by(Job.run_at).limit(limit).with_for_update(skip_locked=True)
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id.in_(candidates.scalar_subquery()))
+                .values(status="running", locked_at=now, locked_by=self.name, attempts=Job.attempts + 1)
+                .returning(Job)
+            )
+            jobs = list(result.scalars())
+            await session.commit()
+        return jobs
+
+    async def _execute(self, job: Job) -> None:
+        registered = queue.TASKS.get(job.name)
+        started = time.perf_counter()
+        try:
+            if registered is None:
+                raise LookupError(f"No handler registered for task {job.name}")
+            if job.attempts > job.max_attempts:
+                raise RuntimeError("Worker died while running this job too many times")
+            result = await asyncio.wait_for(registered.handler(job.payload), settings.JOBS_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await self._finish_failed(job, exc, retry=registered is not None and job.attempts < job.max_attempts)
+        else:
+            await self._update(job, status="done", result=result, finished_at=queue.utcnow(), last_error=None)
+            JOBS_PROCESSED.inc(task=job.name, outcome="done")
+        finally:
+            JOB_DURATION.observe(time.perf_counter() - started, task=job.name)
+
+    async def _finish_failed(self, job: Job, exc: Exception, retry: bool) -> None:
+        error = f"{type(exc).__name__}: {exc}"[:2000]
+        if retry:
+            delay = backoff_seconds(job.attempts)
+            logger.warning(f"Job {job.id} ({job.name}) attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+            await self._update(job, status="queued", run_at=queue.utcnow() + timedelta(seconds=delay), last_error=error)
+            JOBS_PROCESSED.inc(task=job.name, outcome="retry")
+        else:
+            logger.error(f"Job {job.id} ({job.name}) failed after {job.attempts} attempts: {error}")
+            await self._update(job, status="failed", finished_at=queue.utcnow(), last_error=error)
+            JOBS_PROCESSED.inc(task=job.name, outcome="failed")
+
+    async def _update(self, job: Job, **values) -> None:
+        async with async_session_maker() as session:
+            # Guarded by the attempt number so a worker whose lock expired can't overwrite the new owner
+            await session.execute(
+                update(Job)
+                .where(Job.id == job.id, Job.attempts == job.attempts, Job.locked_by == self.name)
+                .values(locked_at=None, **values)
+            )
+            await session.commit()
+
+    async def _cleanup(self) -> None:
+        """Drop finished jobs after the retention period; failed ones are kept for inspection."""
+        if time.monotonic() - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = time.monotonic()
+        async with async_session_maker() as session:
+            await session.execute(
+                delete(Job).where(
+                    Job.status == "done",
+                    Job.finished_at < queue.utcnow() - timedelta(hours=settings.JOBS_RETENTION_HOURS),
+                )
+            )
+            await session.commit()
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import date
 from typing import Optional
@@ -9,21 +10,80 @@ from app.users.router import router as router_users
 from app.restaurants.router import router as router_restaurants 
 from fastapi.middleware.cors import CORSMiddleware
 from app.reviews.router import router as router_reviews 
+from app.payments.router import router as router_payments
+from app.jobs.router import router as router_jobs
+from app.jobs.worker import Worker
+from app.notifications.dispatcher import Dispatcher
+from app.realtime.broker import broker
+from app.realtime.router import router as router_realtime
+from app.monitoring.router import health_router, router as router_monitoring
+from app.monitoring import metrics, queries
+from app.overload.middleware import OverloadMiddleware
+from app.ratelimit.middleware import RateLimitMiddleware
+from app.config import settings
+import logging
 import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.restaurants.dao import RestaurantDAO
 from app.restaurants.schemas import RestaurantCreate
-from app.users.init_superuser import init_superuser
+from app.payments.stripe_utils import close_stripe_client, get_stripe_client
+from app.s3_utils import get_s3_client
+from app.database import StickyPrimaryMiddleware, dispose_engines
+from app.startup import run_startup_tasks
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up_clients():
+    """Import boto3/stripe and build their clients off the event loop, so the first upload or payment doesn't pay for it."""
+    try:
+        get_s3_client()
+        get_stripe_client()
+    except Exception:
+        logger.exception("Client warm-up failed; clients will be created on first use")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize superuser
-    await init_superuser()
+    # One-time tasks (superuser); `python -m app.server` runs them once before forking workers
+    if settings.RUN_STARTUP_TASKS:
+        await run_startup_tasks()
+    worker = Worker() if settings.JOBS_WORKER_IN_PROCESS else None
+    worker_task = asyncio.create_task(worker.run()) if worker else None
+    dispatcher = Dispatcher() if settings.NOTIFICATIONS_DISPATCH_IN_PROCESS else None
+    dispatcher_task = asyncio.create_task(dispatcher.run()) if dispatcher else None
+    if settings.REALTIME_ENABLED:
+        await broker.start()
+    metrics_task = None
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROCESS_DIR:
+        metrics_task = asyncio.create_task(
+            metrics.share_snapshots(settings.METRICS_MULTIPROCESS_DIR, settings.METRICS_SHARE_SECONDS)
+        )
+    # Not awaited: the worker starts serving while the clients are built
+    warmup = asyncio.create_task(asyncio.to_thread(_warm_up_clients))
     yield
+    await warmup
+    await broker.stop()
+    if dispatcher:
+        dispatcher.stop()
+        await dispatcher_task
+    if worker:
+        worker.stop()
+        await worker_task
+        await worker.drain(settings.JOBS_SHUTDOWN_TIMEOUT_SECONDS)
+    await close_stripe_client()
+    if metrics_task:
+        metrics_task.cancel()
+        await asyncio.gather(metrics_task, return_exceptions=True)
+    # Each worker process owns its engines; close their connections before the process exits
+    await dispose_engines()
 
 app = FastAPI(lifespan=lifespan)
-print(f"init_superuser: {init_superuser}")
+# Innermost first: shedding only sees requests the rate limiter let through,
+# and CORS (outside both) still decorates their 429/503s for the browser
+app.add_middleware(StickyPrimaryMiddleware)
+app.add_middleware(OverloadMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins = ["http://localhost:8080"],
@@ -36,14 +96,34 @@ app.include_router(router_reviews)
 app.include_router(router_users)
 app.include_router(router_bookings)
 app.include_router(router_restaurants)
+app.include_router(router_payments)
+app.include_router(router_jobs)
+app.include_router(health_router)
+if settings.REALTIME_ENABLED:
+    app.include_router(router_realtime)
+if settings.METRICS_ENABLED:
+    app.include_router(router_monitoring)
 
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.perf_counter()
-    response = await call_next(request)
+    if not (settings.METRICS_ENABLED or queries.enabled()):
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+        return response
+
+    query_log = queries.QueryLog() if queries.enabled() else None
+    # call_next runs the endpoint in a child task, which inherits the stats from this context
+    with metrics.collect(query_log) as stats:
+        response = await call_next(request)
     process_time = time.perf_counter() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-DB-Queries"] = str(stats.query_count)
+    if settings.METRICS_ENABLED:
+        metrics.observe_request(request, response, process_time, stats)
+    if query_log is not None:
+        queries.check(f"{request.method} {metrics.route_label(request)}", query_log)
     return response
 
 @app.get("/")
@@ -51,8 +131,9 @@ def read_root():
     return {"message": "Hello, World! Backend is connected."}
 
 if __name__ == "__main__":
+    # Development server with autoreload; production runs `python -m app.server`
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
     
 async def seed_static_restaurants():
     async with AsyncSession(Engine) as db:
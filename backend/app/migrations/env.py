@@ -20,6 +20,12 @@ from app.restaurants.models import Restaurant, RestaurantImage
 from app.bookings.models import Bookings 
 from app.users.models import Users 
 from app.reviews.models import Reviews 
+from app.payments.models import Payment, RestaurantDraft 
+from app.jobs.models import Job 
+from app.notifications.models import Notification 
+from app.ratelimit.models import RateLimitBucket 
+from app.recommendations.models import SimilarRestaurant 
+from app.popularity.models import RestaurantPopularity 
  
 # this is the Alembic Config object, which provides 
 # access to the values within the .ini file in use. 
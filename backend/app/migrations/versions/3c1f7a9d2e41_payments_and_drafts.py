@@ -0,0 +1,52 @@
+"""payments_and_drafts
+
+Revision ID: 3c1f7a9d2e41
+Revises: b04eb7abe81f
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9d2e41'
+down_revision: Union[str, None] = 'b04eb7abe81f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('payments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('payment_intent_id', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('amount_total', sa.Integer(), nullable=True),
+    sa.Column('currency', sa.String(), nullable=True),
+    sa.Column('last_event_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id')
+    )
+    op.create_index(op.f('ix_payments_id'), 'payments', ['id'], unique=False)
+    op.create_table('restaurant_drafts',
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('claimed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('restaurant_drafts')
+    op.drop_index(op.f('ix_payments_id'), table_name='payments')
+    op.drop_table('payments')
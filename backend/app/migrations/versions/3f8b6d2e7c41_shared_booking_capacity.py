@@ -0,0 +1,54 @@
+"""shared_booking_capacity
+
+Revision ID: 3f8b6d2e7c41
+Revises: 7a5d1e9c3f60
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8b6d2e7c41'
+down_revision: Union[str, None] = '7a5d1e9c3f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Every existing venue stays "exclusive" and every existing booking a venue hire, so
+# booking_capacity starts empty; it only ever counts bookings made at shared venues.
+def upgrade() -> None:
+    op.add_column('restaurants', sa.Column('booking_mode', sa.String(), server_default='exclusive', nullable=False))
+    op.add_column('bookings', sa.Column('shared', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table(
+        'booking_capacity',
+        sa.Column('restaurant_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('booked', sa.Integer(), server_default='0', nullable=False),
+        sa.CheckConstraint('booked >= 0', name='ck_booking_capacity_booked'),
+        sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('restaurant_id', 'day'),
+    )
+    op.create_index('ix_booking_capacity_day', 'booking_capacity', ['day', 'restaurant_id'])
+    # Shared bookings overlap by design: the exclusion constraint now covers venue hires only
+    op.drop_constraint('bookings_no_overlap', 'bookings')
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap EXCLUDE USING gist "
+        "(restaurant_id WITH =, tstzrange(starts_at, ends_at) WITH &&) WHERE (status = 'confirmed' AND NOT shared)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('bookings_no_overlap', 'bookings')
+    # Fails if confirmed shared bookings overlap; reject or delete them first
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap EXCLUDE USING gist "
+        "(restaurant_id WITH =, tstzrange(starts_at, ends_at) WITH &&) WHERE (status = 'confirmed')"
+    )
+    op.drop_index('ix_booking_capacity_day', table_name='booking_capacity')
+    op.drop_table('booking_capacity')
+    op.drop_column('bookings', 'shared')
+    op.drop_column('restaurants', 'booking_mode')
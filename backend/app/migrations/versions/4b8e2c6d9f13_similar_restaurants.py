@@ -0,0 +1,37 @@
+"""similar_restaurants
+
+Revision ID: 4b8e2c6d9f13
+Revises: d7a3f5b81e26
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2c6d9f13'
+down_revision: Union[str, None] = 'd7a3f5b81e26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('similar_restaurants',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('similar_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_id'], ['restaurants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('restaurant_id', 'rank')
+    )
+    op.create_index(op.f('ix_similar_restaurants_similar_id'), 'similar_restaurants', ['similar_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_similar_restaurants_similar_id'), table_name='similar_restaurants')
+    op.drop_table('similar_restaurants')
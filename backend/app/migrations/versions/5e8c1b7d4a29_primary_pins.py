@@ -0,0 +1,30 @@
+"""primary_pins
+
+Revision ID: 5e8c1b7d4a29
+Revises: c6a2f8e4d917
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8c1b7d4a29'
+down_revision: Union[str, None] = 'c6a2f8e4d917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('primary_pins',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('until', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('primary_pins')
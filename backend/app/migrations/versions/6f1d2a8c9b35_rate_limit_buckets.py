@@ -0,0 +1,34 @@
+"""rate_limit_buckets
+
+Revision ID: 6f1d2a8c9b35
+Revises: a5e9c3d1b702
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1d2a8c9b35'
+down_revision: Union[str, None] = 'a5e9c3d1b702'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('full_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_rate_limit_buckets_full_at', 'rate_limit_buckets', ['full_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rate_limit_buckets_full_at', table_name='rate_limit_buckets')
+    op.drop_table('rate_limit_buckets')
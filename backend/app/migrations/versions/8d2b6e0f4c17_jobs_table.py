@@ -0,0 +1,50 @@
+"""jobs_table
+
+Revision ID: 8d2b6e0f4c17
+Revises: 3c1f7a9d2e41
+Create Date: 2026-10-18 13:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b6e0f4c17'
+down_revision: Union[str, None] = '3c1f7a9d2e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue', sa.String(), server_default='default', nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='5', nullable=False),
+    sa.Column('dedupe_key', sa.String(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('locked_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dedupe_key')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_index('ix_jobs_runnable', 'jobs', ['queue', 'run_at'], unique=False, postgresql_where=sa.text("status IN ('queued', 'running')"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_runnable', table_name='jobs', postgresql_where=sa.text("status IN ('queued', 'running')"))
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
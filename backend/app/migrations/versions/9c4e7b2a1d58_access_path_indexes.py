@@ -0,0 +1,38 @@
+"""access_path_indexes
+
+Revision ID: 9c4e7b2a1d58
+Revises: 6f1d2a8c9b35
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e7b2a1d58'
+down_revision: Union[str, None] = '6f1d2a8c9b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CONCURRENTLY builds don't block writes, but can't run inside a transaction.
+# A failed build leaves an INVALID index behind: drop it and rerun the upgrade.
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_restaurant_date_status', 'bookings', ['restaurant_id', 'booking_date', 'status'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_bookings_confirmed_date', 'bookings', ['booking_date'], unique=False, postgresql_include=['restaurant_id'], postgresql_where=sa.text("status = 'confirmed'"), postgresql_concurrently=True)
+        op.create_index(op.f('ix_reviews_restaurant_id'), 'reviews', ['restaurant_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_restaurant_images_restaurant_id'), 'restaurant_images', ['restaurant_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_restaurants_owner_id'), 'restaurants', ['owner_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_restaurants_owner_id'), table_name='restaurants', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_restaurant_images_restaurant_id'), table_name='restaurant_images', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_reviews_restaurant_id'), table_name='reviews', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_confirmed_date', table_name='bookings', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_restaurant_date_status', table_name='bookings', postgresql_concurrently=True)
@@ -0,0 +1,132 @@
+"""partition_bookings
+
+Revision ID: c6a2f8e4d917
+Revises: 3f8b6d2e7c41
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a2f8e4d917'
+down_revision: Union[str, None] = '3f8b6d2e7c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, user_id, restaurant_id, booking_date, starts_at, ends_at, slot, shared, status, booking_username, "
+    "email, phone_number, event_type, number_of_guests, additional_information"
+)
+
+
+def _create_bookings(**kw) -> None:
+    op.create_table(
+        'bookings',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('bookings_id_seq'::regclass)"), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('restaurant_id', sa.Integer(), nullable=False),
+        sa.Column('booking_date', sa.Date(), nullable=False),
+        sa.Column('starts_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('ends_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('slot', sa.String(), server_default='day', nullable=False),
+        sa.Column('shared', sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('booking_username', sa.String(), server_default='', nullable=False),
+        sa.Column('email', sa.String(), server_default='', nullable=False),
+        sa.Column('phone_number', sa.String(), server_default='', nullable=False),
+        sa.Column('event_type', sa.String(), server_default='', nullable=False),
+        sa.Column('number_of_guests', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('additional_information', sa.String(), nullable=True),
+        sa.CheckConstraint('ends_at > starts_at', name='ck_bookings_period'),
+        # Named: left to Postgres they'd become *_fkey1 while the other copy of the table exists
+        sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], name='bookings_restaurant_id_fkey'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='bookings_user_id_fkey'),
+        **kw
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_bookings_id', 'bookings', ['id'], unique=False)
+    op.create_index('ix_bookings_restaurant_date_status', 'bookings', ['restaurant_id', 'booking_date', 'status'], unique=False)
+    op.create_index('ix_bookings_confirmed_date', 'bookings', ['booking_date'], unique=False, postgresql_include=['restaurant_id'], postgresql_where=sa.text("status = 'confirmed'"))
+
+
+# Rebuilds bookings as a partitioned table: the rows are copied with the table locked, so
+# run it in a maintenance window. Months from the oldest booking to
+# BOOKINGS_PARTITION_MONTHS_AHEAD are created up front; later ones come from the daily
+# bookings.maintain_partitions job. A partitioned table can't hold the bookings_no_overlap
+# exclusion constraint nor be referenced by id alone, so the constraint becomes a plain
+# GiST index and notifications.booking_id loses its foreign key. f3b9d6a1c824 brings the
+# constraint back on the unpartitioned confirmed_hires table.
+#
+# Range lookups only read the booking_date partitions BOOKING_MAX_DAYS back
+# (booking_date_bounds), so the upgrade fails naming any booking that runs longer and
+# would silently drop out of them; shorten or split those first.
+def upgrade() -> None:
+    op.execute(sa.text(
+        "DO $$ DECLARE too_long text; total int; BEGIN "
+        "SELECT string_agg(id::text, ', ' ORDER BY id) FILTER (WHERE n <= 20), count(*) INTO too_long, total FROM ("
+        "SELECT id, row_number() OVER (ORDER BY id) AS n FROM bookings "
+        f"WHERE ((ends_at - interval '1 microsecond') AT TIME ZONE '{settings.VENUE_TIMEZONE}')::date - booking_date "
+        f">= {int(settings.BOOKING_MAX_DAYS)}) AS long_bookings; "
+        "IF total > 0 THEN RAISE EXCEPTION "
+        f"'% booking(s) span more than {int(settings.BOOKING_MAX_DAYS)} days (BOOKING_MAX_DAYS), ids: %', total, too_long; "
+        "END IF; END $$"
+    ))
+    op.drop_constraint('notifications_booking_id_fkey', 'notifications', type_='foreignkey')
+    op.rename_table('bookings', 'bookings_unpartitioned')
+    op.execute('ALTER TABLE bookings_unpartitioned RENAME CONSTRAINT bookings_pkey TO bookings_unpartitioned_pkey')
+    for index in ('ix_bookings_id', 'ix_bookings_restaurant_date_status', 'ix_bookings_confirmed_date'):
+        op.drop_index(index, table_name='bookings_unpartitioned')
+
+    _create_bookings(postgresql_partition_by='RANGE (booking_date)')
+    op.create_primary_key('bookings_pkey', 'bookings', ['id', 'booking_date'])
+    op.execute('ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id')
+    op.execute('CREATE TABLE bookings_default PARTITION OF bookings DEFAULT')
+    op.execute(sa.text(
+        "DO $$ DECLARE month date; BEGIN "
+        "FOR month IN SELECT generate_series("
+        "date_trunc('month', LEAST((SELECT min(booking_date) FROM bookings_unpartitioned), current_date)), "
+        f"date_trunc('month', current_date) + interval '{int(settings.BOOKINGS_PARTITION_MONTHS_AHEAD)} months', "
+        "interval '1 month')::date LOOP "
+        "EXECUTE format('CREATE TABLE %I PARTITION OF bookings FOR VALUES FROM (%L) TO (%L)', "
+        "'bookings_' || to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date); "
+        "END LOOP; END $$"
+    ))
+    op.execute(f'INSERT INTO bookings ({COLUMNS}) SELECT {COLUMNS} FROM bookings_unpartitioned')
+    op.drop_table('bookings_unpartitioned')
+
+    # Built after the copy; each is created on every partition, present and future
+    _create_indexes()
+    op.execute(
+        "CREATE INDEX ix_bookings_confirmed_period ON bookings USING gist "
+        "(restaurant_id, tstzrange(starts_at, ends_at)) WHERE status = 'confirmed' AND NOT shared"
+    )
+
+
+def downgrade() -> None:
+    # Archived months (schema bookings_archive) are not brought back
+    op.rename_table('bookings', 'bookings_partitioned')
+    op.execute('ALTER TABLE bookings_partitioned RENAME CONSTRAINT bookings_pkey TO bookings_partitioned_pkey')
+    for index in ('ix_bookings_id', 'ix_bookings_restaurant_date_status', 'ix_bookings_confirmed_date', 'ix_bookings_confirmed_period'):
+        op.drop_index(index, table_name='bookings_partitioned')
+
+    _create_bookings()
+    op.create_primary_key('bookings_pkey', 'bookings', ['id'])
+    op.execute('ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id')
+    op.execute(f'INSERT INTO bookings ({COLUMNS}) SELECT {COLUMNS} FROM bookings_partitioned')
+    op.drop_table('bookings_partitioned')
+
+    _create_indexes()
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap EXCLUDE USING gist "
+        "(restaurant_id WITH =, tstzrange(starts_at, ends_at) WITH &&) WHERE (status = 'confirmed' AND NOT shared)"
+    )
+    op.execute('UPDATE notifications SET booking_id = NULL WHERE booking_id NOT IN (SELECT id FROM bookings)')
+    op.create_foreign_key('notifications_booking_id_fkey', 'notifications', 'bookings', ['booking_id'], ['id'], ondelete='SET NULL')
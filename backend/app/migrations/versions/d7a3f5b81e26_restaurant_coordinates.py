@@ -0,0 +1,36 @@
+"""restaurant_coordinates
+
+Revision ID: d7a3f5b81e26
+Revises: 9c4e7b2a1d58
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f5b81e26'
+down_revision: Union[str, None] = '9c4e7b2a1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# earthdistance (on top of cube) ships with PostgreSQL contrib, so no PostGIS install is needed.
+# Existing rows get coordinates from `python -m app.geo`.
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS cube')
+    op.execute('CREATE EXTENSION IF NOT EXISTS earthdistance')
+    op.add_column('restaurants', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('restaurants', sa.Column('longitude', sa.Float(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_restaurants_earth', 'restaurants', [sa.text('ll_to_earth(latitude, longitude)')], unique=False, postgresql_using='gist', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_restaurants_earth', table_name='restaurants', postgresql_concurrently=True)
+    op.drop_column('restaurants', 'longitude')
+    op.drop_column('restaurants', 'latitude')
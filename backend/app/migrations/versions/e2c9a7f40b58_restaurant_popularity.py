@@ -0,0 +1,42 @@
+"""restaurant_popularity
+
+Revision ID: e2c9a7f40b58
+Revises: 4b8e2c6d9f13
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c9a7f40b58'
+down_revision: Union[str, None] = '4b8e2c6d9f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows are filled by the first popularity.sweep job (queued at startup) or `python -m app.popularity`.
+def upgrade() -> None:
+    op.create_table('restaurant_popularity',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('review_sum', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('bookings_upcoming', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('bookings_30d', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('bookings_365d', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('refreshed_on', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('restaurant_id')
+    )
+    op.create_index('ix_restaurant_popularity_score', 'restaurant_popularity', ['score', 'restaurant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_restaurant_popularity_score', table_name='restaurant_popularity')
+    op.drop_table('restaurant_popularity')
@@ -0,0 +1,46 @@
+"""confirmed_hires
+
+Revision ID: f3b9d6a1c824
+Revises: 5e8c1b7d4a29
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d6a1c824'
+down_revision: Union[str, None] = '5e8c1b7d4a29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Brings back, on a table of its own, the overlap guarantee bookings_no_overlap gave before
+# bookings was partitioned. The confirmed venue hires are copied over before the constraint
+# is added, so if any overlap (written while only the advisory lock guarded them) the upgrade
+# fails naming the rows; reject one of each pair first.
+def upgrade() -> None:
+    op.create_table('confirmed_hires',
+    sa.Column('booking_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('starts_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('booking_id')
+    )
+    op.execute(
+        "INSERT INTO confirmed_hires (booking_id, restaurant_id, starts_at, ends_at) "
+        "SELECT id, restaurant_id, starts_at, ends_at FROM bookings WHERE status = 'confirmed' AND NOT shared"
+    )
+    # op.create_exclude_constraint only takes plain columns, not the range expression
+    op.execute(
+        "ALTER TABLE confirmed_hires ADD CONSTRAINT confirmed_hires_no_overlap EXCLUDE USING gist "
+        "(restaurant_id WITH =, tstzrange(starts_at, ends_at) WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('confirmed_hires')
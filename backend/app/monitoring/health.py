@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine, replica_engines
+from app.s3_utils import get_s3_client
+
+logger = logging.getLogger(__name__)
+
+
+async def _timed(probe) -> dict:
+    started = time.perf_counter()
+    try:
+        details = await asyncio.wait_for(probe(), settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+        result = {"status": "ok", **(details or {})}
+    except asyncio.TimeoutError:
+        result = {"status": "error", "error": f"timed out after {settings.HEALTH_PROBE_TIMEOUT_SECONDS}s"}
+    except Exception as e:
+        result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def check_database(db_engine=None) -> None:
+    async with (db_engine or engine).connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+_s3_probe: Optional[asyncio.Future] = None
+
+
+async def check_s3() -> None:
+    global _s3_probe
+    # head_bucket is a single cheap request, but boto3 blocks a thread until it gives up;
+    # while one is still hanging later probes wait on it instead of starting another
+    if _s3_probe is None or _s3_probe.done():
+        # Building the client imports boto3 the first time, so that runs in the thread too
+        _s3_probe = asyncio.ensure_future(
+            asyncio.to_thread(lambda: get_s3_client().head_bucket(Bucket=settings.aws_s3_bucket_name))
+        )
+        _s3_probe.add_done_callback(lambda f: f.cancelled() or f.exception())
+    await asyncio.shield(_s3_probe)
+
+
+async def check_pool() -> dict:
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        # NullPool: every checkout is a fresh connection, nothing to saturate
+        return {"pool": type(pool).__name__}
+    capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+    in_use = pool.checkedout()
+    usage = in_use / capacity if capacity else 0
+    details = {"pool": type(pool).__name__, "in_use": in_use, "capacity": capacity, "usage": round(usage, 2)}
+    if usage >= settings.HEALTH_POOL_MAX_USAGE:
+        raise RuntimeError(f"pool {in_use}/{capacity} checked out")
+    return details
+
+
+PROBES = {
+    "database": check_database,
+    "s3": check_s3,
+    "pool": check_pool,
+}
+for number, replica in enumerate(replica_engines):
+    PROBES[f"replica_{number}"] = partial(check_database, replica)
+
+
+class HealthChecker:
+    """Runs the dependency probes at most once per HEALTH_CACHE_TTL_SECONDS.
+
+    Concurrent callers share the in-flight run, so a burst of probes from the
+    orchestrator or load balancer costs one SELECT 1 and one HEAD request.
+    """
+
+    def __init__(self):
+        self._report: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def report(self) -> dict:
+        if self._fresh():
+            return self._report
+        async with self._lock:
+            if not self._fresh():
+                self._report = await self._run()
+                self._checked_at = time.monotonic()
+        return self._report
+
+    def _fresh(self) -> bool:
+        return self._report is not None and time.monotonic() - self._checked_at < settings.HEALTH_CACHE_TTL_SECONDS
+
+    async def _run(self) -> dict:
+        names = list(PROBES)
+        results = await asyncio.gather(*(_timed(PROBES[name]) for name in names))
+        checks: Dict[str, dict] = dict(zip(names, results))
+        unhealthy = [name for name, result in checks.items() if result["status"] != "ok"]
+        # Bookings and reads don't need S3: without it only uploads fail, so the worker stays in rotation
+        failed = [name for name in unhealthy if name != "s3" or settings.HEALTH_S3_REQUIRED]
+        if unhealthy:
+            logger.warning(f"Readiness check {'failed' if failed else 'degraded'}: {', '.join(unhealthy)}")
+        status = "error" if failed else "degraded" if unhealthy else "ok"
+        return {"status": status, "checks": checks}
+
+
+health_checker = HealthChecker()
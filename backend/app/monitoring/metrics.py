@@ -0,0 +1,351 @@
+import asyncio
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Latency buckets in seconds, tuned for an API whose requests mostly take 5ms-2s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter, rendered in Prometheus text format."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> list:
+        return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(total, value):
+        return value if total is None else total + value
+
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        values = self._values if values is None else values
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in values.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, e.g. open connections."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = value
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, rendered in Prometheus text format."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        state = self._values.get(key)
+        if state is None:
+            state = [0] * (len(self.buckets) + 2)
+            self._values[key] = state
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        else:
+            state[len(self.buckets)] += 1
+        state[-1] += value
+
+    def snapshot(self) -> list:
+        return [[list(key), state] for key, state in self._values.items()]
+
+    @staticmethod
+    def merge(total, state):
+        return list(state) if total is None else [a + b for a, b in zip(total, state)]
+
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        lines = []
+        values = self._values if values is None else values
+        for key, state in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            cumulative += state[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsRegistry:
+    """Metrics of this process.
+
+    Under several worker processes each scrape of /metrics reaches one of them,
+    so every worker writes its values to a shared directory (write_snapshot) and
+    render(directory) answers with all of them added up: counters and histograms
+    of every worker that ever ran, so they never go backwards when one exits, and
+    gauges of the running ones only.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def write_snapshot(self, directory: str, pid: Optional[int] = None) -> None:
+        """Replace this process's file in `directory` with its current values."""
+        pid = os.getpid() if pid is None else pid
+        path = os.path.join(directory, f"{pid}.json")
+        with open(f"{path}.tmp", "w") as file:
+            json.dump({name: metric.snapshot() for name, metric in self._metrics.items()}, file)
+        # Readers see the old file or the new one, never half of it
+        os.replace(f"{path}.tmp", path)
+
+    def _merged(self, directory: str) -> Dict[str, Dict]:
+        self.write_snapshot(directory)
+        merged = {name: {} for name in self._metrics}
+        for filename in os.listdir(directory):
+            if not filename.endswith(".json"):
+                continue
+            running = _is_running(int(filename[:-len(".json")]))
+            try:
+                with open(os.path.join(directory, filename)) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for name, values in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.type_name == "gauge" and not running):
+                    continue
+                for key, value in values:
+                    key = tuple(key)
+                    merged[name][key] = metric.merge(merged[name].get(key), value)
+        return merged
+
+    def render(self, directory: Optional[str] = None) -> str:
+        """Render every registered metric in the Prometheus text exposition format.
+
+        With `directory`, the sum over every worker's snapshot there, this one's included.
+        """
+        merged = self._merged(directory) if directory else {}
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples(merged.get(metric.name)))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+async def share_snapshots(directory: str, interval: float) -> None:
+    """Keep this worker's snapshot in `directory` at most `interval` seconds old, until cancelled."""
+    try:
+        while True:
+            REGISTRY.write_snapshot(directory)
+            await asyncio.sleep(interval)
+    finally:
+        # The last values of an exiting worker keep counting towards the totals
+        REGISTRY.write_snapshot(directory)
+
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Wall time spent handling a request",
+    ("method", "route", "status")
+))
+REQUEST_DB_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries",
+    "Number of SQL statements executed per request",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS
+))
+REQUEST_DB_DURATION = REGISTRY.register(Histogram(
+    "http_request_db_duration_seconds",
+    "Total time spent executing SQL per request",
+    ("method", "route")
+))
+RESPONSE_SIZE = REGISTRY.register(Histogram(
+    "http_response_size_bytes",
+    "Size of response bodies",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS
+))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "db_pool_wait_seconds",
+    "Time spent checking a connection out of the pool, including waiting for a free one and opening a new one"
+))
+DB_QUERIES_TOTAL = REGISTRY.register(Counter(
+    "db_queries_total",
+    "SQL statements executed, including those outside of a request"
+))
+
+
+class RequestStats:
+    """Per-request database counters filled in by the SQLAlchemy event hooks."""
+
+    __slots__ = ("query_count", "db_time", "pool_wait", "query_log")
+
+    def __init__(self, query_log=None):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        # Optional app.monitoring.queries.QueryLog, only set when statement tracking is on
+        self.query_log = query_log
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def collect(query_log=None):
+    """Attach a fresh RequestStats to the current context for the duration of the block.
+
+    In middleware this must wrap call_next so the endpoint task inherits the stats.
+    """
+    stats = RequestStats(query_log)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def route_label(request) -> str:
+    """Use the route template instead of the raw path to keep label cardinality bounded."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+def observe_request(request, response, duration: float, stats: RequestStats) -> None:
+    method = request.method
+    route = route_label(request)
+    REQUEST_DURATION.observe(duration, method=method, route=route, status=response.status_code)
+    REQUEST_DB_QUERIES.observe(stats.query_count, method=method, route=route)
+    REQUEST_DB_DURATION.observe(stats.db_time, method=method, route=route)
+    content_length = response.headers.get("content-length")
+    if content_length is not None:
+        RESPONSE_SIZE.observe(int(content_length), method=method, route=route)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERIES_TOTAL.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.db_time += elapsed
+        if stats.query_log is not None:
+            stats.query_log.record(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements, keep the timing stack balanced
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def _timed_checkout(raw_connection):
+    # The pool has no "before checkout" event; every Connection (and so every
+    # Session) gets its DBAPI connection through Engine.raw_connection
+    @functools.wraps(raw_connection)
+    def checkout():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_POOL_WAIT.observe(elapsed)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.pool_wait += elapsed
+
+    return checkout
+
+
+def is_instrumented(engine: AsyncEngine) -> bool:
+    return event.contains(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Register the query/connection hooks on an async engine; a no-op if they are already there."""
+    if is_instrumented(engine):
+        return
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    sync_engine.raw_connection = _timed_checkout(sync_engine.raw_connection)
@@ -0,0 +1,36 @@
+"""Pytest fixtures for asserting query budgets.
+
+Enable with `pytest_plugins = ["app.monitoring.pytest_plugin"]` in a conftest.py, then:
+
+    async def test_restaurant_detail(db, query_budget):
+        with query_budget(2):
+            await RestaurantDAO.get_restaurant_by_id(db, 1)
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.database import engine
+from app.monitoring.metrics import instrument_engine
+from app.monitoring.queries import track_queries
+
+
+@pytest.fixture
+def query_budget():
+    """Fail the test if the block runs more than `max_queries` statements or repeats one (N+1)."""
+    # With METRICS_ENABLED off and QUERY_BUDGET_MODE "off" the app's engine has no hooks,
+    # and every budget would pass with 0 queries counted
+    instrument_engine(engine)
+
+    @contextmanager
+    def assert_budget(max_queries: int, allow_repeats: bool = False):
+        with track_queries() as query_log:
+            yield query_log
+        assert query_log.total <= max_queries, (
+            f"Expected at most {max_queries} queries, got {query_log.summary()}"
+        )
+        if not allow_repeats:
+            repeated = query_log.repeated()
+            assert not repeated, f"Repeated statements (possible N+1): {query_log.summary()}"
+
+    return assert_budget
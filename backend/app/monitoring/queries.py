@@ -0,0 +1,98 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_POSTCOMPILE_RE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.I)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape so the same query with different values groups together."""
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _POSTCOMPILE_RE.sub("(?)", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryLog:
+    """Statements executed within one request (or one tracked block), grouped by normalized SQL."""
+
+    def __init__(self, slow_query_ms: Optional[float] = None):
+        self.slow_query_ms = settings.SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
+        self.counts: Counter = Counter()
+        self.durations: Dict[str, float] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        key = normalize_sql(statement)
+        self.counts[key] += 1
+        self.durations[key] = self.durations.get(key, 0.0) + elapsed
+        if self.slow_query_ms and elapsed * 1000 >= self.slow_query_ms:
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {key}")
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, the usual signature of an N+1 loop."""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return [(sql, count) for sql, count in self.counts.most_common() if count >= threshold]
+
+    def summary(self) -> str:
+        lines = [f"{self.total} queries, {len(self.counts)} distinct"]
+        for sql, count in self.counts.most_common():
+            lines.append(f"  {count:>4}x {self.durations[sql] * 1000:8.1f} ms  {sql}")
+        return "\n".join(lines)
+
+
+def enabled() -> bool:
+    return settings.QUERY_BUDGET_MODE in ("log", "raise")
+
+
+def budget_for(route_key: str) -> int:
+    """Budget for a "METHOD /route/{template}" key, falling back to QUERY_BUDGET_DEFAULT."""
+    return settings.QUERY_BUDGETS.get(route_key, settings.QUERY_BUDGET_DEFAULT)
+
+
+def check(route_key: str, query_log: QueryLog) -> None:
+    """Log (or raise, in "raise" mode) when a request went over budget or repeated statements."""
+    problems = []
+    budget = budget_for(route_key)
+    if query_log.total > budget:
+        problems.append(f"{query_log.total} queries exceed the budget of {budget}")
+    for sql, count in query_log.repeated():
+        problems.append(f"possible N+1, {count}x: {sql}")
+    if not problems:
+        return
+
+    message = f"{route_key}: " + "; ".join(problems)
+    if settings.QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(f"{message}\n{query_log.summary()}")
+    logger.warning(message)
+
+
+@contextmanager
+def track_queries():
+    """Collect every statement executed inside the block, e.g. around a DAO call in a test."""
+    query_log = QueryLog()
+    with metrics.collect(query_log):
+        yield query_log
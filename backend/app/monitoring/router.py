@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.config import settings
+from app.monitoring.health import health_checker
+from app.monitoring.metrics import REGISTRY
+
+router = APIRouter(
+    tags=["Monitoring"]
+)
+
+health_router = APIRouter(
+    prefix="/health",
+    tags=["Monitoring"]
+)
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Expose collected metrics in the Prometheus text format"""
+    return PlainTextResponse(
+        REGISTRY.render(settings.METRICS_MULTIPROCESS_DIR),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@health_router.get("/live")
+async def liveness():
+    """The process is up and its event loop answers; restart the worker if this fails"""
+    return {"status": "ok"}
+
+@health_router.get("/ready")
+async def readiness():
+    """Database, S3 and connection pool status with per-probe latency; 503 takes the worker out of rotation.
+
+    "degraded" (200): only an optional dependency, S3 unless HEALTH_S3_REQUIRED, is down.
+    """
+    report = await health_checker.report()
+    return JSONResponse(report, status_code=503 if report["status"] == "error" else 200)
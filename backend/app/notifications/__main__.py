@@ -0,0 +1,29 @@
+"""Run the notification dispatcher outside the API process.
+
+    python -m app.notifications
+
+Set NOTIFICATIONS_DISPATCH_IN_PROCESS=false on the API when running this.
+Several dispatchers may run at once; SKIP LOCKED keeps their batches disjoint.
+"""
+import asyncio
+import logging
+import signal
+
+from app.database import engine
+from app.notifications.dispatcher import Dispatcher
+
+
+async def main() -> None:
+    dispatcher = Dispatcher()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, dispatcher.stop)
+    try:
+        await dispatcher.run()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.bookings.models import Bookings
+from app.config import settings
+from app.jobs.queue import utcnow
+from app.notifications import dispatcher
+from app.notifications.models import Notification
+from app.restaurants.models import Restaurant
+
+GUEST_MESSAGES = {
+    "booking.created": ("Booking request received", "We received your request to book {restaurant} on {date}. You'll hear from us once the venue responds."),
+    "booking.confirmed": ("Booking confirmed", "Your booking at {restaurant} on {date} is confirmed."),
+    "booking.rejected": ("Booking declined", "Unfortunately {restaurant} cannot host your event on {date}."),
+}
+OWNER_MESSAGES = {
+    "booking.created": ("New booking request", "{guest} requested {restaurant} on {date} for {guests} guests ({event_type})."),
+}
+
+
+class NotificationDAO:
+    @staticmethod
+    def queue_booking_notifications(db: AsyncSession, booking: Bookings, restaurant: Restaurant, event: str) -> None:
+        """Add outbox rows for a booking event; they are committed (or rolled back) with the caller's transaction."""
+        if not settings.NOTIFICATIONS_ENABLED:
+            return
+        context = {
+            "restaurant": restaurant.name,
+            "date": booking.booking_date.isoformat(),
+            "guest": booking.booking_username,
+            "guests": booking.number_of_guests,
+            "event_type": booking.event_type,
+        }
+        recipients = []
+        if event in GUEST_MESSAGES:
+            recipients.append((GUEST_MESSAGES[event], booking.email, booking.phone_number))
+        if event in OWNER_MESSAGES:
+            recipients.append((OWNER_MESSAGES[event], restaurant.contact_email, restaurant.contact_phone))
+
+        now = utcnow()
+        for (subject, template), email, phone in recipients:
+            body = template.format(**context)
+            for channel, recipient in (("email", email), ("sms", phone)):
+                if recipient:
+                    db.add(Notification(
+                        channel=channel,
+                        recipient=recipient,
+                        subject=subject if channel == "email" else None,
+                        body=body,
+                        event=event,
+                        booking_id=booking.id,
+                        next_attempt_at=now,
+                    ))
+        dispatcher.wakeup()
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy import and_, or_, select, update
+
+from app.config import settings
+from app.database import async_session_maker
+from app.jobs.queue import utcnow
+from app.jobs.worker import backoff_seconds
+from app.monitoring.metrics import REGISTRY, Counter
+from app.notifications.models import Notification
+from app.notifications.senders import get_sender
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "sms")
+# A batch still marked "sending" after this long belongs to a dispatcher that died
+SENDING_TIMEOUT = timedelta(minutes=5)
+
+NOTIFICATIONS_SENT = REGISTRY.register(Counter(
+    "notifications_sent_total",
+    "Outbox notifications handled by the dispatcher, by outcome (sent, retry, failed)",
+    ("channel", "outcome")
+))
+
+_wakeup = asyncio.Event()
+
+
+def wakeup() -> None:
+    _wakeup.set()
+
+
+class Dispatcher:
+    """Drains the notification outbox in per-channel batches, off the request path."""
+
+    def __init__(self, batch_size: int = None, poll_interval: float = None):
+        self.batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.NOTIFICATIONS_POLL_INTERVAL
+        self._running = False
+
+    async def run(self) -> None:
+        self._running = True
+        while self._running:
+            _wakeup.clear()
+            sent_full_batch = False
+            for channel in CHANNELS:
+                try:
+                    sent_full_batch |= await self.dispatch(channel) >= self.batch_size
+                except Exception:
+                    logger.exception(f"Failed to dispatch {channel} notifications")
+            if sent_full_batch:
+                continue
+            try:
+                await asyncio.wait_for(_wakeup.wait(), self.poll_interval)
+                # Let the writer's transaction commit and let more notifications pile up into the batch
+                await asyncio.sleep(settings.NOTIFICATIONS_BATCH_WINDOW_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._running = False
+        _wakeup.set()
+
+    async def dispatch(self, channel: str) -> int:
+        """Send one batch for a channel; returns how many notifications it contained."""
+        batch = await self._claim(channel)
+        if not batch:
+            return 0
+        try:
+            errors = await get_sender(channel).send_batch(batch)
+        except Exception as e:
+            logger.warning(f"{channel} batch of {len(batch)} failed: {e}")
+            errors = {notification.id: f"{type(e).__name__}: {e}" for notification in batch}
+        await self._record(channel, batch, errors)
+        return len(batch)
+
+    async def _claim(self, channel: str) -> List[Notification]:
+        now = utcnow()
+        candidates = (
+            select(Notification.id)
+            .where(
+                Notification.channel == channel,
+                or_(
+                    and_(Notification.status == "pending", Notification.next_attempt_at <= now),
+                    and_(Notification.status == "sending", Notification.locked_at < now - SENDING_TIMEOUT),
+                ),
+            )
+            .order_by(Notification.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session_maker() as session:
+            result = await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(candidates.scalar_subquery()))
+                .values(status="sending", locked_at=now, attempts=Notification.attempts + 1)
+                .returning(Notification)
+            )
+            batch = list(result.scalars())
+            await session.commit()
+        return batch
+
+    async def _record(self, channel: str, batch: List[Notification], errors: dict) -> None:
+        now = utcnow()
+        sent_ids = [notification.id for notification in batch if notification.id not in errors]
+        async with async_session_maker() as session:
+            if sent_ids:
+                await session.execute(
+                    update(Notification)
+                    .where(Notification.id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, locked_at=None, last_error=None)
+                )
+            for notification in batch:
+                if notification.id not in errors:
+                    continue
+                if notification.attempts < settings.NOTIFICATIONS_MAX_ATTEMPTS:
+                    values = {"status": "pending", "next_attempt_at": now + timedelta(seconds=backoff_seconds(notification.attempts))}
+                    NOTIFICATIONS_SENT.inc(channel=channel, outcome="retry")
+                else:
+                    values = {"status": "failed"}
+                    NOTIFICATIONS_SENT.inc(channel=channel, outcome="failed")
+                await session.execute(
+                    update(Notification)
+                    .where(Notification.id == notification.id)
+                    .values(locked_at=None, last_error=errors[notification.id][:2000], **values)
+                )
+            await session.commit()
+        NOTIFICATIONS_SENT.inc(len(sent_ids), channel=channel, outcome="sent")
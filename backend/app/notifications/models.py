@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Index, Integer, String, Text, TIMESTAMP, text
+from app.database import Base
+
+
+class Notification(Base):
+    """Outbox row, written in the same transaction as the change it reports."""
+    __tablename__ = "notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String, nullable=False)  # "email" or "sms"
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=True)
+    body = Column(Text, nullable=False)
+    event = Column(String, nullable=False)  # e.g. "booking.confirmed"
+    booking_id = Column(Integer, nullable=True)  # No FK: bookings is partitioned, its id alone isn't a unique key
+    status = Column(String, nullable=False, server_default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
+    locked_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    sent_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notifications_pending", "channel", "next_attempt_at", postgresql_where=text("status IN ('pending', 'sending')")),
+    )
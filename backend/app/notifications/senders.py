@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import smtplib
+from collections import deque
+from email.message import EmailMessage
+from typing import Deque, Dict, List, Protocol
+
+import httpx
+
+from app.config import settings
+from app.notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class Sender(Protocol):
+    async def send_batch(self, notifications: List[Notification]) -> Dict[int, str]:
+        """Deliver a batch; returns {notification id: error} for the ones that failed."""
+
+
+class FakeSink:
+    """Logs messages instead of sending them, keeping the last `max_kept` for tests to inspect.
+
+    The default backend, so it runs in the API process: what it keeps must stay bounded.
+    """
+
+    def __init__(self, max_kept: int = 1000):
+        self.sent: Deque[Notification] = deque(maxlen=max_kept)
+
+    async def send_batch(self, notifications: List[Notification]) -> Dict[int, str]:
+        self.sent.extend(notifications)
+        for notification in notifications:
+            logger.info(f"[fake {notification.channel}] to {notification.recipient}: {notification.body}")
+        return {}
+
+
+class SmtpSender:
+    """Sends a whole batch over one SMTP connection, in a thread so the event loop isn't blocked."""
+
+    async def send_batch(self, notifications: List[Notification]) -> Dict[int, str]:
+        return await asyncio.to_thread(self._send, notifications)
+
+    def _send(self, notifications: List[Notification]) -> Dict[int, str]:
+        errors = {}
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS) as smtp:
+            if settings.SMTP_STARTTLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            for notification in notifications:
+                message = EmailMessage()
+                message["From"] = settings.SMTP_FROM
+                message["To"] = notification.recipient
+                message["Subject"] = notification.subject or ""
+                message.set_content(notification.body)
+                try:
+                    smtp.send_message(message)
+                except smtplib.SMTPException as e:
+                    errors[notification.id] = str(e)
+        return errors
+
+
+class HttpSmsSender:
+    """Posts a batch to an SMS gateway that accepts many messages per request."""
+
+    async def send_batch(self, notifications: List[Notification]) -> Dict[int, str]:
+        async with httpx.AsyncClient(timeout=settings.SMS_API_TIMEOUT_SECONDS) as client:
+            response = await client.post(
+                settings.SMS_API_URL,
+                headers={"Authorization": f"Bearer {settings.SMS_API_TOKEN}"},
+                json={
+                    "sender": settings.SMS_SENDER,
+                    "messages": [
+                        {"id": str(notification.id), "to": notification.recipient, "text": notification.body}
+                        for notification in notifications
+                    ],
+                },
+            )
+        response.raise_for_status()
+        return {}
+
+
+_fake_sink = FakeSink()
+
+BACKENDS = {
+    "email": {"fake": lambda: _fake_sink, "smtp": SmtpSender},
+    "sms": {"fake": lambda: _fake_sink, "http": HttpSmsSender},
+}
+
+
+def get_sender(channel: str) -> Sender:
+    backend = settings.NOTIFICATIONS_EMAIL_BACKEND if channel == "email" else settings.NOTIFICATIONS_SMS_BACKEND
+    return BACKENDS[channel][backend]()
+
+
+def fake_sink() -> FakeSink:
+    return _fake_sink
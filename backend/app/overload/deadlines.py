@@ -0,0 +1,49 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float):
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, None outside a request."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def propagate_to_statements(engine: AsyncEngine) -> None:
+    """Cap every transaction opened during a request at the request's remaining time.
+
+    Postgres then cancels a slow query itself when nobody is waiting for the
+    answer any more, instead of holding the connection after the client is gone.
+    Outside requests the connection-level statement_timeout still applies.
+    """
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _set_statement_timeout(conn):
+        left = remaining()
+        if left is None:
+            return
+        # set_config(..., true) is SET LOCAL: it lasts until the end of this transaction only;
+        # never 0, which means "no limit". The value is bound so every transaction reuses one
+        # prepared statement instead of filling the statement cache with one-off texts.
+        # A raw cursor keeps it out of the per-request query counts and budgets.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SELECT set_config('statement_timeout', $1, true)", (str(max(1, int(left * 1000))),))
+        finally:
+            cursor.close()
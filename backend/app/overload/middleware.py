@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.config import settings
+from app.monitoring.metrics import REGISTRY, Counter, Gauge
+from app.overload.deadlines import deadline
+
+logger = logging.getLogger(__name__)
+
+# Long-lived or operational endpoints that must never be queued, shed or cut off
+EXEMPT_PREFIXES = ("/events/", "/health/", "/metrics")
+
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled, by route class",
+    ("route_class",)
+))
+CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "http_concurrency_limit",
+    "Current in-flight cap per route class (moves when adaptive concurrency is on)",
+    ("route_class",)
+))
+REQUESTS_SHED = REGISTRY.register(Counter(
+    "http_requests_shed_total",
+    "Requests answered 503 (queue full or queued too long) or 504 (deadline passed), by route class",
+    ("route_class", "reason")
+))
+
+
+def route_class(method: str, path: str) -> str:
+    if "/upload-image" in path:
+        return "upload"
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return "read"
+    return "write"
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests in flight, a bounded FIFO queue behind them.
+
+    With `adaptive` on, the limit follows observed latency (AIMD): it grows by
+    about one per `limit` fast completions and shrinks by 10% whenever a
+    request is slower than `target_latency`, between 1 and `max_limit`.
+    """
+
+    def __init__(self, name: str, max_limit: int, max_queue: int, target_latency: float, adaptive: bool = False):
+        self.name = name
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.target_latency = target_latency
+        self.adaptive = adaptive
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        CONCURRENCY_LIMIT.set(max_limit, route_class=name)
+
+    async def acquire(self, timeout: float) -> Optional[str]:
+        """Take a slot; returns the reason ("queue_full", "queue_timeout") when the request must be shed."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._take()
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Handed a slot just as the wait ran out: give it back
+                self.release(None)
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release(None)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return None
+
+    def release(self, latency: Optional[float]) -> None:
+        self.in_flight -= 1
+        IN_FLIGHT.dec(route_class=self.name)
+        if self.adaptive and latency is not None:
+            if latency > self.target_latency:
+                self.limit = max(1.0, self.limit * 0.9)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            CONCURRENCY_LIMIT.set(int(self.limit), route_class=self.name)
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        IN_FLIGHT.inc(route_class=self.name)
+
+
+class OverloadMiddleware:
+    """Per-class concurrency caps, 503 load shedding and per-request deadlines.
+
+    Requests over a class's cap wait in a short queue; when it is full or the
+    wait exceeds OVERLOAD_QUEUE_TIMEOUT_SECONDS they get 503 + Retry-After, so
+    the requests already admitted keep their latency. Admitted requests get a
+    deadline (REQUEST_TIMEOUTS), also applied to their SQL as statement_timeout,
+    and 504 if it passes before the response has started.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.limiters: Dict[str, ConcurrencyLimiter] = {
+            name: ConcurrencyLimiter(
+                name,
+                max_limit=limit,
+                max_queue=settings.OVERLOAD_MAX_QUEUE.get(name, limit),
+                target_latency=settings.REQUEST_TIMEOUTS[name] * settings.OVERLOAD_TARGET_LATENCY_SHARE,
+                adaptive=settings.OVERLOAD_ADAPTIVE,
+            )
+            for name, limit in settings.CONCURRENCY_LIMITS.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.OVERLOAD_ENABLED or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        name = route_class(scope["method"], scope["path"])
+        limiter = self.limiters[name]
+        timeout = settings.REQUEST_TIMEOUTS[name]
+        started = time.monotonic()
+        reason = await limiter.acquire(min(settings.OVERLOAD_QUEUE_TIMEOUT_SECONDS, timeout))
+        if reason is not None:
+            REQUESTS_SHED.inc(route_class=name, reason=reason)
+            await _respond(send, 503, "Server is overloaded, retry shortly", retry_after=1)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        latency = None
+        # The deadline counts from arrival, so time spent queued is included
+        left = timeout - (time.monotonic() - started)
+        timer = asyncio.timeout(left)
+        try:
+            with deadline(left):
+                async with timer:
+                    await self.app(scope, receive, send_wrapper)
+            latency = time.monotonic() - started
+        except TimeoutError:
+            if not timer.expired():
+                raise
+            latency = timeout
+            REQUESTS_SHED.inc(route_class=name, reason="deadline")
+            logger.warning(f"{scope['method']} {scope['path']} exceeded its {timeout}s deadline")
+            if not response_started:
+                await _respond(send, 504, "Request timed out")
+        finally:
+            limiter.release(latency)
+
+
+async def _respond(send, status: int, detail: str, retry_after: Optional[int] = None) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(retry_after).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,73 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for `reset_timeout` seconds after repeated failures.
+
+    closed -> open after `failure_threshold` consecutive failures; open -> half-open once
+    `reset_timeout` has passed, letting a single trial call through; success closes it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, is_failure=None):
+        self.name = name
+        # Decides which exceptions count against the dependency (e.g. not a declined card)
+        self.is_failure = is_failure or (lambda exc: True)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        if state == "half-open":
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            logger.warning(f"{self.name} circuit opened after {self.failures} failures")
+
+    async def call(self, func, *args, **kwargs):
+        self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as exc:
+            if self.is_failure(exc):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Cancelled (e.g. by a request deadline): says nothing about the dependency,
+            # but the trial slot has to be freed or the circuit stays half-open for good
+            self._trial_in_flight = False
+            raise
+        self.record_success()
+        return result
@@ -0,0 +1,81 @@
+from typing import Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.payments.models import Payment, RestaurantDraft
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentDAO:
+    @staticmethod
+    async def record_checkout_session(
+        db: AsyncSession,
+        session_id: str,
+        status: str,
+        payment_intent_id: Optional[str] = None,
+        amount_total: Optional[int] = None,
+        currency: Optional[str] = None,
+        event_id: Optional[str] = None,
+    ) -> None:
+        """Upsert the payment for a checkout session; redelivered or out-of-order events never undo "paid"."""
+        stmt = insert(Payment).values(
+            session_id=session_id,
+            status=status,
+            payment_intent_id=payment_intent_id,
+            amount_total=amount_total,
+            currency=currency,
+            last_event_id=event_id,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Payment.session_id],
+            set_={
+                "status": stmt.excluded.status,
+                "payment_intent_id": func.coalesce(stmt.excluded.payment_intent_id, Payment.payment_intent_id),
+                "amount_total": func.coalesce(stmt.excluded.amount_total, Payment.amount_total),
+                "currency": func.coalesce(stmt.excluded.currency, Payment.currency),
+                "last_event_id": stmt.excluded.last_event_id,
+                "updated_at": func.now(),
+            },
+            where=Payment.status != "paid",
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    @staticmethod
+    async def get_payment(db: AsyncSession, session_id: str) -> Optional[Payment]:
+        result = await db.execute(select(Payment).where(Payment.session_id == session_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def save_draft(db: AsyncSession, session_id: str, owner_id: int, data: dict) -> None:
+        """Store the form for a checkout session; a resubmitted form maps to the same session and is ignored."""
+        stmt = insert(RestaurantDraft).values(session_id=session_id, owner_id=owner_id, data=data)
+        await db.execute(stmt.on_conflict_do_nothing(index_elements=[RestaurantDraft.session_id]))
+        await db.commit()
+
+    @staticmethod
+    async def claim_draft(db: AsyncSession, session_id: str) -> Optional[RestaurantDraft]:
+        """The draft, row-locked until the transaction creating its restaurant ends.
+
+        A concurrent request waits here and then sees restaurant_id set. Nothing is
+        written to take the claim, so a crash or cancellation mid-creation just
+        rolls back and leaves the draft free for a retry.
+        """
+        result = await db.execute(
+            select(RestaurantDraft)
+            .where(RestaurantDraft.session_id == session_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def complete_draft(db: AsyncSession, session_id: str, restaurant_id: int) -> None:
+        """Link the draft to its restaurant; not committed, so it lands in the same transaction as the restaurant."""
+        await db.execute(
+            update(RestaurantDraft)
+            .where(RestaurantDraft.session_id == session_id)
+            .values(restaurant_id=restaurant_id, claimed_at=func.now())
+        )
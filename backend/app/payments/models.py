@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, TIMESTAMP, text
+from app.database import Base
+
+
+class Payment(Base):
+    """Checkout sessions as reported by Stripe webhooks, one row per session."""
+    __tablename__ = "payments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, unique=True, nullable=False)
+    payment_intent_id = Column(String, nullable=True)
+    status = Column(String, nullable=False)  # "paid", "unpaid", "no_payment_required" or "failed"
+    amount_total = Column(Integer, nullable=True)  # In cents
+    currency = Column(String, nullable=True)
+    last_event_id = Column(String, nullable=True)  # Stripe event that last changed this row
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=text("now()"))
+
+
+class RestaurantDraft(Base):
+    """Restaurant form submitted before checkout, kept until the payment is confirmed."""
+    __tablename__ = "restaurant_drafts"
+
+    session_id = Column(String, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    data = Column(JSON, nullable=False)
+    claimed_at = Column(TIMESTAMP(timezone=True), nullable=True)  # When its restaurant was created
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.database import get_db
+from app.payments.dao import PaymentDAO
+from app.payments.stripe_utils import construct_webhook_event
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/payments",
+    tags=["Payments"]
+)
+
+# Checkout event type -> payment status to record (None: take it from the session)
+CHECKOUT_EVENTS = {
+    "checkout.session.completed": None,
+    "checkout.session.async_payment_succeeded": "paid",
+    "checkout.session.async_payment_failed": "failed",
+    "checkout.session.expired": "expired",
+}
+
+
+@router.post("/webhook/stripe")
+async def stripe_webhook(
+    request: Request,
+    stripe_signature: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Record checkout results pushed by Stripe. Safe to receive the same event more than once."""
+    event = construct_webhook_event(await request.body(), stripe_signature)
+    if event.type not in CHECKOUT_EVENTS:
+        return {"received": True}
+
+    session = event.data.object
+    await PaymentDAO.record_checkout_session(
+        db,
+        session_id=session.id,
+        status=CHECKOUT_EVENTS[event.type] or session.payment_status,
+        payment_intent_id=session.get("payment_intent"),
+        amount_total=session.get("amount_total"),
+        currency=session.get("currency"),
+        event_id=event.id,
+    )
+    logger.info(f"Recorded {event.type} for checkout session {session.id}")
+    return {"received": True}
@@ -1,32 +1,119 @@
-import stripe
+import hashlib
+import json
+import threading
+from typing import TYPE_CHECKING, Optional
+from uuid import uuid4
+
 from app.config import settings
+from app.payments.circuit_breaker import CircuitBreaker, CircuitOpenError
 from fastapi import HTTPException
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+# The stripe package takes most of a second to import, so it is only loaded on first use
+if TYPE_CHECKING:
+    import stripe
 
-async def create_payment_intent(amount: int, currency: str = "usd"):
-    """Создает платежное намерение в Stripe."""
+_client: Optional["stripe.StripeClient"] = None
+_http_client: Optional["stripe.HTTPXClient"] = None
+_client_lock = threading.Lock()
+
+
+def _is_provider_failure(exc: Exception) -> bool:
+    """Only outages and throttling trip the breaker, not declined cards or bad requests."""
+    import stripe
+
+    if isinstance(exc, (stripe.error.APIConnectionError, stripe.error.RateLimitError)):
+        return True
+    return isinstance(exc, stripe.error.APIError) and (exc.http_status or 500) >= 500
+
+
+stripe_breaker = CircuitBreaker(
+    "stripe",
+    failure_threshold=settings.STRIPE_BREAKER_FAILURES,
+    reset_timeout=settings.STRIPE_BREAKER_RESET_SECONDS,
+    is_failure=_is_provider_failure,
+)
+
+
+def get_stripe_client() -> "stripe.StripeClient":
+    """Shared client; requests go through one pooled httpx.AsyncClient on the event loop."""
+    global _client, _http_client
+    if _client is None:
+        # Also built from a thread by the lifespan warm-up
+        with _client_lock:
+            if _client is None:
+                import httpx
+                import stripe
+
+                _http_client = stripe.HTTPXClient(
+                    timeout=httpx.Timeout(settings.STRIPE_TIMEOUT_SECONDS, connect=settings.STRIPE_CONNECT_TIMEOUT_SECONDS)
+                )
+                base_addresses = {"api": settings.STRIPE_API_BASE} if settings.STRIPE_API_BASE else {}
+                _client = stripe.StripeClient(
+                    settings.STRIPE_SECRET_KEY,
+                    http_client=_http_client,
+                    # Stripe retries connection errors, 409s and 5xx with backoff, reusing the idempotency key
+                    max_network_retries=settings.STRIPE_MAX_RETRIES,
+                    base_addresses=base_addresses,
+                )
+    return _client
+
+
+async def close_stripe_client() -> None:
+    global _client, _http_client
+    if _http_client is not None:
+        await _http_client.close_async()
+    _client = None
+    _http_client = None
+
+
+def make_idempotency_key(*parts) -> str:
+    """Stable key for a logical operation, so a resubmitted form reuses the same Stripe object."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _call_stripe(method, params: dict, error_prefix: str, key: Optional[str] = None):
+    import stripe
+
+    options = {"idempotency_key": key} if key else {}
     try:
-        intent = stripe.PaymentIntent.create(
-            amount=amount,  # Сумма в центах (10 USD = 1000 центов)
-            currency=currency,
-            payment_method_types=["card"],
-            description="Admin fee for restaurant upload",
-        )
-        return intent
+        return await stripe_breaker.call(method, params, options)
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="Payment provider temporarily unavailable")
     except stripe.error.StripeError as e:
-        raise HTTPException(status_code=400, detail=f"Payment error: {str(e)}")
+        if _is_provider_failure(e):
+            raise HTTPException(status_code=503, detail=f"{error_prefix}: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"{error_prefix}: {str(e)}")
+
+
+async def create_payment_intent(amount: int, currency: str = "usd", idempotency_key: Optional[str] = None):
+    """Создает платежное намерение в Stripe."""
+    return await _call_stripe(
+        get_stripe_client().payment_intents.create_async,
+        {
+            "amount": amount,  # Сумма в центах (10 USD = 1000 центов)
+            "currency": currency,
+            "payment_method_types": ["card"],
+            "description": "Admin fee for restaurant upload",
+        },
+        "Payment error",
+        idempotency_key or str(uuid4()),
+    )
+
 
 async def confirm_payment_intent(payment_intent_id: str, payment_method: str):
     """Подтверждает платежное намерение."""
-    try:
-        intent = stripe.PaymentIntent.confirm(
-            payment_intent_id,
-            payment_method=payment_method,
-        )
-        return intent
-    except stripe.error.StripeError as e:
-        raise HTTPException(status_code=400, detail=f"Payment confirmation error: {str(e)}")
+    client = get_stripe_client()
+
+    async def confirm(params, options):
+        return await client.payment_intents.confirm_async(payment_intent_id, params, options)
+
+    return await _call_stripe(
+        confirm,
+        {"payment_method": payment_method},
+        "Payment confirmation error",
+        f"confirm:{payment_intent_id}:{payment_method}",
+    )
 
 
 async def create_checkout_session(
@@ -34,11 +121,13 @@ async def create_checkout_session(
     currency: str = "usd",
     success_url: str = "http://localhost:8080/success?session_id={CHECKOUT_SESSION_ID}",
     cancel_url: str = "http://localhost:8080/cancel",
+    idempotency_key: Optional[str] = None,
 ):
-    try:
-        session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
-            line_items=[
+    return await _call_stripe(
+        get_stripe_client().checkout.sessions.create_async,
+        {
+            "payment_method_types": ["card"],
+            "line_items": [
                 {
                     "price_data": {
                         "currency": currency,
@@ -50,10 +139,31 @@ async def create_checkout_session(
                     "quantity": 1,
                 }
             ],
-            mode="payment",
-            success_url=success_url,
-            cancel_url=cancel_url,
-        )
-        return session
-    except stripe.error.StripeError as e:
-        raise HTTPException(status_code=400, detail=f"Checkout error: {str(e)}")
\ No newline at end of file
+            "mode": "payment",
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+        },
+        "Checkout error",
+        idempotency_key or str(uuid4()),
+    )
+
+
+async def retrieve_checkout_session(session_id: str):
+    client = get_stripe_client()
+
+    async def retrieve(params, options):
+        return await client.checkout.sessions.retrieve_async(session_id, params, options)
+
+    return await _call_stripe(retrieve, {}, "Payment verification error")
+
+
+def construct_webhook_event(payload: bytes, sig_header: Optional[str]):
+    """Verify the Stripe-Signature header; events older than the signing tolerance are rejected as replays."""
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Stripe webhooks are not configured")
+    import stripe
+
+    try:
+        return stripe.Webhook.construct_event(payload, sig_header or "", settings.STRIPE_WEBHOOK_SECRET)
+    except (ValueError, stripe.error.SignatureVerificationError):
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
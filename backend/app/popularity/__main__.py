@@ -0,0 +1,41 @@
+"""Bring the popularity rollup up to date now, without the job queue.
+
+    python -m app.popularity          # missing rows and crossed windows, like the daily sweep
+    python -m app.popularity --all    # recount every restaurant
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from sqlalchemy import select
+
+from app.database import async_session_maker, engine
+from app.popularity.dao import PopularityDAO
+from app.restaurants.models import Restaurant
+from app.reviews.models import Reviews  # noqa: F401, Restaurant.reviews needs it mapped
+from app.users.models import Users  # noqa: F401
+
+
+async def main(args) -> None:
+    started = time.perf_counter()
+    today = date.today()
+    async with async_session_maker() as db:
+        if args.all:
+            restaurant_ids = (await db.execute(select(Restaurant.id))).scalars().all()
+        else:
+            restaurant_ids = await PopularityDAO.get_stale(db, today)
+        refreshed = await PopularityDAO.refresh(db, restaurant_ids, today)
+        await PopularityDAO.advance(db, today)
+    await engine.dispose()
+    print(f"Refreshed {refreshed} restaurants in {time.perf_counter() - started:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="recount every restaurant, not just stale ones")
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,172 @@
+import math
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.bookings.models import Bookings
+from app.config import settings
+from app.popularity.models import RestaurantPopularity
+from app.popularity.schemas import PopularRestaurantResponse
+from app.restaurants.models import Restaurant
+from app.restaurants.schemas import RestaurantImageSchema
+from app.reviews.models import Reviews
+
+# Restaurants recounted per statement
+REFRESH_BATCH_SIZE = 500
+
+
+def popularity_score(review_count: int, review_sum: int, upcoming: int, last_30: int, last_365: int):
+    """(Bayesian rating, score) from the rollup counters.
+
+    Few reviews are pulled towards POPULARITY_PRIOR_RATING, so one 5-star
+    review doesn't top the list. Bookings count logarithmically: the recent
+    term (upcoming and last 30 days) keeps the ranking current, the yearly
+    one keeps established venues from dropping out in a quiet month.
+    """
+    prior_weight = settings.POPULARITY_PRIOR_WEIGHT
+    rating = (prior_weight * settings.POPULARITY_PRIOR_RATING + review_sum) / (prior_weight + review_count)
+    weights = settings.POPULARITY_WEIGHTS
+    score = (
+        weights["rating"] * (rating - 1) / 4
+        + weights["recent"] * math.log1p(upcoming + last_30)
+        + weights["trailing"] * math.log1p(last_365)
+    )
+    return rating, score
+
+
+class PopularityDAO:
+    @staticmethod
+    async def get_popular(
+        db: AsyncSession,
+        limit: int,
+        category: Optional[str] = None
+    ) -> List[PopularRestaurantResponse]:
+        """Highest scores first, read off ix_restaurant_popularity_score."""
+        query = (
+            select(RestaurantPopularity, Restaurant)
+            .join(Restaurant, Restaurant.id == RestaurantPopularity.restaurant_id)
+            .order_by(RestaurantPopularity.score.desc(), RestaurantPopularity.restaurant_id.desc())
+            .limit(limit)
+            .options(selectinload(Restaurant.images))
+        )
+        if category is not None:
+            query = query.where(Restaurant.category == category)
+        result = await db.execute(query)
+        return [
+            PopularRestaurantResponse(
+                id=restaurant.id,
+                name=restaurant.name,
+                location=restaurant.location,
+                category=restaurant.category,
+                capacity=restaurant.capacity,
+                price_range=restaurant.price_range,
+                rating=round(popularity.rating, 2),
+                review_count=popularity.review_count,
+                bookings_30d=popularity.bookings_30d,
+                bookings_upcoming=popularity.bookings_upcoming,
+                score=round(popularity.score, 4),
+                images=[RestaurantImageSchema(id=img.id, url=img.url) for img in restaurant.images]
+            )
+            for popularity, restaurant in result.all()
+        ]
+
+    @staticmethod
+    async def refresh(db: AsyncSession, restaurant_ids: Iterable[int], today: date) -> int:
+        """Recount the given restaurants from their reviews and confirmed bookings (both indexed by restaurant)."""
+        ids = sorted(set(restaurant_ids))
+        refreshed = 0
+        for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+            batch = ids[start:start + REFRESH_BATCH_SIZE]
+            # Restaurants deleted since the refresh was queued simply drop out here
+            existing = (await db.execute(select(Restaurant.id).where(Restaurant.id.in_(batch)))).scalars().all()
+            if not existing:
+                continue
+            reviews = {
+                restaurant_id: (count, total)
+                for restaurant_id, count, total in await db.execute(
+                    select(Reviews.restaurant_id, func.count(), func.coalesce(func.sum(Reviews.rating), 0))
+                    .where(Reviews.restaurant_id.in_(existing))
+                    .group_by(Reviews.restaurant_id)
+                )
+            }
+            bookings = {
+                restaurant_id: (upcoming, last_30, last_365)
+                for restaurant_id, upcoming, last_30, last_365 in await db.execute(
+                    select(
+                        Bookings.restaurant_id,
+                        func.count().filter(Bookings.booking_date > today),
+                        func.count().filter(Bookings.booking_date.between(today - timedelta(days=29), today)),
+                        func.count().filter(Bookings.booking_date <= today),
+                    )
+                    .where(
+                        Bookings.restaurant_id.in_(existing),
+                        Bookings.status == "confirmed",
+                        Bookings.booking_date > today - timedelta(days=365)
+                    )
+                    .group_by(Bookings.restaurant_id)
+                )
+            }
+            rows = []
+            for restaurant_id in existing:
+                review_count, review_sum = reviews.get(restaurant_id, (0, 0))
+                upcoming, last_30, last_365 = bookings.get(restaurant_id, (0, 0, 0))
+                rating, score = popularity_score(review_count, review_sum, upcoming, last_30, last_365)
+                rows.append({
+                    "restaurant_id": restaurant_id,
+                    "review_count": review_count,
+                    "review_sum": review_sum,
+                    "rating": rating,
+                    "bookings_upcoming": upcoming,
+                    "bookings_30d": last_30,
+                    "bookings_365d": last_365,
+                    "score": score,
+                    "refreshed_on": today,
+                })
+            stmt = insert(RestaurantPopularity).values(rows)
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[RestaurantPopularity.restaurant_id],
+                set_={
+                    **{column: stmt.excluded[column] for column in rows[0] if column != "restaurant_id"},
+                    "updated_at": func.now(),
+                },
+            ))
+            refreshed += len(rows)
+        await db.commit()
+        return refreshed
+
+    @staticmethod
+    async def get_stale(db: AsyncSession, today: date) -> Set[int]:
+        """Restaurants whose row is missing, or whose windows gained or lost a confirmed booking since refreshed_on."""
+        stale = set((await db.execute(
+            select(Restaurant.id)
+            .outerjoin(RestaurantPopularity, RestaurantPopularity.restaurant_id == Restaurant.id)
+            .where(RestaurantPopularity.restaurant_id.is_(None))
+        )).scalars())
+        days = (await db.execute(
+            select(RestaurantPopularity.refreshed_on).where(RestaurantPopularity.refreshed_on < today).distinct()
+        )).scalars().all()
+        for refreshed_on in days:
+            # Windows end on their day: moving from refreshed_on to today, bookings on these days changed bucket
+            crossed = [
+                Bookings.booking_date.between(refreshed_on + timedelta(days=1), today),  # upcoming -> past
+                Bookings.booking_date.between(refreshed_on - timedelta(days=29), today - timedelta(days=30)),
+                Bookings.booking_date.between(refreshed_on - timedelta(days=364), today - timedelta(days=365)),
+            ]
+            stale.update((await db.execute(
+                select(Bookings.restaurant_id).distinct()
+                .join(RestaurantPopularity, RestaurantPopularity.restaurant_id == Bookings.restaurant_id)
+                .where(RestaurantPopularity.refreshed_on == refreshed_on, Bookings.status == "confirmed", or_(*crossed))
+            )).scalars())
+        return stale
+
+    @staticmethod
+    async def advance(db: AsyncSession, today: date) -> None:
+        """Rows get_stale didn't return are already exact for today; record that so tomorrow's check is one day again."""
+        await db.execute(
+            update(RestaurantPopularity).where(RestaurantPopularity.refreshed_on < today).values(refreshed_on=today)
+        )
+        await db.commit()
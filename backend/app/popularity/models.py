@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, Integer, TIMESTAMP, text
+
+from app.database import Base
+
+
+class RestaurantPopularity(Base):
+    """Rollup behind "top venues": one row per restaurant, refreshed by app/popularity jobs.
+
+    Booking counts are exact as of refreshed_on; the daily sweep moves every
+    row forward, recounting only restaurants with bookings on the days that
+    entered or left a window.
+    """
+    __tablename__ = "restaurant_popularity"
+
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, server_default="0")
+    review_sum = Column(Integer, nullable=False, server_default="0")
+    rating = Column(Float, nullable=False)  # Bayesian average: reviews plus POPULARITY_PRIOR_WEIGHT prior votes
+    bookings_upcoming = Column(Integer, nullable=False, server_default="0")  # Confirmed, after refreshed_on
+    bookings_30d = Column(Integer, nullable=False, server_default="0")  # Confirmed, the 30 days up to refreshed_on
+    bookings_365d = Column(Integer, nullable=False, server_default="0")
+    score = Column(Float, nullable=False)
+    refreshed_on = Column(Date, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=text("now()"))
+
+    __table_args__ = (
+        # ORDER BY score DESC, restaurant_id DESC LIMIT n walks this backwards and stops after n rows
+        Index("ix_restaurant_popularity_score", "score", "restaurant_id"),
+    )
@@ -0,0 +1,20 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.restaurants.schemas import RestaurantImageSchema
+
+
+class PopularRestaurantResponse(BaseModel):
+    id: int
+    name: str
+    location: str
+    category: str
+    capacity: int
+    price_range: str
+    rating: float  # Bayesian review average
+    review_count: int
+    bookings_30d: int
+    bookings_upcoming: int
+    score: float
+    images: List[RestaurantImageSchema]
@@ -0,0 +1,41 @@
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.jobs.queue import enqueue_debounced, enqueue_periodic, task
+from app.popularity.dao import PopularityDAO
+
+
+@task("popularity.refresh_restaurant")
+async def refresh_restaurant_popularity(payload: dict) -> dict:
+    async with async_session_maker() as db:
+        refreshed = await PopularityDAO.refresh(db, [payload["restaurant_id"]], date.today())
+    return {"restaurants": refreshed}
+
+
+@task("popularity.sweep")
+async def sweep_popularity(payload: dict) -> dict:
+    """Daily: move every row's windows to today, recounting only restaurants with bookings that crossed a window edge."""
+    today = date.today()
+    async with async_session_maker() as db:
+        stale = await PopularityDAO.get_stale(db, today)
+        refreshed = await PopularityDAO.refresh(db, stale, today)
+        await PopularityDAO.advance(db, today)
+    if payload.get("periodic"):
+        await schedule_sweep(next_period=True)
+    return {"restaurants": refreshed}
+
+
+async def queue_refresh(db: AsyncSession, restaurant_id: int) -> None:
+    """Recount a restaurant once its current burst of booking/review changes is over; commits with the caller."""
+    await enqueue_debounced(
+        db, "popularity.refresh_restaurant", {"restaurant_id": restaurant_id},
+        key=str(restaurant_id), window=settings.POPULARITY_REFRESH_DELAY_SECONDS,
+    )
+
+
+async def schedule_sweep(next_period: bool = False) -> None:
+    async with async_session_maker() as db:
+        await enqueue_periodic(db, "popularity.sweep", 86400, {"periodic": True}, next_period)
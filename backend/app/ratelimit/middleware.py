@@ -0,0 +1,104 @@
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Pattern
+
+from starlette.routing import compile_path
+
+from app.config import settings
+from app.monitoring.metrics import REGISTRY, Counter
+from app.ratelimit.stores import RateLimitStore, get_store
+from app.users.tokens import scope_subject
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+RATE_LIMITED = REGISTRY.register(Counter(
+    "rate_limited_total",
+    "Requests rejected with 429, by rule and client kind (user or ip)",
+    ("rule", "kind")
+))
+
+
+@dataclass
+class Rule:
+    name: str  # The RATE_LIMITS key, e.g. "POST /auth/login"
+    method: str
+    pattern: Pattern
+    rate: float  # Tokens refilled per second
+    burst: float  # Bucket size
+
+
+def parse_rule(name: str, limit: str) -> Rule:
+    """`"POST /auth/login"`, `"10/minute"` or `"10/minute burst 20"` -> Rule; the burst defaults to the count."""
+    method, path = name.split(" ", 1)
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)(?:\s+burst\s+(\d+))?\s*", limit)
+    if match is None:
+        raise ValueError(f"Invalid rate limit for {name!r}: {limit!r}")
+    count, period, burst = int(match[1]), match[2], match[3]
+    pattern, _, _ = compile_path(path)
+    return Rule(name, method.upper(), pattern, count / PERIODS[period], float(burst or count))
+
+
+def client_key(scope) -> str:
+    """Bucket owner: the signed-in user if the Bearer token (or access cookie) is valid, else the client IP."""
+    user_id = scope_subject(scope)
+    if user_id:
+        return f"user:{user_id}"
+    # Behind a proxy uvicorn's proxy_headers has already replaced this with the forwarded address
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Token-bucket limits for the routes listed in RATE_LIMITS, answered with 429 and Retry-After.
+
+    Plain ASGI middleware: unlisted routes (and event streams) pass straight through.
+    """
+
+    def __init__(self, app, rules: Optional[List[Rule]] = None, store: Optional[RateLimitStore] = None):
+        self.app = app
+        self.rules = rules if rules is not None else [parse_rule(name, limit) for name, limit in settings.RATE_LIMITS.items()]
+        self.store = store or get_store()
+
+    def match(self, scope) -> Optional[Rule]:
+        for rule in self.rules:
+            if rule.method == scope["method"] and rule.pattern.match(scope["path"]):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        rule = self.match(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(scope)
+        try:
+            allowed, retry_after = await self.store.take(f"{rule.name}:{key}", rule.rate, rule.burst)
+        except Exception:
+            # Fail open: a store outage must not take the endpoints down with it
+            logger.exception(f"Rate limit store failed for {rule.name}")
+            allowed, retry_after = True, 0.0
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc(rule=rule.name, kind=key.split(":", 1)[0])
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
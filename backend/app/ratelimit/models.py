@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, Index, String, TIMESTAMP
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket shared by all workers when RATE_LIMIT_STORE is "postgres"."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)  # "<rule>:user:<id>" or "<rule>:ip:<address>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    full_at = Column(TIMESTAMP(timezone=True), nullable=False)  # Refilled by then, so the row can go
+
+    __table_args__ = (
+        Index("ix_rate_limit_buckets_full_at", "full_at"),
+    )
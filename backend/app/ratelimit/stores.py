@@ -0,0 +1,93 @@
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Protocol, Tuple
+
+from sqlalchemy import text
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitStore(Protocol):
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> Tuple[bool, float]:
+        """Take `cost` tokens from the bucket; returns (allowed, seconds until that would succeed)."""
+
+
+class MemoryStore:
+    """Buckets in this process only: each worker enforces its own share of the limit.
+
+    Bounded to RATE_LIMIT_MEMORY_MAX_KEYS; the least recently used buckets are
+    dropped first, and those are the ones most likely to be full again anyway.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+# asyncpg needs explicit types for bare parameters in arithmetic
+_RATE, _BURST, _COST = "CAST(:rate AS float8)", "CAST(:burst AS float8)", "CAST(:cost AS float8)"
+_REFILLED = f"LEAST({_BURST}, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * {_RATE})"
+# Refill and take in one statement; the WHERE leaves the row untouched (and returns nothing) when denied
+TAKE_SQL = text(f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at, full_at)
+    VALUES (:key, {_BURST} - {_COST}, clock_timestamp(), clock_timestamp() + make_interval(secs => {_COST} / {_RATE}))
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = {_REFILLED} - {_COST},
+        updated_at = clock_timestamp(),
+        full_at = clock_timestamp() + make_interval(secs => ({_BURST} - {_REFILLED} + {_COST}) / {_RATE})
+    WHERE {_REFILLED} >= {_COST}
+    RETURNING tokens
+""")
+AVAILABLE_SQL = text(f"""
+    SELECT LEAST({_BURST}, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * {_RATE})
+    FROM rate_limit_buckets WHERE key = :key
+""")
+PURGE_SQL = text("DELETE FROM rate_limit_buckets WHERE full_at < clock_timestamp()")
+
+
+class PostgresStore:
+    """Buckets in the rate_limit_buckets table, so the limit holds across workers and replicas.
+
+    Costs one statement per limited request; only the expensive endpoints are limited.
+    """
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> Tuple[bool, float]:
+        from app.database import engine
+
+        params = {"key": key, "rate": float(rate), "burst": float(burst), "cost": float(cost)}
+        async with engine.begin() as conn:
+            if (await conn.execute(TAKE_SQL, params)).first() is not None:
+                allowed, retry_after = True, 0.0
+            else:
+                available = (await conn.execute(AVAILABLE_SQL, params)).scalar() or 0
+                allowed, retry_after = False, (cost - available) / rate
+            if random.random() < settings.RATE_LIMIT_PURGE_PROBABILITY:
+                # Full buckets behave exactly like missing ones
+                await conn.execute(PURGE_SQL)
+        return allowed, retry_after
+
+
+STORES = {
+    "memory": lambda: MemoryStore(settings.RATE_LIMIT_MEMORY_MAX_KEYS),
+    "postgres": PostgresStore,
+}
+
+
+def get_store() -> RateLimitStore:
+    return STORES[settings.RATE_LIMIT_STORE]()
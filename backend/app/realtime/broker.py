@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+import asyncpg
+from sqlalchemy import ARRAY, Text, bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.monitoring.metrics import REGISTRY, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "booking_events"
+RECONNECT_DELAY_SECONDS = 2
+
+SUBSCRIBERS = REGISTRY.register(Gauge(
+    "realtime_subscribers",
+    "Open event streams in this process"
+))
+EVENTS_DELIVERED = REGISTRY.register(Counter(
+    "realtime_events_delivered_total",
+    "Events pushed to stream subscribers, by type",
+    ("type",)
+))
+
+
+class Subscription:
+    def __init__(self, restaurant_id: int):
+        self.restaurant_id = restaurant_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.REALTIME_QUEUE_SIZE)
+
+
+class Broker:
+    """Fans booking events out to this process's subscribers.
+
+    Every process keeps one dedicated LISTEN connection, so an event committed
+    by any worker reaches the subscribers of all workers without polling.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, restaurant_id: int) -> Optional[Subscription]:
+        """None when this process already serves REALTIME_MAX_SUBSCRIBERS streams."""
+        if self._count >= settings.REALTIME_MAX_SUBSCRIBERS:
+            return None
+        subscription = Subscription(restaurant_id)
+        self._subscriptions[restaurant_id].add(subscription)
+        self._count += 1
+        SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.restaurant_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.restaurant_id]
+        self._count -= 1
+        SUBSCRIBERS.dec()
+
+    def deliver(self, payload: dict) -> None:
+        for subscription in list(self._subscriptions.get(payload["restaurant_id"], ())):
+            try:
+                subscription.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Slow consumer: end its stream (None), the client reconnects and refetches
+                self.unsubscribe(subscription)
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+            else:
+                EVENTS_DELIVERED.inc(type=payload["type"])
+
+    def _on_notify(self, connection, pid, channel, raw: str) -> None:
+        try:
+            self.deliver(json.loads(raw))
+        except (ValueError, KeyError):
+            logger.warning(f"Ignoring malformed {channel} payload: {raw!r}")
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    host=settings.DB_HOST,
+                    port=settings.DB_PORT,
+                    user=settings.DB_USER,
+                    password=settings.DB_PASS,
+                    database=settings.DB_NAME,
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                logger.info(f"Listening for {CHANNEL}")
+                await closed.wait()
+                logger.warning(f"{CHANNEL} listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{CHANNEL} listener failed ({e}), retrying in {RECONNECT_DELAY_SECONDS}s")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+broker = Broker()
+
+
+async def publish_booking_events(db: AsyncSession, bookings: Iterable, event_type: str) -> None:
+    """Announce booking changes; subscribers only hear about them if the caller's transaction commits.
+
+    One statement however many bookings (a series), with one notification each: a
+    single payload holding them all could outgrow NOTIFY's 8000 bytes.
+    """
+    if not settings.REALTIME_ENABLED:
+        return
+    # Availability data only: the stream is public, so no guest contact details
+    payloads = [
+        json.dumps({
+            "type": event_type,
+            "booking_id": booking.id,
+            "restaurant_id": booking.restaurant_id,
+            "booking_date": booking.booking_date.isoformat(),
+            "starts_at": booking.starts_at.isoformat(),
+            "ends_at": booking.ends_at.isoformat(),
+            "status": booking.status,
+        })
+        for booking in bookings
+    ]
+    if not payloads:
+        return
+    # NOTIFY is transactional: Postgres delivers it on commit and drops it on rollback
+    payload = func.unnest(bindparam("payloads", payloads, type_=ARRAY(Text))).table_valued("payload").render_derived()
+    await db.execute(select(func.pg_notify(CHANNEL, payload.c.payload)))
+
+
+async def publish_booking_event(db: AsyncSession, booking, event_type: str) -> None:
+    await publish_booking_events(db, [booking], event_type)
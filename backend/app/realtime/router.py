@@ -0,0 +1,44 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.realtime.broker import Subscription, broker
+
+router = APIRouter(
+    prefix="/events",
+    tags=["Events"]
+)
+
+
+async def _event_stream(request: Request, subscription: Subscription):
+    try:
+        # Ask EventSource to reconnect quickly if the stream drops
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscription.queue.get(), settings.REALTIME_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            if payload is None:
+                break
+            yield f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/restaurants/{restaurant_id}")
+async def restaurant_events(restaurant_id: int, request: Request):
+    """Server-Sent Events stream of booking created/confirmed/rejected deltas for one restaurant"""
+    subscription = broker.subscribe(restaurant_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many open event streams")
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,35 @@
+"""Recompute the "similar restaurants" lists now, without the job queue.
+
+    python -m app.recommendations
+    python -m app.recommendations --restaurant 42    # incremental, as after an edit
+"""
+import argparse
+import asyncio
+import time
+
+from app.database import async_session_maker, engine
+from app.recommendations.similarity import recompute_all, update_restaurant
+from app.reviews.models import Reviews  # noqa: F401, Restaurant.reviews needs it mapped
+from app.bookings.models import Bookings  # noqa: F401
+from app.users.models import Users  # noqa: F401
+
+
+async def main(args) -> None:
+    started = time.perf_counter()
+    async with async_session_maker() as db:
+        if args.restaurant is None:
+            result = await recompute_all(db)
+        else:
+            result = await update_restaurant(db, args.restaurant)
+    await engine.dispose()
+    print(f"Recomputed {result['restaurants']} neighbour lists in {time.perf_counter() - started:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurant", type=int, help="only the lists this restaurant can affect")
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,84 @@
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.recommendations.models import SimilarRestaurant
+from app.recommendations.schemas import SimilarRestaurantResponse
+from app.restaurants.models import Restaurant
+from app.restaurants.schemas import RestaurantImageSchema
+
+Neighbours = List[Tuple[int, float]]  # (similar restaurant id, score), best first
+
+
+class SimilarityDAO:
+    @staticmethod
+    async def get_similar(db: AsyncSession, restaurant_id: int, limit: int) -> List[SimilarRestaurantResponse]:
+        """The stored neighbour list: a primary key range scan joined to the restaurants it names."""
+        query = (
+            select(SimilarRestaurant.score, Restaurant)
+            .join(Restaurant, Restaurant.id == SimilarRestaurant.similar_id)
+            .where(SimilarRestaurant.restaurant_id == restaurant_id)
+            .order_by(SimilarRestaurant.rank)
+            .limit(limit)
+            .options(selectinload(Restaurant.images))
+        )
+        result = await db.execute(query)
+        return [
+            SimilarRestaurantResponse(
+                id=restaurant.id,
+                name=restaurant.name,
+                location=restaurant.location,
+                category=restaurant.category,
+                capacity=restaurant.capacity,
+                rating=restaurant.rating,
+                price_range=restaurant.price_range,
+                score=round(score, 4),
+                images=[RestaurantImageSchema(id=img.id, url=img.url) for img in restaurant.images]
+            )
+            for score, restaurant in result.all()
+        ]
+
+    @staticmethod
+    async def get_catalogue(db: AsyncSession) -> List[dict]:
+        """The columns the feature vectors are built from, for every restaurant."""
+        result = await db.execute(
+            select(
+                Restaurant.id, Restaurant.category, Restaurant.cuisines, Restaurant.features,
+                Restaurant.price_range, Restaurant.capacity
+            ).order_by(Restaurant.id)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def get_list_stats(db: AsyncSession) -> Dict[int, Tuple[int, float]]:
+        """restaurant_id -> (list length, lowest score in it)."""
+        result = await db.execute(
+            select(SimilarRestaurant.restaurant_id, func.count(), func.min(SimilarRestaurant.score))
+            .group_by(SimilarRestaurant.restaurant_id)
+        )
+        return {restaurant_id: (count, lowest) for restaurant_id, count, lowest in result.all()}
+
+    @staticmethod
+    async def get_lists_containing(db: AsyncSession, restaurant_id: int) -> Set[int]:
+        result = await db.execute(
+            select(SimilarRestaurant.restaurant_id).where(SimilarRestaurant.similar_id == restaurant_id)
+        )
+        return set(result.scalars())
+
+    @staticmethod
+    async def replace_lists(db: AsyncSession, lists: Dict[int, Neighbours], replace_all: bool = False) -> None:
+        """Swap in new neighbour lists in one transaction, so readers see either the old or the new list."""
+        if replace_all:
+            await db.execute(delete(SimilarRestaurant))
+        elif lists:
+            await db.execute(delete(SimilarRestaurant).where(SimilarRestaurant.restaurant_id.in_(list(lists))))
+        rows = [
+            {"restaurant_id": restaurant_id, "rank": rank, "similar_id": similar_id, "score": score}
+            for restaurant_id, neighbours in lists.items()
+            for rank, (similar_id, score) in enumerate(neighbours, start=1)
+        ]
+        if rows:
+            await db.execute(insert(SimilarRestaurant), rows)
+        await db.commit()
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, TIMESTAMP, text
+
+from app.database import Base
+
+
+class SimilarRestaurant(Base):
+    """Precomputed neighbour list: row `rank` (1 = most similar) of restaurant_id's top K."""
+    __tablename__ = "similar_restaurants"
+
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    # Indexed for the incremental update: whose lists contain a changed restaurant
+    similar_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)  # Cosine similarity of the feature vectors, 0..1
+    computed_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), nullable=False)
@@ -0,0 +1,17 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.restaurants.schemas import RestaurantImageSchema
+
+
+class SimilarRestaurantResponse(BaseModel):
+    id: int
+    name: str
+    location: str
+    category: str
+    capacity: int
+    rating: float
+    price_range: str
+    score: float
+    images: List[RestaurantImageSchema]
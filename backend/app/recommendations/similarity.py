@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.recommendations.dao import Neighbours, SimilarityDAO
+from app.recommendations.vectors import encode, top_k
+
+logger = logging.getLogger(__name__)
+
+
+def _neighbour_lists(catalogue: List[dict], matrix: np.ndarray, rows: Iterable[int]) -> Dict[int, Neighbours]:
+    ids = [restaurant["id"] for restaurant in catalogue]
+    return {
+        ids[row]: [(ids[neighbour], float(score)) for neighbour, score in zip(neighbours, scores)]
+        for row, neighbours, scores in top_k(
+            matrix, rows, settings.RECOMMENDATIONS_TOP_K, settings.RECOMMENDATIONS_BATCH_SIZE
+        )
+    }
+
+
+async def recompute_all(db: AsyncSession) -> dict:
+    """Rebuild every neighbour list from scratch."""
+    catalogue = await SimilarityDAO.get_catalogue(db)
+
+    def compute():
+        return _neighbour_lists(catalogue, encode(catalogue), range(len(catalogue))) if catalogue else {}
+
+    # Matrix products hold the GIL for milliseconds at a time; keep them off the event loop
+    lists = await asyncio.to_thread(compute)
+    await SimilarityDAO.replace_lists(db, lists, replace_all=True)
+    return {"restaurants": len(lists)}
+
+
+async def update_restaurant(db: AsyncSession, restaurant_id: int) -> dict:
+    """Refresh only the lists one created, changed or deleted restaurant can affect.
+
+    Those are its own list, every list it is currently in (its score there
+    changed), every list it now beats the last entry of, and lists shorter
+    than K (a deleted restaurant's cascade leaves gaps). Other venues' vectors
+    don't depend on this one, so all other lists are still exact.
+    """
+    catalogue = await SimilarityDAO.get_catalogue(db)
+    stats = await SimilarityDAO.get_list_stats(db)
+    containing = await SimilarityDAO.get_lists_containing(db, restaurant_id)
+    k = min(settings.RECOMMENDATIONS_TOP_K, len(catalogue) - 1)
+
+    def compute():
+        index = {restaurant["id"]: row for row, restaurant in enumerate(catalogue)}
+        matrix = encode(catalogue)
+        affected = {row for other, row in index.items() if stats.get(other, (0, 0.0))[0] < k}
+        affected.update(index[other] for other in containing if other in index)
+        if restaurant_id in index:
+            row = index[restaurant_id]
+            scores = matrix @ matrix[row]
+            affected.add(row)
+            for other, (_, lowest) in stats.items():
+                if other in index and other != restaurant_id and scores[index[other]] > lowest:
+                    affected.add(index[other])
+        return _neighbour_lists(catalogue, matrix, sorted(affected))
+
+    lists = await asyncio.to_thread(compute) if len(catalogue) > 1 else {}
+    await SimilarityDAO.replace_lists(db, lists)
+    logger.info(f"Restaurant {restaurant_id} changed: {len(lists)} of {len(catalogue)} neighbour lists recomputed")
+    return {"restaurants": len(lists)}
@@ -0,0 +1,37 @@
+from app.config import settings
+from app.database import async_session_maker
+from app.jobs.queue import enqueue_periodic, task
+
+# app.recommendations.similarity (NumPy) is imported by the handlers, not here:
+# the API imports this module to enqueue, and shouldn't pay NumPy's import time at boot
+
+
+@task("recommendations.recompute")
+async def recompute_recommendations(payload: dict) -> dict:
+    """Rebuild every "similar restaurants" list, then book the next periodic run."""
+    from app.recommendations.similarity import recompute_all
+
+    async with async_session_maker() as db:
+        result = await recompute_all(db)
+    if payload.get("periodic"):
+        await schedule_refresh(next_period=True)
+    return result
+
+
+@task("recommendations.update_restaurant")
+async def update_recommendations(payload: dict) -> dict:
+    """Incremental refresh after one restaurant was created, edited or deleted."""
+    from app.recommendations.similarity import update_restaurant
+
+    async with async_session_maker() as db:
+        return await update_restaurant(db, payload["restaurant_id"])
+
+
+async def schedule_refresh(next_period: bool = False) -> None:
+    """Queue the periodic full recompute (once per RECOMMENDATIONS_REFRESH_SECONDS across the cluster)."""
+    if settings.RECOMMENDATIONS_REFRESH_SECONDS <= 0:
+        return
+    async with async_session_maker() as db:
+        await enqueue_periodic(
+            db, "recommendations.recompute", settings.RECOMMENDATIONS_REFRESH_SECONDS, {"periodic": True}, next_period
+        )
@@ -0,0 +1,86 @@
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+# Log-spaced anchors; a value is spread over its nearest anchors so that
+# venues of similar price or size share components (cosine can't compare scalars)
+PRICE_ANCHORS = np.log([10, 20, 40, 80, 160, 320, 640])
+CAPACITY_ANCHORS = np.log([20, 40, 80, 160, 320, 640, 1280])
+ANCHOR_WIDTH = math.log(2)
+
+
+def _tokens(value: Optional[str]) -> List[str]:
+    return [token.strip().lower() for token in (value or "").split(",") if token.strip()]
+
+
+def _number(value) -> Optional[float]:
+    match = re.search(r"\d+(?:\.\d+)?", str(value or ""))
+    return float(match[0]) if match else None
+
+
+def _soft_bins(value: Optional[float], anchors: np.ndarray) -> np.ndarray:
+    if not value or value <= 0:
+        return np.zeros(len(anchors), dtype=np.float32)
+    return np.exp(-0.5 * ((math.log(value) - anchors) / ANCHOR_WIDTH) ** 2).astype(np.float32)
+
+
+def _unit(block: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return np.divide(block, norms, out=np.zeros_like(block), where=norms > 0)
+
+
+def encode(restaurants: Sequence[dict]) -> np.ndarray:
+    """One L2-normalized float32 row per restaurant (dicts with the Restaurant columns).
+
+    Each block (category, cuisines, features, price, capacity) is normalized and
+    scaled by its RECOMMENDATION_WEIGHTS entry. Vocabularies come from the rows
+    given, but a new token only adds a dimension, and price/capacity use fixed
+    anchors, so the similarity of two unchanged venues never depends on the others.
+    """
+    weights = settings.RECOMMENDATION_WEIGHTS
+    rows = [
+        {
+            "category": _tokens(r["category"]),
+            "cuisines": _tokens(r["cuisines"]),
+            "features": _tokens(r["features"]),
+        }
+        for r in restaurants
+    ]
+    blocks = []
+    for field in ("category", "cuisines", "features"):
+        vocabulary: Dict[str, int] = {}
+        for row in rows:
+            for token in row[field]:
+                vocabulary.setdefault(token, len(vocabulary))
+        block = np.zeros((len(rows), max(1, len(vocabulary))), dtype=np.float32)
+        for i, row in enumerate(rows):
+            block[i, [vocabulary[token] for token in row[field]]] = 1
+        blocks.append(_unit(block) * weights[field])
+    blocks.append(_unit(np.stack([_soft_bins(_number(r["price_range"]), PRICE_ANCHORS) for r in restaurants]))
+                  * weights["price"])
+    blocks.append(_unit(np.stack([_soft_bins(r["capacity"], CAPACITY_ANCHORS) for r in restaurants]))
+                  * weights["capacity"])
+    return _unit(np.hstack(blocks))
+
+
+def top_k(matrix: np.ndarray, rows: Iterable[int], k: int, batch_size: int) -> Iterable[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield (row, neighbour rows, scores) best first for the given rows, `batch_size` rows per matrix product."""
+    rows = np.fromiter(rows, dtype=np.int64)
+    k = min(k, len(matrix) - 1)
+    if k <= 0:
+        return
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        scores = matrix[batch] @ matrix.T  # (batch, n) cosine similarities
+        scores[np.arange(len(batch)), batch] = -np.inf  # Never your own neighbour
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        for row, neighbours, row_scores in zip(batch, best, best_scores):
+            yield int(row), neighbours, row_scores
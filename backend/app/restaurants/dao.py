@@ -1,29 +1,37 @@
 from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 from app.restaurants.models import Restaurant, RestaurantImage  # Fixed import
-from app.restaurants.schemas import RestaurantCreate, RestaurantImageCreate, RestaurantImageUpdate, RestaurantResponse, RestaurantImageSchema, RestaurantUpdate  # Fixed import
+from app.restaurants.schemas import RestaurantCreate, RestaurantImageCreate, RestaurantImageUpdate, RestaurantNearbyResponse, RestaurantResponse, RestaurantImageSchema, RestaurantUpdate  # Fixed import
 from typing import List, Optional
 import json
+from datetime import date
+from sqlalchemy import exists, func, lambda_stmt
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from app.reviews.schemas import ReviewResponse
+from app.bookings.models import BookingCapacity, Bookings
+from app.bookings.periods import booking_date_bounds, days_period, overlaps
+from app.popularity.models import RestaurantPopularity
 from app.bookings.schemas import BookingListOut
 
 logger = logging.getLogger(__name__)
 
 
-
 class RestaurantDAO:
     @staticmethod
     async def create_restaurant(
         db: AsyncSession, 
         restaurant_data: RestaurantCreate, 
         owner_id: int, 
-        image_urls: Optional[List[str]] = None
+        image_urls: Optional[List[str]] = None,
+        commit: bool = True
     ) -> RestaurantResponse:
-        """Create a new restaurant with multiple images"""
+        """Create a new restaurant with multiple images
+
+        With commit=False the rows are only flushed, and written when the caller commits.
+        """
         if not db:
             raise ValueError("Database session is required")
         
@@ -42,14 +50,15 @@ class RestaurantDAO:
                 cuisines=",".join(restaurant_data.cuisines) if restaurant_data.cuisines else "",
                 contact_phone=restaurant_data.contact_phone,
                 contact_email=restaurant_data.contact_email,
+                booking_mode=restaurant_data.booking_mode.value,
                 owner_id=owner_id
             )
             
             # Add restaurant to session
             db.add(restaurant)
             
-            # Commit restaurant
-            await db.commit()
+            # Commit restaurant (or flush, for the id)
+            await (db.commit() if commit else db.flush())
             
             # Refresh to get ID and other server-side generated values
             await db.refresh(restaurant)
@@ -66,7 +75,7 @@ class RestaurantDAO:
                 db.add_all(images)
                 
                 # Commit images
-                await db.commit()
+                await (db.commit() if commit else db.flush())
             
             # Construct and return response
             return RestaurantResponse(
@@ -84,6 +93,7 @@ class RestaurantDAO:
                 cuisines=restaurant.cuisines.split(",") if restaurant.cuisines else [],
                 contact_phone=restaurant.contact_phone,
                 contact_email=restaurant.contact_email,
+                booking_mode=restaurant.booking_mode,
                 images=[
                     RestaurantImageSchema(id=img.id, url=img.url) 
                     for img in images
@@ -110,13 +120,18 @@ class RestaurantDAO:
 
      # Convert to RestaurantResponse
     @staticmethod
-    async def get_all_restaurants(db: AsyncSession) -> List[RestaurantResponse]:
+    async def get_all_restaurants(db: AsyncSession, sort: Optional[str] = None) -> List[RestaurantResponse]:
         try:
             query = select(Restaurant).options(
                 selectinload(Restaurant.images),
                 selectinload(Restaurant.reviews),
                 selectinload(Restaurant.bookings)
             )
+            if sort == "popularity":
+                # Venues not in the rollup yet go last
+                query = query.outerjoin(
+                    RestaurantPopularity, RestaurantPopularity.restaurant_id == Restaurant.id
+                ).order_by(RestaurantPopularity.score.desc().nulls_last(), Restaurant.id)
             result = await db.execute(query)
             restaurants = result.scalars().all()
             return [
@@ -135,6 +150,7 @@ class RestaurantDAO:
                     cuisines=restaurant.cuisines.split(",") if restaurant.cuisines else [],
                     contact_phone=restaurant.contact_phone,
                     contact_email=restaurant.contact_email,
+                    booking_mode=restaurant.booking_mode,
                     images=[
                         RestaurantImageSchema(id=img.id, url=img.url) 
                         for img in restaurant.images
@@ -178,11 +194,13 @@ class RestaurantDAO:
         load_reviews: bool = False
     ) -> Optional[RestaurantResponse]:
         """Get a single restaurant by ID with optional eager loading of reviews."""
-        options = [selectinload(Restaurant.images), selectinload(Restaurant.bookings)]
+        # Lambda statements are built and cache-keyed once per call site; only restaurant_id is rebound
+        stmt = lambda_stmt(lambda: select(Restaurant).filter(Restaurant.id == restaurant_id).options(
+            selectinload(Restaurant.images), selectinload(Restaurant.bookings)
+        ))
         if load_reviews:
-            options.append(selectinload(Restaurant.reviews))
+            stmt += lambda s: s.options(selectinload(Restaurant.reviews))
 
-        stmt = select(Restaurant).filter(Restaurant.id == restaurant_id).options(*options)
         result = await db.execute(stmt)
         restaurant = result.scalar_one_or_none()
 
@@ -204,6 +222,7 @@ class RestaurantDAO:
             cuisines=restaurant.cuisines.split(",") if restaurant.cuisines else [],
             contact_phone=restaurant.contact_phone,
             contact_email=restaurant.contact_email,
+            booking_mode=restaurant.booking_mode,
             images=[
                 RestaurantImageSchema(id=img.id, url=img.url)
                 for img in restaurant.images
@@ -228,14 +247,82 @@ class RestaurantDAO:
         )
 
     @staticmethod
-    async def delete_restaurant(db: AsyncSession, restaurant_id: int, owner_id: int) -> bool:
-        """Delete a restaurant if the owner matches"""
+    async def search_nearby(
+        db: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int,
+        category: Optional[str] = None,
+        available_on: Optional[date] = None
+    ) -> List[RestaurantNearbyResponse]:
+        """Restaurants within radius_km of a point, nearest first.
+
+        The earth_box test and the <-> ordering both walk the ix_restaurants_earth
+        GiST index.
+        """
+        query = select(Restaurant).options(selectinload(Restaurant.images))
+        if category is not None:
+            query = query.filter(Restaurant.category == category)
+        if available_on is not None:
+            day_starts, day_ends = days_period(available_on, available_on)
+            first_day, last_day = booking_date_bounds(available_on, available_on)
+            query = query.filter(~exists().where(
+                Bookings.restaurant_id == Restaurant.id,
+                Bookings.booking_date.between(first_day, last_day),
+                Bookings.status == "confirmed",
+                ~Bookings.shared,
+                overlaps(Bookings.starts_at, Bookings.ends_at, day_starts, day_ends)
+            ), ~exists().where(
+                # Shared venues are only unavailable once the day is full
+                BookingCapacity.restaurant_id == Restaurant.id,
+                BookingCapacity.day == available_on,
+                BookingCapacity.booked >= Restaurant.capacity
+            ))
+
+        origin = func.ll_to_earth(latitude, longitude)
+        point = func.ll_to_earth(Restaurant.latitude, Restaurant.longitude)
+        radius_m = radius_km * 1000
+        query = (
+            query.add_columns(func.earth_distance(origin, point).label("distance_m"))
+            # earth_box is a cube test the index answers; it over-covers, so distance is rechecked
+            .filter(func.earth_box(origin, radius_m).op("@>")(point))
+            .filter(func.earth_distance(origin, point) <= radius_m)
+            .order_by(point.op("<->")(origin))
+            .limit(limit)
+        )
+        rows = [(restaurant, distance_m / 1000) for restaurant, distance_m in (await db.execute(query)).all()]
+
+        return [
+            RestaurantNearbyResponse(
+                id=restaurant.id,
+                name=restaurant.name,
+                location=restaurant.location,
+                address=restaurant.address,
+                category=restaurant.category,
+                capacity=restaurant.capacity,
+                rating=restaurant.rating,
+                price_range=restaurant.price_range,
+                latitude=restaurant.latitude,
+                longitude=restaurant.longitude,
+                distance_km=round(distance_km, 3),
+                images=[
+                    RestaurantImageSchema(id=img.id, url=img.url)
+                    for img in restaurant.images
+                ]
+            )
+            for restaurant, distance_km in rows
+        ]
+
+    @staticmethod
+    async def delete_restaurant(db: AsyncSession, restaurant_id: int, owner_id: int, commit: bool = True) -> bool:
+        """Delete a restaurant if the owner matches; with commit=False the caller commits"""
         stmt = select(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.owner_id == owner_id)
         result = await db.execute(stmt)
         restaurant = result.scalar_one_or_none()
         if restaurant:
             await db.delete(restaurant)
-            await db.commit()
+            await (db.commit() if commit else db.flush())
             return True
         return False
 
@@ -244,9 +331,10 @@ class RestaurantDAO:
         db: AsyncSession,
         restaurant_id: int,
         owner_id: int,
-        restaurant_data: RestaurantUpdate
+        restaurant_data: RestaurantUpdate,
+        commit: bool = True
     ) -> Optional[RestaurantResponse]:
-        """Update an existing restaurant."""
+        """Update an existing restaurant; with commit=False the caller commits."""
         try:
             stmt = (
                 select(Restaurant)
@@ -286,6 +374,21 @@ class RestaurantDAO:
                 restaurant.contact_phone = restaurant_data.contact_phone
             if restaurant_data.contact_email is not None:
                 restaurant.contact_email = restaurant_data.contact_email
+            if restaurant_data.booking_mode is not None and restaurant_data.booking_mode != restaurant.booking_mode:
+                # Bookings keep the mode they were made under, so only switch with none outstanding
+                outstanding = await db.execute(
+                    select(Bookings.id).filter(
+                        Bookings.restaurant_id == restaurant.id,
+                        Bookings.status.in_(["pending", "confirmed"]),
+                        Bookings.ends_at > func.now()
+                    ).limit(1)
+                )
+                if outstanding.first():
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Cannot change booking_mode while upcoming bookings are pending or confirmed"
+                    )
+                restaurant.booking_mode = restaurant_data.booking_mode.value
             # ... other fields ...
 
             # Handle image URLs (unchanged)
@@ -299,7 +402,7 @@ class RestaurantDAO:
                     ]
                     db.add_all(new_images)
 
-            await db.commit()
+            await (db.commit() if commit else db.flush())
             await db.refresh(restaurant)
 
             return RestaurantResponse(
@@ -317,6 +420,7 @@ class RestaurantDAO:
                 cuisines=restaurant.cuisines.split(",") if restaurant.cuisines else [],
                 contact_phone=restaurant.contact_phone,
                 contact_email=restaurant.contact_email,
+                booking_mode=restaurant.booking_mode,
                 images=[
                     RestaurantImageSchema(id=img.id, url=img.url)
                     for img in restaurant.images
@@ -324,6 +428,9 @@ class RestaurantDAO:
                 reviews=[]  # Add empty reviews list # No reviews field; defaults to []
             )
 
+        except HTTPException:
+            await db.rollback()
+            raise
         except Exception as e:
             await db.rollback()
             logger.error(f"Error updating restaurant: {str(e)}")
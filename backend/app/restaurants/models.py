@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Float, TIMESTAMP, text
+from sqlalchemy import DDL, Column, Integer, String, ForeignKey, Text, Float, Index, TIMESTAMP, event, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -13,13 +13,18 @@ class Restaurant(Base):
     address = Column(String)
     category = Column(Text)
     capacity = Column(Integer)
+    # "exclusive": a booking hires the whole venue; "shared": bookings share each day up to capacity
+    booking_mode = Column(String, nullable=False, server_default="exclusive")
     rating = Column(Float)
     price_range = Column(String)
     features = Column(Text)  # Stored as comma-separated values
     cuisines = Column(Text)  # Stored as comma-separated values
     contact_phone = Column(String)
     contact_email = Column(String)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    # Geocoded from address/location by the geo.geocode_restaurant job; NULL until then
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
     updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=text("now()"))
 
@@ -33,13 +38,28 @@ class Restaurant(Base):
     reviews = relationship("Reviews", back_populates="restaurant")
     bookings = relationship("Bookings", back_populates="restaurant")
 
+    __table_args__ = (
+        # Radius and nearest-first searches (earthdistance); a no-op outside PostgreSQL
+        Index(
+            "ix_restaurants_earth", func.ll_to_earth(latitude, longitude),
+            postgresql_using="gist"
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# create_all (tests, datagen --reset) needs ll_to_earth before the index above
+event.listen(
+    Restaurant.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS cube; CREATE EXTENSION IF NOT EXISTS earthdistance").execute_if(dialect="postgresql")
+)
+
 
 class RestaurantImage(Base):
     __tablename__ = "restaurant_images"
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, nullable=False)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"))
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), index=True)
 
     restaurant = relationship(
         "Restaurant", 
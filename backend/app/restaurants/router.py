@@ -1,19 +1,30 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, logger
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, logger
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.restaurants.schemas import RestaurantCreate, RestaurantImageCreate, RestaurantCreateIn, RestaurantImageSchema, RestaurantImageUpdate, RestaurantResponse, RestaurantUpdate
+from typing import List, Literal, Optional
+from app.restaurants.schemas import RestaurantCreate, RestaurantImageCreate, RestaurantCreateIn, RestaurantImageSchema, RestaurantImageUpdate, RestaurantNearbyResponse, RestaurantResponse, RestaurantUpdate
+from app.bookings.schemas import BookingMode
 from app.restaurants.dao import RestaurantDAO
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.restaurants.models import Restaurant
 from app.s3_utils import upload_image_to_s3
 from app.users.auth import get_current_user
 from app.users.models import Users
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Body
-from app.payments.stripe_utils import create_checkout_session, create_payment_intent, confirm_payment_intent
+from app.jobs.queue import enqueue
+from app.payments.dao import PaymentDAO
+from app.restaurants.tasks import spool_upload  # Also registers the tasks enqueued below
+import app.geo.tasks  # noqa: F401
+import app.recommendations.tasks  # noqa: F401
+from app.recommendations.dao import SimilarityDAO
+from app.recommendations.schemas import SimilarRestaurantResponse
+from app.popularity.dao import PopularityDAO
+from app.popularity.schemas import PopularRestaurantResponse
+from app.payments.stripe_utils import create_checkout_session, create_payment_intent, confirm_payment_intent, make_idempotency_key, retrieve_checkout_session
 from app.config import settings
-import stripe
 
 # Initialize Stripe with your API key
 
@@ -117,6 +128,7 @@ async def upload_temp_images(
 async def upload_image(
     restaurant_id: int,
     files: List[UploadFile] = File(...),
+    background: bool = Query(False, description="Queue the uploads and return 202 with job ids"),
     current_user: Users = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -134,6 +146,25 @@ async def upload_image(
     if restaurant.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to add images to this restaurant")
     
+    if background:
+        job_ids = []
+        for file in files:
+            job_ids.append(await enqueue(
+                db,
+                "restaurants.upload_image",
+                {
+                    "restaurant_id": restaurant_id,
+                    "owner_id": current_user.id,
+                    "filename": file.filename,
+                    # Only the spool path: jobs rows are returned by every claim and replicated
+                    "path": await spool_upload(file),
+                },
+                user_id=current_user.id,
+                commit=False,
+            ))
+        await db.commit()
+        return JSONResponse(status_code=202, content={"job_ids": job_ids})
+
     uploaded_images = []
     for file in files:
         image_url = await upload_image_to_s3(file)
@@ -300,7 +331,11 @@ async def create_restaurant_checkout_session(
     average_price: int = Form(...),
     image_urls: str = Form(default=""),
     opening_hours: str = Form(default=""),
+    features: str = Form(default=""),  # строка с запятыми
+    cuisines: str = Form(default=""),  # строка с запятыми
+    booking_mode: BookingMode = Form(default=BookingMode.EXCLUSIVE),
     current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can create restaurants")
@@ -317,71 +352,104 @@ async def create_restaurant_checkout_session(
         "average_price": average_price,
         "image_urls": image_urls,
         "opening_hours": opening_hours,
-        "user_id": current_user.id,
+        "features": [item.strip() for item in features.split(",") if item.strip()],
+        "cuisines": [item.strip() for item in cuisines.split(",") if item.strip()],
+        "booking_mode": booking_mode.value,
     }
     
-    # Encode all data to be passed in the URL
-    import urllib.parse
-    
-    # Create a base URL with common parameters
-    success_url_base = "http://localhost:8080/success?session_id={CHECKOUT_SESSION_ID}"
-    
-    # Add all restaurant data as query parameters
-    for key, value in restaurant_data.items():
-        encoded_value = urllib.parse.quote(str(value))
-        success_url_base += f"&{key}={encoded_value}"
-    
     # Create Stripe checkout session
     session = await create_checkout_session(
         amount=settings.ADMIN_FEE_USD, 
         currency="usd", 
-        success_url=success_url_base,
-        cancel_url="http://localhost:8080/cancel"
+        success_url="http://localhost:8080/success?session_id={CHECKOUT_SESSION_ID}",
+        cancel_url="http://localhost:8080/cancel",
+        # A double-submitted form gets the same session back instead of a second charge
+        idempotency_key=make_idempotency_key("checkout", current_user.id, restaurant_data)
     )
+
+    # The form waits server-side until the payment is confirmed, instead of riding along in the success URL
+    await PaymentDAO.save_draft(db, session.id, current_user.id, restaurant_data)
     
     return {"checkout_url": session.url, "session_id": session.id}
 
 
-# дополнить
+async def _confirmed_payment(db: AsyncSession, session_id: str):
+    """Payment recorded by the webhook, asking Stripe only if the client got back before the webhook did."""
+    payment = await PaymentDAO.get_payment(db, session_id)
+    if payment is None and settings.STRIPE_VERIFY_FALLBACK:
+        session = await retrieve_checkout_session(session_id)
+        await PaymentDAO.record_checkout_session(
+            db,
+            session_id=session.id,
+            status=session.payment_status,
+            payment_intent_id=session.get("payment_intent"),
+            amount_total=session.get("amount_total"),
+            currency=session.get("currency"),
+        )
+        payment = await PaymentDAO.get_payment(db, session_id)
+    if payment is None:
+        raise HTTPException(status_code=409, detail="Payment not confirmed yet")
+    if payment.status != "paid":
+        raise HTTPException(status_code=400, detail="Payment not completed")
+    return payment
+
+
 @router.post("/restaurants/create-after-payment/")
 async def create_restaurant_after_payment(
     restaurant: RestaurantCreateIn, 
     db: AsyncSession = Depends(get_db)
 ):
-    try:
-        session = stripe.checkout.Session.retrieve(restaurant.session_id)
-        if session.payment_status != "paid":
-            raise HTTPException(status_code=400, detail="Payment not completed")
-    except stripe.error.StripeError as e:
-        raise HTTPException(status_code=400, detail=f"Payment verification error: {str(e)}")
-    
+    await _confirmed_payment(db, restaurant.session_id)
+
+    # Held until the commit or rollback below, so concurrent requests create the restaurant only once
+    draft = await PaymentDAO.claim_draft(db, restaurant.session_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail="No restaurant draft for this checkout session")
+    if draft.restaurant_id is not None:
+        await db.rollback()
+        # Retried or duplicated request: the restaurant for this payment already exists
+        return {
+            "status": "success",
+            "message": "Restaurant already created",
+            "restaurant": await RestaurantDAO.get_restaurant_by_id(db, draft.restaurant_id)
+        }
+
+    data = draft.data
     try:
         image_urls_list = []
-        if restaurant.image_urls:
-            image_urls_list = [url.strip() for url in restaurant.image_urls.split(",") if url.strip()]
+        if data["image_urls"]:
+            image_urls_list = [url.strip() for url in data["image_urls"].split(",") if url.strip()]
         
         restaurant_data = RestaurantCreate(
-            name=restaurant.name,
-            description=restaurant.description,
-            location=restaurant.location,
+            name=data["name"],
+            description=data["description"],
+            location=data["location"],
             address="",
-            category=restaurant.category,
-            capacity=restaurant.capacity,
+            category=data["category"],
+            capacity=data["capacity"],
             rating=0.0,
-            price_range=str(restaurant.average_price),
-            features=restaurant.features,
-            cuisines=restaurant.cuisines,
-            contact_phone=restaurant.contact_phone,
-            contact_email=restaurant.contact_email,
+            price_range=str(data["average_price"]),
+            features=data.get("features") or restaurant.features or [],
+            cuisines=data.get("cuisines") or restaurant.cuisines or [],
+            contact_phone=data["contact_phone"],
+            contact_email=data["contact_email"],
+            booking_mode=data.get("booking_mode", BookingMode.EXCLUSIVE),
             image_urls=image_urls_list
         )
         
+        # Restaurant, completed draft and jobs commit together: a failure anywhere leaves
+        # nothing behind, so the rollback below can't let a retry create a second restaurant
         created_restaurant = await RestaurantDAO.create_restaurant(
             db,
             restaurant_data,
-            restaurant.user_id,
-            image_urls_list if image_urls_list else None
+            draft.owner_id,
+            image_urls_list if image_urls_list else None,
+            commit=False
         )
+        await PaymentDAO.complete_draft(db, restaurant.session_id, created_restaurant.id)
+        await enqueue(db, "geo.geocode_restaurant", {"restaurant_id": created_restaurant.id}, commit=False)
+        await enqueue(db, "recommendations.update_restaurant", {"restaurant_id": created_restaurant.id}, commit=False)
+        await db.commit()
         
         return {
             "status": "success", 
@@ -389,31 +457,70 @@ async def create_restaurant_after_payment(
             "restaurant": created_restaurant
         }
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create restaurant: {str(e)}")
     
 
 @router.get("/restaurants/", response_model=List[RestaurantResponse])
-async def get_restaurants(db: AsyncSession = Depends(get_db)):
+async def get_restaurants(
+    sort: Optional[Literal["popularity"]] = Query(None, description="popularity: most popular first"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Users can see all restaurants"""
-    return await RestaurantDAO.get_all_restaurants(db)
+    return await RestaurantDAO.get_all_restaurants(db, sort)
+
+@router.get("/restaurants/popular", response_model=List[PopularRestaurantResponse])
+async def get_popular_restaurants(
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Top venues by popularity score (reviews, recent and yearly confirmed bookings)"""
+    return await PopularityDAO.get_popular(db, limit, category)
+
+@router.get("/restaurants/nearby", response_model=List[RestaurantNearbyResponse])
+async def get_nearby_restaurants(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=settings.GEO_MAX_RADIUS_KM),
+    limit: int = Query(20, ge=1, le=settings.GEO_MAX_RESULTS),
+    category: Optional[str] = None,
+    available_on: Optional[date] = Query(None, description="Only restaurants without a confirmed booking that day"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Restaurants within radius_km of (lat, lng), nearest first"""
+    return await RestaurantDAO.search_nearby(db, lat, lng, radius_km, limit, category, available_on)
 
 @router.get("/restaurants/{restaurant_id}", response_model=RestaurantResponse)
-async def get_restaurant(restaurant_id: int, db: AsyncSession = Depends(get_db)):
+async def get_restaurant(restaurant_id: int, db: AsyncSession = Depends(get_read_db)):
     """Retrieve a single restaurant by ID"""
     restaurant = await RestaurantDAO.get_restaurant_by_id(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return restaurant
 
+@router.get("/restaurants/{restaurant_id}/similar", response_model=List[SimilarRestaurantResponse])
+async def get_similar_restaurants(
+    restaurant_id: int,
+    limit: int = Query(settings.RECOMMENDATIONS_TOP_K, ge=1, le=settings.RECOMMENDATIONS_TOP_K),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Most similar venues first; empty until the restaurant's list has been computed"""
+    return await SimilarityDAO.get_similar(db, restaurant_id, limit)
+
 @router.delete("/restaurants/{restaurant_id}")
 async def delete_restaurant(restaurant_id: int, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Admins can delete their own restaurants"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete restaurants")
 
-    success = await RestaurantDAO.delete_restaurant(db, restaurant_id, current_user.id)
+    success = await RestaurantDAO.delete_restaurant(db, restaurant_id, current_user.id, commit=False)
     if not success:
         raise HTTPException(status_code=404, detail="Restaurant not found or not owned by user")
+    # Its rows went with the cascade; this refills the lists it left short.
+    # Delete and job commit together, so a crash between them can't lose the refill
+    await enqueue(db, "recommendations.update_restaurant", {"restaurant_id": restaurant_id}, user_id=current_user.id, commit=False)
+    await db.commit()
     
     return {"message": "Restaurant deleted successfully"}
 
@@ -436,11 +543,22 @@ async def update_restaurant(
         db,
         restaurant_id,
         current_user.id,
-        restaurant_data  # RestaurantUpdate now includes optional image_urls
+        restaurant_data,  # RestaurantUpdate now includes optional image_urls
+        commit=False
     )
     
     if not updated_restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found or not owned by user")
+
+    # Update and jobs commit together: a new address is never saved without its geocode job
+    if restaurant_data.address is not None or restaurant_data.location is not None:
+        await enqueue(db, "geo.geocode_restaurant", {"restaurant_id": restaurant_id}, user_id=current_user.id, commit=False)
+    if any(value is not None for value in (
+        restaurant_data.category, restaurant_data.cuisines, restaurant_data.features,
+        restaurant_data.price_range, restaurant_data.capacity
+    )):
+        await enqueue(db, "recommendations.update_restaurant", {"restaurant_id": restaurant_id}, user_id=current_user.id, commit=False)
+    await db.commit()
     
     return updated_restaurant
 
@@ -448,7 +566,7 @@ async def update_restaurant(
 @router.get("/restaurants/{restaurant_id}/images/", response_model=List[RestaurantImageSchema])
 async def get_all_restaurant_images(
     restaurant_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Retrieve all images for a specific restaurant."""
     # Check if the restaurant exists
@@ -462,7 +580,7 @@ async def get_all_restaurant_images(
 @router.get("/images/{image_id}", response_model=RestaurantImageSchema)
 async def get_restaurant_image(
     image_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Retrieve a single image by ID."""
     image = await RestaurantDAO.get_image(db, image_id)
@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 
 from app.reviews.schemas import ReviewResponse
-from app.bookings.schemas import BookingListOut
+from app.bookings.schemas import BookingListOut, BookingMode
 
 class RestaurantImageSchema(BaseModel):
     id: int
@@ -32,6 +32,7 @@ class RestaurantBase(BaseModel):
     cuisines: List[str]
     contact_phone: str
     contact_email: EmailStr
+    booking_mode: BookingMode = BookingMode.EXCLUSIVE
 
 
 class RestaurantCreate(RestaurantBase):
@@ -50,6 +51,22 @@ class RestaurantResponse(RestaurantBase):
     class Config:
         from_attributes = True
 
+class RestaurantNearbyResponse(BaseModel):
+    id: int
+    # Nullable columns; only the coordinates are known to be set (the distance test needs them)
+    name: Optional[str] = None
+    location: Optional[str] = None
+    address: Optional[str] = None
+    category: Optional[str] = None
+    capacity: Optional[int] = None
+    rating: Optional[float] = None
+    price_range: Optional[str] = None
+    latitude: float
+    longitude: float
+    distance_km: float
+    images: List[RestaurantImageSchema]
+
+
 class RestaurantUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -63,23 +80,14 @@ class RestaurantUpdate(BaseModel):
     cuisines: Optional[List[str]] = None
     contact_phone: Optional[str] = None
     contact_email: Optional[str] = None
+    booking_mode: Optional[BookingMode] = None
     image_urls: Optional[List[str]] = None
 
 
 class RestaurantCreateIn(BaseModel):
     session_id: str
-    name: str
-    description: str
-    location: str
-    category: str
-    capacity: int
-    contact_phone: str
-    contact_email: str
-    average_price: int
-    image_urls: Optional[str] = ""  # строка с запятыми
-    opening_hours: str = ""
-    features:List[str]
-    cuisines:List[str]
-    user_id: int = None
+    # The rest of the form is stored server-side at checkout; clients may still send these lists
+    features: Optional[List[str]] = None
+    cuisines: Optional[List[str]] = None
 
 
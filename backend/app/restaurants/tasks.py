@@ -0,0 +1,42 @@
+import asyncio
+import os
+import shutil
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.database import async_session_maker
+from app.jobs.queue import task
+from app.restaurants.dao import RestaurantDAO
+from app.restaurants.schemas import RestaurantImageCreate
+from app.s3_utils import upload_image_to_s3
+
+
+async def spool_upload(file: UploadFile) -> str:
+    """Copy an upload to JOBS_UPLOAD_SPOOL_DIR and return its path; the job payload carries only that."""
+    def copy() -> str:
+        os.makedirs(settings.JOBS_UPLOAD_SPOOL_DIR, exist_ok=True)
+        path = os.path.join(settings.JOBS_UPLOAD_SPOOL_DIR, f"{uuid4()}{os.path.splitext(file.filename or '')[1]}")
+        with open(path, "wb") as spooled:
+            shutil.copyfileobj(file.file, spooled)
+        return path
+
+    return await asyncio.to_thread(copy)
+
+
+@task("restaurants.upload_image")
+async def upload_restaurant_image(payload: dict) -> dict:
+    """Upload a queued image to S3 and attach it to the restaurant."""
+    file = UploadFile(await asyncio.to_thread(open, payload["path"], "rb"), filename=payload["filename"])
+    try:
+        image_url = await upload_image_to_s3(file)
+    finally:
+        file.file.close()
+    async with async_session_maker() as db:
+        image = await RestaurantDAO.create_image(
+            db, payload["restaurant_id"], payload["owner_id"], RestaurantImageCreate(url=image_url)
+        )
+    # Kept until here so a failed attempt can be retried
+    await asyncio.to_thread(os.remove, payload["path"])
+    return {"id": image.id, "url": image.url}
@@ -3,6 +3,7 @@ from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.restaurants.models import Restaurant
 import logging
+from app.popularity.tasks import queue_refresh
 from app.reviews.models import Reviews
 from app.reviews.schemas import ReviewCreate, ReviewResponse
 
@@ -28,6 +29,7 @@ class ReviewDAO:
             restaurant_id=restaurant_id
         )
         db.add(review)
+        await queue_refresh(db, restaurant_id)
         await db.commit()
         await db.refresh(review)
 
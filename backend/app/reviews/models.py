@@ -8,6 +8,6 @@ class Reviews(Base):
     username = Column(String, nullable=False)
     rating = Column(Integer, nullable=False)  # 1-5 stars
     comment = Column(String, nullable=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False, index=True)
     
     restaurant = relationship("Restaurant", back_populates="reviews")
\ No newline at end of file
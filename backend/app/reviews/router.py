@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.reviews.schemas import ReviewCreate, ReviewResponse
 from app.reviews.dao import ReviewDAO
-from app.database import get_db
+from app.database import get_db, get_read_db
 import logging
 from typing import List
 
@@ -39,7 +39,7 @@ async def create_review(
 @router.get("/restaurants/{restaurant_id}/reviews/", response_model=List[ReviewResponse])
 async def get_reviews(
     restaurant_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Retrieve all reviews for a specific restaurant"""
     reviews = await ReviewDAO.get_reviews_for_restaurant(db, restaurant_id)
@@ -1,25 +1,37 @@
 import asyncio
-import boto3
-import os
+import threading
 from uuid import uuid4
-from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
 
-# Загрузка переменных окружения
-load_dotenv()
+from app.config import settings
 
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
-AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")
+_s3_client = None
+_s3_client_lock = threading.Lock()
 
-# Создание клиента boto3
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    endpoint_url=AWS_S3_ENDPOINT_URL
-)
+
+def get_s3_client():
+    """Shared boto3 client, created on first use (boto3 is slow to import and to build clients).
+
+    boto3 clients are thread-safe, so uploads running in executor threads share this one.
+    """
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                import boto3
+                from botocore.config import Config
+
+                _s3_client = boto3.client(
+                    "s3",
+                    aws_access_key_id=settings.aws_access_key_id,
+                    aws_secret_access_key=settings.aws_secret_access_key,
+                    endpoint_url=settings.aws_s3_endpoint_url,
+                    config=Config(
+                        connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+                        read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+                        retries={"max_attempts": settings.S3_MAX_ATTEMPTS, "mode": "standard"},
+                    )
+                )
+    return _s3_client
 
 
 # Асинхронная функция загрузки файла в MinIO (S3)
@@ -30,17 +42,15 @@ async def upload_image_to_s3(file, folder="uploads"):
     file_extension = file.filename.split(".")[-1]
     unique_filename = f"{folder}/{uuid4()}.{file_extension}"
 
-    # Используем ThreadPoolExecutor для выполнения синхронного кода в фоне
     def upload():
-        s3_client.upload_fileobj(
+        get_s3_client().upload_fileobj(
             file.file,
-            AWS_S3_BUCKET_NAME,
+            settings.aws_s3_bucket_name,
             unique_filename,
             ExtraArgs={"ACL": "public-read"}
         )
 
-    # Запуск в отдельном потоке
-    with ThreadPoolExecutor() as executor:
-        await asyncio.get_event_loop().run_in_executor(executor, upload)
+    # Запуск в отдельном потоке (общий пул потоков вместо нового пула на каждый файл)
+    await asyncio.to_thread(upload)
 
-    return f"{AWS_S3_ENDPOINT_URL}/{AWS_S3_BUCKET_NAME}/{unique_filename}"
+    return f"{settings.aws_s3_endpoint_url}/{settings.aws_s3_bucket_name}/{unique_filename}"
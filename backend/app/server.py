@@ -0,0 +1,83 @@
+"""Production entry point.
+
+    python -m app.server
+
+Runs one-time startup tasks in the launcher, then starts WEB_WORKERS uvicorn
+worker processes (one per available core by default) on uvloop and httptools.
+The workers share a METRICS_MULTIPROCESS_DIR, so whichever one a scrape of
+/metrics reaches reports the totals of all of them.
+SIGTERM stops accepting connections and lets each worker finish in-flight
+requests for up to WEB_GRACEFUL_TIMEOUT_SECONDS before its lifespan shutdown.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+
+import uvicorn
+
+from app.config import settings
+
+
+def worker_count() -> int:
+    if settings.WEB_WORKERS > 0:
+        return settings.WEB_WORKERS
+    # Honour CPU affinity / container cpusets where the platform exposes them
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+async def _startup() -> None:
+    from app.database import engine
+    from app.startup import run_startup_tasks
+
+    try:
+        await run_startup_tasks()
+    finally:
+        # Connections must not leak into the forked workers
+        await engine.dispose()
+
+
+def _share_metrics() -> None:
+    """Give the workers a metrics directory of their own (see MetricsRegistry), emptied of an earlier run's."""
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for filename in os.listdir(directory):
+            if filename.endswith((".json", ".json.tmp")):
+                os.remove(os.path.join(directory, filename))
+    else:
+        directory = tempfile.mkdtemp(prefix="restaurant-app-metrics-")
+    # Workers read settings from the environment
+    os.environ["METRICS_MULTIPROCESS_DIR"] = directory
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if settings.RUN_STARTUP_TASKS:
+        asyncio.run(_startup())
+        # Workers read settings from the environment; they must not repeat the tasks
+        os.environ["RUN_STARTUP_TASKS"] = "false"
+
+    workers = worker_count()
+    if workers > 1 and settings.METRICS_ENABLED:
+        _share_metrics()
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.WEB_HOST,
+        port=settings.WEB_PORT,
+        workers=workers,
+        loop="auto",  # uvloop when installed
+        http="auto",  # httptools when installed
+        lifespan="on",
+        proxy_headers=True,
+        timeout_keep_alive=settings.WEB_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT_SECONDS,
+        access_log=settings.WEB_ACCESS_LOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import logging
+import zlib
+
+from sqlalchemy import text
+
+from app.bookings.tasks import schedule_partition_maintenance
+from app.database import engine
+from app.popularity.tasks import schedule_sweep
+from app.recommendations.tasks import schedule_refresh
+from app.users.init_superuser import init_superuser
+
+logger = logging.getLogger(__name__)
+
+# Idempotent tasks that must finish before the app serves traffic
+STARTUP_TASKS = [
+    init_superuser,
+    schedule_refresh,
+    schedule_sweep,
+    schedule_partition_maintenance,
+]
+
+STARTUP_LOCK_KEY = zlib.crc32(b"restaurant-app:startup")
+
+
+async def run_startup_tasks() -> None:
+    """Run STARTUP_TASKS under a Postgres advisory lock.
+
+    The launcher calls this once before forking workers; the lock serializes
+    replicas that boot at the same time, so the tasks never run concurrently.
+    """
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+            try:
+                await _run_tasks()
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+                await conn.commit()
+    except Exception:
+        # As before, a database outage at boot must not keep the app from starting
+        logger.exception("Startup tasks failed")
+
+
+async def _run_tasks() -> None:
+    for startup_task in STARTUP_TASKS:
+        logger.info(f"Running startup task {startup_task.__name__}")
+        await startup_task()
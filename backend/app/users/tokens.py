@@ -0,0 +1,37 @@
+"""The caller's user id straight from the access token (signature and expiry checked,
+no database lookup), for ASGI middleware that runs before any endpoint dependency."""
+from typing import Optional
+
+import jwt
+from jwt.exceptions import PyJWTError
+from starlette.requests import cookie_parser
+
+from app.config import settings
+
+ACCESS_COOKIE = "booking_access_token"
+
+
+def token_subject(token: str) -> Optional[str]:
+    try:
+        subject = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+    except PyJWTError:
+        return None
+    return str(subject) if subject else None
+
+
+def scope_subject(scope) -> Optional[str]:
+    """`sub` of a valid token from the Authorization: Bearer header the API authenticates
+    with, else from the booking_access_token cookie; None for anonymous callers."""
+    bearer = cookie = None
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, credentials = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and credentials.strip():
+                bearer = credentials.strip()
+        elif name == b"cookie":
+            cookie = cookie_parser(value.decode("latin-1")).get(ACCESS_COOKIE) or cookie
+    for token in (bearer, cookie):
+        subject = token_subject(token) if token else None
+        if subject:
+            return subject
+    return None
@@ -0,0 +1,85 @@
+import json
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; samples do not need to be sorted."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float], errors: int = 0, elapsed: Optional[float] = None) -> Dict[str, float]:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    summary = {
+        "count": len(samples),
+        "errors": errors,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+    if elapsed:
+        summary["throughput_rps"] = len(samples) / elapsed
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n{title}")
+    print(f"{'name':<40} {'count':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in sorted(results.items()):
+        rps = f"{row['throughput_rps']:.1f}" if "throughput_rps" in row else "-"
+        print(
+            f"{name:<40} {row['count']:>7} {row['errors']:>5} {rps:>9} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+        )
+
+
+def save_baseline(name: str, results: Dict[str, Dict[str, float]], params: dict) -> Path:
+    BASELINE_DIR.mkdir(exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    payload = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": params,
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    return path
+
+
+def compare_with_baseline(path: Path, results: Dict[str, Dict[str, float]], tolerance: float) -> bool:
+    """Print p50/p95 deltas against a stored baseline; False if any p95 regressed beyond tolerance."""
+    baseline = json.loads(Path(path).read_text())
+    print(f"\nCompared with {path} (revision {baseline['revision']}, params {baseline['params']})")
+    ok = True
+    for name, row in sorted(results.items()):
+        old = baseline["results"].get(name)
+        if not old:
+            print(f"{name:<40} new")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "throughput_rps"):
+            if key in row and old.get(key):
+                deltas.append(f"{key} {(row[key] - old[key]) / old[key] * 100:+6.1f}%")
+        regressed = old["p95_ms"] and row["p95_ms"] > old["p95_ms"] * (1 + tolerance)
+        ok = ok and not regressed
+        print(f"{name:<40} {'  '.join(deltas)}{'  REGRESSION' if regressed else ''}")
+    return ok
@@ -0,0 +1,151 @@
+"""Index audit: EXPLAIN (ANALYZE, BUFFERS) every statement the DAO read paths issue, flag sequential scans.
+
+    python -m benchmarks.seed && python -m benchmarks.index_audit
+    python -m benchmarks.index_audit --min-rows 5000 --verbose
+
+Each case below runs its DAO call once while the statements reaching the
+engine are recorded; every distinct statement is then explained with the
+parameters it was first run with, inside a transaction that is rolled back.
+A "Seq Scan" node with a Filter that reads at least --min-rows rows is a
+missing index; scans without a filter (the full catalogue) are reported but
+not flagged. Exits 1 when anything is flagged, so it can gate CI.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import event, select
+
+from app.bookings.dao import BookingDAO
+from app.bookings.occupancy import get_occupancy
+from app.database import async_session_maker, engine
+from app.restaurants.dao import RestaurantDAO
+from app.restaurants.models import Restaurant
+from app.reviews.dao import ReviewDAO
+from app.users.dao import UsersDAO
+
+
+def build_cases(rng: random.Random, restaurant_ids, owner_ids, user_ids):
+    day = date.today() + timedelta(days=rng.randint(0, 365))
+
+    return {
+        "get_all_restaurants": lambda db: RestaurantDAO.get_all_restaurants(db),
+        "get_restaurant_by_id": lambda db: RestaurantDAO.get_restaurant_by_id(db, rng.choice(restaurant_ids), load_reviews=True),
+        "search_nearby": lambda db: RestaurantDAO.search_nearby(db, 43.2389, 76.8897, 10, 20, available_on=day),  # Central Almaty
+        "get_all_images_for_restaurant": lambda db: RestaurantDAO.get_all_images_for_restaurant(db, rng.choice(restaurant_ids)),
+        "get_reviews_for_restaurant": lambda db: ReviewDAO.get_reviews_for_restaurant(db, rng.choice(restaurant_ids)),
+        "get_free_days": lambda db: BookingDAO.get_free_days(db, rng.choice(restaurant_ids), day, day + timedelta(days=30)),
+        "get_booked_dates": lambda db: BookingDAO.get_booked_dates(db, rng.choice(restaurant_ids), day, day + timedelta(days=90)),
+        "get_reserved_restaurants": lambda db: BookingDAO.get_reserved_restaurants(db, day),
+        "get_occupancy": lambda db: get_occupancy(db, day, day + timedelta(days=89)),
+        "get_bookings_by_restaurant": lambda db: BookingDAO.get_bookings_by_restaurant(db, rng.choice(restaurant_ids)),
+        "get_bookings_by_user_id": lambda db: BookingDAO.get_bookings_by_user_id(db, rng.choice(owner_ids)),
+        "users_find_by_id": lambda db: UsersDAO.find_by_id(rng.choice(user_ids)),
+    }
+
+
+def walk(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from walk(child)
+
+
+def seq_scans(plan: dict) -> List[dict]:
+    scans = []
+    for node in walk(plan):
+        if node["Node Type"] != "Seq Scan":
+            continue
+        loops = node.get("Actual Loops", 1)
+        scans.append({
+            "relation": node.get("Relation Name"),
+            "filter": node.get("Filter"),
+            "rows_read": (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops,
+        })
+    return scans
+
+
+async def record_statements(cases) -> Dict[str, List[Tuple[str, tuple]]]:
+    """Run every case once; returns {case: [(driver SQL, parameters), ...]}."""
+    recorded: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        recorded.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        statements = {}
+        for name, case in cases.items():
+            recorded.clear()
+            async with async_session_maker() as db:
+                await case(db)
+            statements[name] = list(recorded)
+        return statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def explain(statement: str, parameters) -> dict:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            raw = result.scalar()
+        finally:
+            await transaction.rollback()
+    document = json.loads(raw) if isinstance(raw, str) else raw
+    return document[0]
+
+
+async def main(args) -> int:
+    rng = random.Random(args.seed)
+    async with async_session_maker() as db:
+        restaurant_ids = list((await db.execute(select(Restaurant.id))).scalars())
+        owner_ids = list((await db.execute(select(Restaurant.owner_id).distinct())).scalars())
+        if not restaurant_ids:
+            sys.exit("No restaurants found, run `python -m benchmarks.seed` first")
+    user_ids = [u.id for u in await UsersDAO.find_all()]
+
+    cases = build_cases(rng, restaurant_ids, owner_ids, user_ids)
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name in args.only}
+    statements = await record_statements(cases)
+
+    flagged = 0
+    explained = set()
+    for name, recorded in statements.items():
+        print(f"\n{name}")
+        for statement, parameters in recorded:
+            if statement in explained:
+                continue
+            explained.add(statement)
+            report = await explain(statement, parameters)
+            summary = " ".join(statement.split())[:100]
+            print(f"  {report['Execution Time']:8.2f} ms  {summary}")
+            for scan in seq_scans(report["Plan"]):
+                bad = scan["filter"] is not None and scan["rows_read"] >= args.min_rows
+                flagged += bad
+                marker = "SEQ SCAN" if bad else "seq scan"
+                print(f"    {marker} on {scan['relation']}: {scan['rows_read']} rows read, filter {scan['filter']}")
+            if args.verbose:
+                print(json.dumps(report["Plan"], indent=2))
+
+    await engine.dispose()
+    print(f"\n{len(explained)} statements explained, {flagged} filtered sequential scans over {args.min_rows} rows")
+    return 1 if flagged else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=1000, help="ignore scans reading fewer rows (tiny tables)")
+    parser.add_argument("--only", nargs="*", help="case names to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
@@ -0,0 +1,206 @@
+"""Mixed-traffic load test for the API.
+
+Runs in-process through httpx's ASGI transport by default, or against a running server with --url.
+Seed the database with benchmarks.seed first, then e.g.:
+
+    python -m benchmarks.loadtest --duration 30 --concurrency 32 --save-baseline main
+    python -m benchmarks.loadtest --duration 30 --concurrency 32 --compare benchmarks/baselines/main.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import httpx
+
+from app.datagen.generator import admin_phone, user_phone
+from benchmarks.common import compare_with_baseline, print_report, save_baseline, summarize
+from benchmarks.seed import BENCH_PASSWORD
+
+# Relative weights of each scenario in the traffic mix
+TRAFFIC_MIX = {
+    "list_restaurants": 25,
+    "restaurant_detail": 25,
+    "restaurant_reviews": 10,
+    "booked_dates": 15,
+    "reserved_restaurants": 5,
+    "create_booking": 10,
+    "confirm_booking": 5,
+    "login": 5,
+}
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.restaurant_ids = []
+        self.owned_restaurants = defaultdict(list)
+        self.owner_tokens = {}
+        self.guest_tokens = []
+        self.pending_bookings = []
+        self.recording = False
+
+    async def _login(self, phone: str) -> str:
+        response = await self.client.post("/auth/login", json={"phone": phone, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    async def prepare(self) -> None:
+        response = await self.client.get("/rest/restaurants/")
+        response.raise_for_status()
+        restaurants = response.json()
+        if not restaurants:
+            sys.exit("No restaurants found, run `python -m benchmarks.seed` first")
+        self.restaurant_ids = [r["id"] for r in restaurants]
+
+        for n in range(self.args.owners):
+            token = await self._login(admin_phone(n))
+            me = await self.client.get("/auth/me", cookies={"booking_access_token": token})
+            me.raise_for_status()
+            self.owner_tokens[me.json()["id"]] = token
+        for r in restaurants:
+            if r["owner_id"] in self.owner_tokens:
+                self.owned_restaurants[r["owner_id"]].append(r["id"])
+        self.guest_tokens = [await self._login(user_phone(n)) for n in range(self.args.guests)]
+
+    def _auth(self, token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+    def _random_date(self) -> date:
+        return date.today() + timedelta(days=self.rng.randint(0, 365))
+
+    async def list_restaurants(self):
+        return await self.client.get("/rest/restaurants/")
+
+    async def restaurant_detail(self):
+        return await self.client.get(f"/rest/restaurants/{self.rng.choice(self.restaurant_ids)}")
+
+    async def restaurant_reviews(self):
+        return await self.client.get(f"/reviews/restaurants/{self.rng.choice(self.restaurant_ids)}/reviews/")
+
+    async def booked_dates(self):
+        start = self._random_date()
+        return await self.client.get(
+            f"/bookings/booked-dates/{self.rng.choice(self.restaurant_ids)}",
+            params={"start_date": start.isoformat(), "end_date": (start + timedelta(days=30)).isoformat()},
+            headers=self._auth(self.rng.choice(self.guest_tokens)),
+        )
+
+    async def reserved_restaurants(self):
+        return await self.client.get(f"/bookings/reserved/{self._random_date().isoformat()}")
+
+    async def create_booking(self):
+        owner_id = self.rng.choice(list(self.owned_restaurants))
+        response = await self.client.post(
+            "/bookings/",
+            json={
+                "restaurant_id": self.rng.choice(self.owned_restaurants[owner_id]),
+                "booking_date": self._random_date().isoformat(),
+                "booking_username": "Load Test",
+                "email": "load@example.com",
+                "phone_number": "+77000000000",
+                "event_type": "Birthday",
+                "number_of_guests": self.rng.randint(10, 200),
+            },
+            headers=self._auth(self.rng.choice(self.guest_tokens)),
+        )
+        if response.status_code == 200:
+            self.pending_bookings.append((response.json()["id"], owner_id))
+        return response
+
+    async def confirm_booking(self):
+        if not self.pending_bookings:
+            return await self.create_booking()
+        booking_id, owner_id = self.pending_bookings.pop(0)
+        return await self.client.put(
+            f"/bookings/{booking_id}/confirm", headers=self._auth(self.owner_tokens[owner_id])
+        )
+
+    async def login(self):
+        return await self.client.post(
+            "/auth/login",
+            json={"phone": user_phone(self.rng.randrange(self.args.guests)), "password": BENCH_PASSWORD},
+        )
+
+    async def worker(self, deadline: float) -> None:
+        names = list(TRAFFIC_MIX)
+        weights = list(TRAFFIC_MIX.values())
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await getattr(self, name)()
+                # 400s are expected for date conflicts; only server errors count as failures
+                failed = response.status_code >= 500
+            except httpx.HTTPError:
+                failed = True
+            if self.recording:
+                self.samples[name].append(time.perf_counter() - started)
+                if failed:
+                    self.errors[name] += 1
+
+    async def run(self) -> dict:
+        await self.prepare()
+        if self.args.warmup:
+            await asyncio.gather(*(
+                self.worker(time.perf_counter() + self.args.warmup) for _ in range(self.args.concurrency)
+            ))
+        self.recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            self.worker(started + self.args.duration) for _ in range(self.args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+        results = {name: summarize(samples, self.errors[name], elapsed) for name, samples in self.samples.items()}
+        all_samples = [s for samples in self.samples.values() for s in samples]
+        results["TOTAL"] = summarize(all_samples, sum(self.errors.values()), elapsed)
+        return results
+
+
+async def main(args) -> int:
+    if args.url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+        base_url = args.url
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        results = await LoadTest(client, args).run()
+
+    print_report(f"Load test: {args.concurrency} workers for {args.duration}s", results)
+    params = {"concurrency": args.concurrency, "duration": args.duration, "url": args.url or "in-process"}
+    if args.save_baseline:
+        print(f"\nBaseline written to {save_baseline(args.save_baseline, results, params)}")
+    if args.compare and not compare_with_baseline(args.compare, results, args.tolerance):
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; in-process when omitted")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--owners", type=int, default=5, help="admin accounts used to confirm bookings")
+    parser.add_argument("--guests", type=int, default=20, help="guest accounts used to create bookings")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 regression, 0.15 = 15%%")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
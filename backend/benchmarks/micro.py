@@ -0,0 +1,128 @@
+"""Micro-benchmarks for DAO and auth hot paths, run directly against the seeded database.
+
+    python -m benchmarks.micro --iterations 200
+    python -m benchmarks.micro --only get_free_days --compare benchmarks/baselines/micro-main.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from jose import jwt
+from sqlalchemy import select
+
+from app.bookings.dao import BookingDAO
+from app.config import settings
+from app.database import async_session_maker, engine
+from app.restaurants.dao import RestaurantDAO
+from app.restaurants.models import Restaurant
+from app.reviews.dao import ReviewDAO
+from app.users.auth import create_access_token, get_password_hash, verify_password
+from app.users.dao import UsersDAO
+from benchmarks.common import compare_with_baseline, print_report, save_baseline, summarize
+
+
+def build_cases(rng: random.Random, restaurant_ids, user_ids, password_hash, token):
+    def any_date() -> date:
+        return date.today() + timedelta(days=rng.randint(0, 365))
+
+    async def get_all_restaurants(db):
+        await RestaurantDAO.get_all_restaurants(db)
+
+    async def get_restaurant_by_id(db):
+        await RestaurantDAO.get_restaurant_by_id(db, rng.choice(restaurant_ids), load_reviews=True)
+
+    async def get_reviews_for_restaurant(db):
+        await ReviewDAO.get_reviews_for_restaurant(db, rng.choice(restaurant_ids))
+
+    async def get_free_days(db):
+        start = any_date()
+        await BookingDAO.get_free_days(db, rng.choice(restaurant_ids), start, start + timedelta(days=30))
+
+    async def get_booked_dates(db):
+        start = any_date()
+        await BookingDAO.get_booked_dates(db, rng.choice(restaurant_ids), start, start + timedelta(days=90))
+
+    async def get_reserved_restaurants(db):
+        await BookingDAO.get_reserved_restaurants(db, any_date())
+
+    async def users_find_by_id(db):
+        await UsersDAO.find_by_id(rng.choice(user_ids))
+
+    async def verify_password_bcrypt(db):
+        await verify_password("bench-password", password_hash)
+
+    async def access_token_roundtrip(db):
+        encoded = await create_access_token({"sub": str(rng.choice(user_ids)), "role": "user"})
+        jwt.decode(encoded, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    async def decode_access_token(db):
+        jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    return {
+        case.__name__: case
+        for case in (
+            get_all_restaurants, get_restaurant_by_id, get_reviews_for_restaurant, get_free_days,
+            get_booked_dates, get_reserved_restaurants, users_find_by_id, verify_password_bcrypt,
+            access_token_roundtrip, decode_access_token,
+        )
+    }
+
+
+async def main(args) -> int:
+    rng = random.Random(args.seed)
+    async with async_session_maker() as db:
+        restaurant_ids = list((await db.execute(select(Restaurant.id))).scalars())
+        if not restaurant_ids:
+            sys.exit("No restaurants found, run `python -m benchmarks.seed` first")
+        user_ids = [u.id for u in await UsersDAO.find_all()]
+        print(f"Dataset: {len(restaurant_ids)} restaurants, {len(user_ids)} users")
+
+    cases = build_cases(
+        rng, restaurant_ids, user_ids,
+        await get_password_hash("bench-password"),
+        await create_access_token({"sub": str(user_ids[0]), "role": "user"}),
+    )
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name in args.only}
+
+    results = {}
+    for name, case in cases.items():
+        # bcrypt and the full catalogue dump are orders of magnitude slower than the rest
+        iterations = max(1, args.iterations // 10) if name in ("verify_password_bcrypt", "get_all_restaurants") else args.iterations
+        samples = []
+        async with async_session_maker() as db:
+            for i in range(args.warmup + iterations):
+                started = time.perf_counter()
+                await case(db)
+                if i >= args.warmup:
+                    samples.append(time.perf_counter() - started)
+                db.expunge_all()
+        results[name] = summarize(samples)
+
+    await engine.dispose()
+    print_report(f"Micro-benchmarks ({args.iterations} iterations)", results)
+    if args.save_baseline:
+        params = {"iterations": args.iterations, "only": args.only or "all"}
+        print(f"\nBaseline written to {save_baseline(args.save_baseline, results, params)}")
+    if args.compare and not compare_with_baseline(args.compare, results, args.tolerance):
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="case names to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 regression, 0.15 = 15%%")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
@@ -0,0 +1,89 @@
+"""Occupancy matrix benchmark: time get_occupancy for N venues x D days and EXPLAIN its cells query.
+
+    python -m app.datagen --restaurants 500 && python -m benchmarks.occupancy
+    python -m benchmarks.occupancy --venues 500 --days 90 --budget-ms 100 --start 2026-11-01
+
+The statement that builds the cells is explained once with (ANALYZE, BUFFERS)
+inside a rolled-back transaction, then the whole call (restaurant ids, cells,
+packing) is timed. Exits 1 when p95 exceeds --budget-ms, so it can gate CI.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import event, select
+
+from app.bookings.occupancy import get_occupancy
+from app.database import async_session_maker, engine
+from app.restaurants.models import Restaurant
+from benchmarks.common import print_report, summarize
+import app.main  # noqa: F401 - configures every mapper the queries touch
+
+
+async def explain_cells(restaurant_ids, start_date: date, end_date: date) -> str:
+    recorded = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        recorded.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_session_maker() as db:
+            await get_occupancy(db, start_date, end_date, restaurant_ids)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    statement, parameters = recorded[-1]  # The cells query runs last
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return "\n".join(row[0] for row in result)
+        finally:
+            await transaction.rollback()
+
+
+async def main(args) -> int:
+    async with async_session_maker() as db:
+        restaurant_ids = list((await db.execute(select(Restaurant.id).order_by(Restaurant.id))).scalars())
+    if len(restaurant_ids) < args.venues:
+        sys.exit(f"Only {len(restaurant_ids)} restaurants, the benchmark needs {args.venues}; load more with `python -m app.datagen`")
+    # Every venue takes the unfiltered path, as the all-venues calendar does
+    selection = None if len(restaurant_ids) == args.venues else restaurant_ids[:args.venues]
+    start_date = args.start or date.today()
+    end_date = start_date + timedelta(days=args.days - 1)
+
+    print(await explain_cells(selection, start_date, end_date))
+
+    samples = []
+    async with async_session_maker() as db:
+        for i in range(args.warmup + args.iterations):
+            started = time.perf_counter()
+            response = await get_occupancy(db, start_date, end_date, selection)
+            if i >= args.warmup:
+                samples.append(time.perf_counter() - started)
+    await engine.dispose()
+
+    name = f"get_occupancy {len(response.restaurant_ids)}x{response.days}"
+    results = {name: summarize(samples)}
+    print_report(f"Occupancy from {start_date} ({args.iterations} iterations)", results)
+    if results[name]["p95_ms"] > args.budget_ms:
+        print(f"\np95 is over the {args.budget_ms:g} ms budget")
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--venues", type=int, default=500)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--start", type=date.fromisoformat, help="first day (default: today)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100, help="fail when p95 is above this")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
@@ -0,0 +1,3 @@
+#!/bin/bash
+# Runs once at initdb: let bench-db-replica stream WAL from this server
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,66 @@
+"""Seed a throwaway Postgres with benchmark data.
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    set -a; . benchmarks/.env.bench; set +a
+    python -m benchmarks.seed --reset --restaurants 500 --bookings 50000
+
+Data comes from app.datagen, so the same --seed always produces the same dataset.
+Every seeded account uses BENCH_PASSWORD; logins follow app.datagen.generator.admin_phone/user_phone.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from app.bookings.partitions import ensure_partitions
+from app.database import Base, async_session_maker, engine
+from app.datagen.generator import DatasetGenerator, DatasetSpec
+from app.datagen.loader import load_dataset
+from app.users.auth import get_password_hash
+
+BENCH_PASSWORD = "bench-password"
+
+
+async def seed(args) -> None:
+    started = time.perf_counter()
+    spec = DatasetSpec(
+        seed=args.seed,
+        admins=args.admins,
+        users=args.users,
+        restaurants=args.restaurants,
+        max_images=args.images_per_restaurant,
+        reviews=args.reviews,
+        bookings=args.bookings,
+        password=BENCH_PASSWORD,
+    )
+    # bcrypt is deliberately slow, so every account shares one hash
+    generator = DatasetGenerator(spec, password_hash=await get_password_hash(BENCH_PASSWORD))
+
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        counts = await load_dataset(conn, generator)
+
+    # Split what landed in bookings_default into months, as the daily job would
+    async with async_session_maker() as db:
+        await ensure_partitions(db, date.today())
+    await engine.dispose()
+    print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--restaurants", type=int, default=200)
+    parser.add_argument("--images-per-restaurant", type=int, default=5, help="upper bound per venue")
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=20000)
+    return parser
+
+
+if __name__ == "__main__":
+    asyncio.run(seed(build_parser().parse_args()))
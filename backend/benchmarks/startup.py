@@ -0,0 +1,107 @@
+"""Cold-start benchmark: how long a fresh worker process takes to become useful.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --compare benchmarks/baselines/startup-main.json
+
+import_app             fresh interpreter importing app.main
+boot_to_first_response spawning `uvicorn app.main:app` until GET / first answers 200
+
+Startup tasks are skipped (RUN_STARTUP_TASKS=false) since the launcher runs
+them once, not per worker; no database is needed.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import compare_with_baseline, print_report, save_baseline, summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def _env() -> dict:
+    return {**os.environ, "PYTHONPATH": str(BACKEND_DIR), "RUN_STARTUP_TASKS": "false"}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_boot(timeout: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(args) -> int:
+    results = {}
+    for name, measure in (("import_app", measure_import), ("boot_to_first_response", lambda: measure_boot(args.timeout))):
+        samples, errors = [], 0
+        for _ in range(args.runs):
+            try:
+                samples.append(measure())
+            except (RuntimeError, TimeoutError, subprocess.CalledProcessError) as e:
+                print(f"{name}: {e}")
+                errors += 1
+        results[name] = summarize(samples, errors)
+
+    print_report(f"Cold start ({args.runs} runs)", results)
+    ok = True
+    boot = results["boot_to_first_response"]
+    if args.max_boot_ms and boot["count"] and boot["p50_ms"] > args.max_boot_ms:
+        print(f"\nMedian boot {boot['p50_ms']:.0f} ms exceeds the {args.max_boot_ms:.0f} ms target")
+        ok = False
+    if args.save_baseline:
+        print(f"\nBaseline written to {save_baseline(args.save_baseline, results, {'runs': args.runs})}")
+    if args.compare and not compare_with_baseline(args.compare, results, args.tolerance):
+        ok = False
+    return 0 if ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait for a worker to answer")
+    parser.add_argument("--max-boot-ms", type=float, default=1000, help="fail if the median boot is slower (0 disables)")
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 regression, 0.15 = 15%%")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_parser().parse_args()))
@@ -0,0 +1,212 @@
+"""Statement-cache benchmark for the hot DAO queries.
+
+    python -m benchmarks.statement_cache --only python
+    python -m benchmarks.statement_cache --iterations 500    # needs the seeded database
+
+python  Per-call Python work before the compiled-SQL cache lookup: building
+        the select() and generating its cache key, plain vs lambda_stmt, plus
+        what a full compile costs on a cache miss. No database needed.
+db      The DAO calls end to end on a NullPool engine without a prepared
+        statement cache (every request parses and plans again) vs the pooled
+        engine from app.database settings, whose connections keep asyncpg's
+        prepared statements between requests.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.dao.base as dao_base
+from app.bookings.dao import BookingDAO
+from app.bookings.models import BookingCapacity, Bookings
+from app.bookings.periods import booking_date_bounds, days_period, overlaps
+from app.config import settings
+from app.database import engine
+from app.restaurants.dao import RestaurantDAO
+from app.restaurants.models import Restaurant
+from app.reviews.models import Reviews  # noqa: F401, Restaurant.reviews needs it mapped
+from app.users.dao import UsersDAO
+from app.users.models import Users
+from benchmarks.common import compare_with_baseline, print_report, save_baseline, summarize
+
+DIALECT = postgresql.asyncpg.dialect()
+
+
+def statement_builders():
+    """(plain, lambda) builders for each hot query, mirroring the DAOs."""
+    restaurant_id, user_id, day = 42, 7, date.today()
+
+    def restaurant_plain():
+        return select(Restaurant).filter(Restaurant.id == restaurant_id).options(
+            selectinload(Restaurant.images), selectinload(Restaurant.bookings)
+        )
+
+    def restaurant_lambda():
+        return lambda_stmt(lambda: select(Restaurant).filter(Restaurant.id == restaurant_id).options(
+            selectinload(Restaurant.images), selectinload(Restaurant.bookings)
+        ))
+
+    def free_days_plain():
+        window_start, window_end = days_period(day, day + timedelta(days=30))
+        first_date, last_date = booking_date_bounds(day, day + timedelta(days=30))
+        return select(Bookings.starts_at, Bookings.ends_at).filter(
+            Bookings.restaurant_id == restaurant_id,
+            Bookings.booking_date.between(first_date, last_date),
+            Bookings.status == "confirmed",
+            ~Bookings.shared,
+            overlaps(Bookings.starts_at, Bookings.ends_at, window_start, window_end)
+        )
+
+    def free_days_lambda():
+        window_start, window_end = days_period(day, day + timedelta(days=30))
+        first_date, last_date = booking_date_bounds(day, day + timedelta(days=30))
+        return lambda_stmt(lambda: select(Bookings.starts_at, Bookings.ends_at).filter(
+            Bookings.restaurant_id == restaurant_id,
+            Bookings.booking_date.between(first_date, last_date),
+            Bookings.status == "confirmed",
+            ~Bookings.shared,
+            overlaps(Bookings.starts_at, Bookings.ends_at, window_start, window_end)
+        ))
+
+    def reserved_plain():
+        day_starts, day_ends = days_period(day, day)
+        first_date, last_date = booking_date_bounds(day, day)
+        return select(Bookings.restaurant_id).filter(
+            Bookings.booking_date.between(first_date, last_date),
+            Bookings.status == "confirmed", ~Bookings.shared, overlaps(Bookings.starts_at, Bookings.ends_at, day_starts, day_ends)
+        ).union(
+            select(BookingCapacity.restaurant_id)
+            .join(Restaurant, Restaurant.id == BookingCapacity.restaurant_id)
+            .filter(BookingCapacity.day == day, BookingCapacity.booked >= Restaurant.capacity)
+        )
+
+    def reserved_lambda():
+        day_starts, day_ends = days_period(day, day)
+        first_date, last_date = booking_date_bounds(day, day)
+        return lambda_stmt(lambda: select(Bookings.restaurant_id).filter(
+            Bookings.booking_date.between(first_date, last_date),
+            Bookings.status == "confirmed", ~Bookings.shared, overlaps(Bookings.starts_at, Bookings.ends_at, day_starts, day_ends)
+        ).union(
+            select(BookingCapacity.restaurant_id)
+            .join(Restaurant, Restaurant.id == BookingCapacity.restaurant_id)
+            .filter(BookingCapacity.day == day, BookingCapacity.booked >= Restaurant.capacity)
+        ))
+
+    def user_plain():
+        return select(Users).filter_by(id=user_id)
+
+    def user_lambda():
+        model = Users
+        return lambda_stmt(lambda: select(model).filter_by(id=user_id))
+
+    return {
+        "get_restaurant_by_id": (restaurant_plain, restaurant_lambda),
+        "get_free_days": (free_days_plain, free_days_lambda),
+        "get_reserved_restaurants": (reserved_plain, reserved_lambda),
+        "find_by_id": (user_plain, user_lambda),
+    }
+
+
+def run_python(iterations: int) -> dict:
+    results = {}
+    for name, (plain, lambda_) in statement_builders().items():
+        for variant, build in (("plain", plain), ("lambda", lambda_)):
+            build()._generate_cache_key()  # Warm the lambda analysis cache
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                build()._generate_cache_key()
+                samples.append(time.perf_counter() - started)
+            results[f"python/{name}/{variant}"] = summarize(samples)
+        samples = []
+        for _ in range(max(1, iterations // 10)):
+            started = time.perf_counter()
+            plain().compile(dialect=DIALECT)
+            samples.append(time.perf_counter() - started)
+        results[f"python/{name}/compile_miss"] = summarize(samples)
+    return results
+
+
+async def run_db(iterations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    async with engine.connect() as conn:
+        restaurant_ids = list((await conn.execute(select(Restaurant.id))).scalars())
+        user_ids = list((await conn.execute(select(Users.id))).scalars())
+    if not restaurant_ids:
+        sys.exit("No restaurants found, run `python -m benchmarks.seed` first")
+
+    def any_date() -> date:
+        return date.today() + timedelta(days=rng.randint(0, 365))
+
+    cases = {
+        "get_restaurant_by_id": lambda db: RestaurantDAO.get_restaurant_by_id(db, rng.choice(restaurant_ids)),
+        "get_free_days": lambda db: BookingDAO.get_free_days(db, rng.choice(restaurant_ids), any_date(), any_date() + timedelta(days=30)),
+        "get_reserved_restaurants": lambda db: BookingDAO.get_reserved_restaurants(db, any_date()),
+        "find_by_id": lambda db: UsersDAO.find_by_id(rng.choice(user_ids)),
+    }
+    uncached = create_async_engine(
+        settings.DATABASE_URL, poolclass=NullPool, query_cache_size=0,
+        connect_args={"prepared_statement_cache_size": 0},
+    )
+    variants = {"uncached": uncached, "pooled": engine}
+
+    results = {}
+    original_maker = dao_base.async_session_maker
+    try:
+        for variant, variant_engine in variants.items():
+            maker = sessionmaker(variant_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+            dao_base.async_session_maker = maker
+            for name, case in cases.items():
+                samples = []
+                for i in range(iterations + 10):
+                    # A session per call, like a request
+                    started = time.perf_counter()
+                    async with maker() as db:
+                        await case(db)
+                    if i >= 10:
+                        samples.append(time.perf_counter() - started)
+                results[f"db/{name}/{variant}"] = summarize(samples)
+    finally:
+        dao_base.async_session_maker = original_maker
+        await uncached.dispose()
+        await engine.dispose()
+    return results
+
+
+async def main(args) -> int:
+    results = {}
+    if args.only in (None, "python"):
+        results.update(run_python(args.iterations))
+    if args.only in (None, "db"):
+        results.update(await run_db(args.iterations, args.seed))
+
+    print_report(f"Statement caching ({args.iterations} iterations)", results)
+    if args.save_baseline:
+        params = {"iterations": args.iterations, "only": args.only or "all"}
+        print(f"\nBaseline written to {save_baseline(args.save_baseline, results, params)}")
+    if args.compare and not compare_with_baseline(args.compare, results, args.tolerance):
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--only", choices=("python", "db"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 regression, 0.15 = 15%%")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
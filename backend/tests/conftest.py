@@ -0,0 +1,29 @@
+"""Tests that take the `postgres` fixture need the database from .env, migrated to
+the alembic head, and are skipped without it; everything else runs anywhere."""
+import asyncio
+import os
+
+import pytest
+
+# Every test drives its own event loop (asyncio.run), and pooled asyncpg connections can't cross loops
+os.environ.setdefault("DB_POOL_SIZE", "0")
+
+pytest_plugins = ["app.monitoring.pytest_plugin", "app.datagen.pytest_plugin"]
+
+
+@pytest.fixture(scope="session")
+def postgres():
+    from sqlalchemy import text
+
+    import app.main  # noqa: F401 - imports every model, so relationships resolve whichever tests run
+    from app.config import settings
+    from app.database import engine
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        asyncio.run(ping())
+    except Exception as e:
+        pytest.skip(f"No database at {settings.DB_HOST}:{settings.DB_PORT} ({e})")
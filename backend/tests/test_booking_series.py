@@ -0,0 +1,80 @@
+import asyncio
+import json
+from datetime import date, timedelta
+
+import asyncpg
+import pytest
+from sqlalchemy import delete, select
+
+from app.bookings.dao import BookingDAO
+from app.bookings.models import Bookings
+from app.bookings.schemas import BookingSeriesCreate
+from app.config import settings
+from app.database import async_session_maker
+from app.notifications.models import Notification
+from app.realtime.broker import CHANNEL
+from app.restaurants.models import Restaurant
+from app.users.models import Users
+
+FIRST_DAY = date(2029, 9, 3)
+DATES = 12
+
+
+@pytest.fixture
+def venue(postgres):
+    async def create():
+        async with async_session_maker() as db:
+            user = Users(username="series-test", hashed_password="x", phone="series-test")
+            db.add(user)
+            await db.flush()
+            restaurant = Restaurant(name="series-test", owner_id=user.id, capacity=50)
+            db.add(restaurant)
+            await db.commit()
+            return user.id, restaurant.id
+
+    async def drop(user_id, restaurant_id):
+        async with async_session_maker() as db:
+            await db.execute(delete(Notification).where(Notification.booking_id.in_(
+                select(Bookings.id).where(Bookings.restaurant_id == restaurant_id)
+            )))
+            await db.execute(delete(Bookings).where(Bookings.restaurant_id == restaurant_id))
+            await db.execute(delete(Restaurant).where(Restaurant.id == restaurant_id))
+            await db.execute(delete(Users).where(Users.id == user_id))
+            await db.commit()
+
+    ids = asyncio.run(create())
+    yield ids
+    asyncio.run(drop(*ids))
+
+
+def test_series_takes_a_fixed_number_of_queries(venue, query_budget):
+    user_id, restaurant_id = venue
+    series = BookingSeriesCreate(
+        restaurant_id=restaurant_id, dates=[FIRST_DAY + timedelta(weeks=n) for n in range(DATES)],
+        booking_username="guest", email="guest@example.com", phone_number="+7 700 0000000",
+        event_type="meeting", number_of_guests=10
+    )
+
+    async def run():
+        listener = await asyncpg.connect(
+            host=settings.DB_HOST, port=settings.DB_PORT, user=settings.DB_USER,
+            password=settings.DB_PASS, database=settings.DB_NAME
+        )
+        heard = []
+        await listener.add_listener(CHANNEL, lambda *args: heard.append(json.loads(args[-1])))
+        try:
+            async with async_session_maker() as db:
+                # Restaurant, conflicts, bookings, notifications, pg_notify: none of them per date
+                with query_budget(5) as query_log:
+                    response = await BookingDAO.create_series(db, user_id, series)
+            await asyncio.sleep(0.2)
+        finally:
+            await listener.close()
+        return response, query_log, heard
+
+    response, query_log, heard = asyncio.run(run())
+    assert response.created == DATES
+    assert sum(count for statement, count in query_log.counts.items() if "pg_notify" in statement) == 1
+    assert sorted(event["booking_id"] for event in heard if event["restaurant_id"] == restaurant_id) == sorted(
+        outcome.booking_id for outcome in response.outcomes
+    )
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.payments import circuit_breaker
+from app.payments.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+async def fail():
+    raise ConnectionError("down")
+
+
+async def succeed():
+    return "ok"
+
+
+def call(breaker, func):
+    return asyncio.run(breaker.call(func))
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("stripe", failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+    assert breaker.state == "closed"
+
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call(breaker, succeed)
+
+
+def test_success_resets_the_count(clock):
+    breaker = CircuitBreaker("stripe", failure_threshold=2)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert call(breaker, succeed) == "ok"
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker("stripe", failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    clock.now += 30
+    assert breaker.state == "half-open"
+
+    breaker.before_call()  # The trial is in flight
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_cancelled_trial_frees_the_slot(clock):
+    breaker = CircuitBreaker("stripe", failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    clock.now += 30
+
+    async def cancelled_trial():
+        trial = asyncio.ensure_future(breaker.call(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancelled_trial())
+    assert breaker.state == "half-open"
+    assert call(breaker, succeed) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker("stripe", failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    clock.now += 30
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker.state == "open"
+    clock.now += 29
+    assert breaker.state == "open"
+
+
+def test_is_failure_filters_exceptions(clock):
+    breaker = CircuitBreaker("stripe", failure_threshold=1, is_failure=lambda exc: not isinstance(exc, ValueError))
+
+    async def declined():
+        raise ValueError("card declined")
+
+    with pytest.raises(ValueError):
+        call(breaker, declined)
+    assert breaker.state == "closed"
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+from app.bookings.dao import BookingDAO
+from app.bookings.models import BookingCapacity, Bookings, ConfirmedHire
+from app.bookings.periods import booking_period
+from app.database import async_session_maker
+from app.jobs.models import Job
+from app.notifications.models import Notification
+from app.restaurants.models import Restaurant
+from app.users.models import Users
+
+DAY = date(2029, 7, 1)
+GUESTS = 4
+
+
+def venue(postgres, booking_mode, bookings):
+    async def create():
+        async with async_session_maker() as db:
+            user = Users(username="confirm-test", hashed_password="x", phone="confirm-test")
+            db.add(user)
+            await db.flush()
+            restaurant = Restaurant(name="confirm-test", owner_id=user.id, capacity=10, booking_mode=booking_mode)
+            db.add(restaurant)
+            await db.flush()
+            starts_at, ends_at = booking_period(DAY)
+            booked = [
+                Bookings(user_id=user.id, restaurant_id=restaurant.id, booking_date=DAY, starts_at=starts_at,
+                         ends_at=ends_at, shared=booking_mode == "shared", number_of_guests=GUESTS, status="pending")
+                for _ in range(bookings)
+            ]
+            db.add_all(booked)
+            await db.commit()
+            return user.id, restaurant.id, [booking.id for booking in booked]
+
+    async def drop(user_id, restaurant_id, booking_ids):
+        async with async_session_maker() as db:
+            await db.execute(delete(Notification).where(Notification.booking_id.in_(booking_ids)))
+            await db.execute(delete(Job).where(Job.payload["restaurant_id"].as_integer() == restaurant_id))
+            await db.execute(delete(BookingCapacity).where(BookingCapacity.restaurant_id == restaurant_id))
+            await db.execute(delete(Bookings).where(Bookings.restaurant_id == restaurant_id))
+            await db.execute(delete(Restaurant).where(Restaurant.id == restaurant_id))
+            await db.execute(delete(Users).where(Users.id == user_id))
+            await db.commit()
+
+    ids = asyncio.run(create())
+    yield ids
+    asyncio.run(drop(*ids))
+
+
+@pytest.fixture
+def shared_booking(postgres):
+    for user_id, restaurant_id, (booking_id,) in venue(postgres, "shared", 1):
+        yield user_id, restaurant_id, booking_id
+
+
+@pytest.fixture
+def competing_hires(postgres):
+    yield from venue(postgres, "exclusive", 2)
+
+
+async def state(restaurant_id, booking_id):
+    async with async_session_maker() as db:
+        status = await db.scalar(select(Bookings.status).where(Bookings.id == booking_id))
+        booked = await db.scalar(select(BookingCapacity.booked).where(
+            BookingCapacity.restaurant_id == restaurant_id, BookingCapacity.day == DAY
+        ))
+        return status, booked or 0
+
+
+async def concurrently(*actions):
+    async def run(action, booking_id, user_id):
+        async with async_session_maker() as db:
+            # Load it first, as the router does, so the DAO has to re-read the locked row
+            await db.get(Bookings, booking_id)
+            try:
+                return await getattr(BookingDAO, action)(db, booking_id, user_id)
+            except HTTPException as e:
+                return e
+
+    return await asyncio.gather(*(run(*action) for action in actions))
+
+
+def test_concurrent_confirmations_reserve_once(shared_booking):
+    user_id, restaurant_id, booking_id = shared_booking
+
+    async def scenario():
+        await concurrently(*[("confirm_booking", booking_id, user_id)] * 3)
+        return await state(restaurant_id, booking_id)
+
+    assert asyncio.run(scenario()) == ("confirmed", GUESTS)
+
+
+def test_confirm_racing_reject_leaves_counters_matching_the_status(shared_booking):
+    user_id, restaurant_id, booking_id = shared_booking
+
+    async def scenario():
+        async with async_session_maker() as db:
+            await BookingDAO.confirm_booking(db, booking_id, user_id)
+        await concurrently(("reject_booking", booking_id, user_id), ("reject_booking", booking_id, user_id))
+        after_rejects = await state(restaurant_id, booking_id)
+        await concurrently(("confirm_booking", booking_id, user_id), ("reject_booking", booking_id, user_id))
+        return after_rejects, await state(restaurant_id, booking_id)
+
+    after_rejects, (status, booked) = asyncio.run(scenario())
+    assert after_rejects == ("rejected", 0)
+    assert booked == (GUESTS if status == "confirmed" else 0)
+
+
+def test_overlapping_hires_confirm_once(competing_hires):
+    user_id, restaurant_id, (first, second) = competing_hires
+
+    async def hired():
+        async with async_session_maker() as db:
+            return list(await db.scalars(select(ConfirmedHire.booking_id).where(ConfirmedHire.restaurant_id == restaurant_id)))
+
+    async def scenario():
+        outcomes = await concurrently(("confirm_booking", first, user_id), ("confirm_booking", second, user_id))
+        refused = [isinstance(outcome, HTTPException) and outcome.status_code == 400 for outcome in outcomes]
+        winner, loser = (second, first) if refused[0] else (first, second)
+        after_race = refused, await hired(), winner
+        async with async_session_maker() as db:
+            await BookingDAO.reject_booking(db, winner, user_id)
+        async with async_session_maker() as db:
+            await BookingDAO.confirm_booking(db, loser, user_id)
+        return after_race, await hired(), loser
+
+    (refused, hires_after_race, winner), hires_after_swap, loser = asyncio.run(scenario())
+    assert sorted(refused) == [False, True]
+    assert hires_after_race == [winner]
+    assert hires_after_swap == [loser]
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from asyncpg.exceptions import ExclusionViolationError
+from sqlalchemy import func, select
+
+from app.bookings.models import Bookings, ConfirmedHire
+from app.datagen.loader import load_dataset, tag_unique
+from app.restaurants.models import Restaurant, RestaurantImage
+from app.reviews.models import Reviews
+from app.users.models import Users
+
+TABLES = (Users, Restaurant, RestaurantImage, Reviews, Bookings, ConfirmedHire)
+
+
+def test_same_spec_same_rows(synthetic_dataset):
+    first, second = synthetic_dataset(bookings=200), synthetic_dataset(bookings=200)
+    assert list(first.users()) == list(second.users())
+    assert list(first.bookings()) == list(second.bookings())
+
+
+def test_tag_unique():
+    assert tag_unique("username", "owner3", 0) == "owner3"
+    assert tag_unique("username", "owner3", 5500) == "owner3-5500"
+    assert tag_unique("email", "owner3@example.com", 5500) == "owner3+5500@example.com"
+    assert tag_unique("email", None, 5500) is None
+
+
+async def counted(conn):
+    return {model.__tablename__: await conn.scalar(select(func.count()).select_from(model)) for model in TABLES}
+
+
+def load(generator, check, times=2):
+    """Load `generator` `times` times (each appends after the last), run `check`, roll everything back."""
+    from app.database import engine
+
+    async def run():
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                before = await counted(conn)
+                first_booking = await conn.scalar(select(func.coalesce(func.max(Bookings.id), 0))) + 1
+                loaded = [await load_dataset(conn, generator, chunk_size=100) for _ in range(times)]
+                return await check(conn, before, first_booking, loaded)
+            finally:
+                await transaction.rollback()
+
+    return asyncio.run(run())
+
+
+def test_load_dataset_appends_with_consistent_keys(postgres, synthetic_dataset):
+    async def check(conn, before, first_booking, loaded):
+        after = await counted(conn)
+        orphans = await conn.scalar(
+            select(func.count()).select_from(Bookings).outerjoin(Restaurant, Restaurant.id == Bookings.restaurant_id)
+            .where(Restaurant.id.is_(None))
+        )
+        confirmed_hires = await conn.scalar(
+            select(func.count()).select_from(Bookings)
+            .where(Bookings.id >= first_booking, Bookings.status == "confirmed", ~Bookings.shared)
+        )
+        return before, after, loaded, orphans, confirmed_hires
+
+    before, after, (first, second), orphans, confirmed_hires = load(synthetic_dataset(), check)
+    assert first == second
+    assert first["bookings"] == 500 and first["restaurants"] == 20
+    for table, count in first.items():
+        assert after[table] - before[table] == 2 * count
+    assert orphans == 0
+    # Every confirmed venue hire got its confirmed_hires row
+    assert confirmed_hires == 2 * first["confirmed_hires"] > 0
+
+
+def test_load_dataset_refuses_overlapping_hires(postgres, synthetic_dataset):
+    generator = synthetic_dataset()
+    bookings = generator.bookings
+
+    def with_a_double_booking():
+        rows = list(bookings())
+        confirmed = next(row for row in rows if row["status"] == "confirmed")
+        yield from rows
+        yield {**confirmed, "id": len(rows) + 1}
+
+    generator.bookings = with_a_double_booking
+
+    async def check(conn, before, first_booking, loaded):
+        pass
+
+    with pytest.raises(ExclusionViolationError, match="confirmed_hires_no_overlap"):
+        load(generator, check, times=1)
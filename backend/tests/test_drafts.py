@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+from app.database import async_session_maker
+from app.payments.dao import PaymentDAO
+from app.payments.models import RestaurantDraft
+from app.restaurants.models import Restaurant
+from app.users.models import Users
+
+SESSION_ID = "cs_test_draft_claims"
+
+
+@pytest.fixture
+def draft(postgres):
+    async def create():
+        async with async_session_maker() as db:
+            user = Users(username="draft-test", hashed_password="x", phone="draft-test")
+            db.add(user)
+            await db.flush()
+            await PaymentDAO.save_draft(db, SESSION_ID, user.id, {"name": "draft-test"})
+            return user.id
+
+    async def drop(owner_id):
+        async with async_session_maker() as db:
+            await db.execute(delete(RestaurantDraft).where(RestaurantDraft.session_id == SESSION_ID))
+            await db.execute(delete(Restaurant).where(Restaurant.owner_id == owner_id))
+            await db.execute(delete(Users).where(Users.id == owner_id))
+            await db.commit()
+
+    owner_id = asyncio.run(create())
+    yield owner_id
+    asyncio.run(drop(owner_id))
+
+
+async def claim_after(first, finish):
+    """Claim in a second session while `first` holds the claim, then let `first` finish."""
+    async with async_session_maker() as db:
+        second = asyncio.ensure_future(PaymentDAO.claim_draft(db, SESSION_ID))
+        await asyncio.sleep(0.2)
+        waited = not second.done()
+        await finish(first)
+        return waited, (await second).restaurant_id
+
+
+def test_concurrent_claim_sees_the_created_restaurant(draft):
+    async def scenario():
+        async with async_session_maker() as db:
+            assert (await PaymentDAO.claim_draft(db, SESSION_ID)).restaurant_id is None
+            restaurant = Restaurant(name="draft-test", owner_id=draft)
+            db.add(restaurant)
+            await db.flush()
+            await PaymentDAO.complete_draft(db, SESSION_ID, restaurant.id)
+            return restaurant.id, await claim_after(db, lambda db: db.commit())
+
+    restaurant_id, (waited, seen) = asyncio.run(scenario())
+    assert waited
+    assert seen == restaurant_id
+
+
+def test_abandoned_claim_leaves_the_draft_free(draft):
+    async def scenario():
+        # The creating request dies before committing: its session is closed mid-transaction
+        db = async_session_maker()
+        await PaymentDAO.claim_draft(db, SESSION_ID)
+        return await claim_after(db, lambda db: db.close())
+
+    waited, seen = asyncio.run(scenario())
+    assert waited
+    assert seen is None
+
+
+def test_deleted_restaurant_frees_the_draft(draft):
+    async def scenario():
+        async with async_session_maker() as db:
+            await PaymentDAO.claim_draft(db, SESSION_ID)
+            restaurant = Restaurant(name="draft-test", owner_id=draft)
+            db.add(restaurant)
+            await db.flush()
+            await PaymentDAO.complete_draft(db, SESSION_ID, restaurant.id)
+            await db.commit()
+            await db.delete(restaurant)
+            await db.commit()
+        async with async_session_maker() as db:
+            return await PaymentDAO.claim_draft(db, SESSION_ID)
+
+    assert asyncio.run(scenario()).restaurant_id is None
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from app.monitoring import health
+from app.monitoring.health import HealthChecker
+
+
+async def ok():
+    return None
+
+
+async def down():
+    raise ConnectionError("unreachable")
+
+
+@pytest.mark.parametrize("s3, database, s3_required, expected", [
+    (ok, ok, False, "ok"),
+    (down, ok, False, "degraded"),
+    (down, ok, True, "error"),
+    (ok, down, False, "error"),
+])
+def test_readiness_status(monkeypatch, s3, database, s3_required, expected):
+    monkeypatch.setattr(health, "PROBES", {"database": database, "s3": s3})
+    monkeypatch.setattr(health.settings, "HEALTH_S3_REQUIRED", s3_required)
+    assert asyncio.run(HealthChecker().report())["status"] == expected
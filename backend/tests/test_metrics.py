@@ -0,0 +1,67 @@
+import json
+import os
+
+from app.monitoring.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+DEAD_PID = 2 ** 22 + 1  # Above Linux's pid_max, so never a running process
+
+
+def registry():
+    metrics = MetricsRegistry()
+    requests = metrics.register(Counter("requests_total", "Requests", ("route",)))
+    in_flight = metrics.register(Gauge("in_flight", "Requests in flight"))
+    latency = metrics.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    return metrics, requests, in_flight, latency
+
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_render_adds_up_every_worker(tmp_path):
+    # Another worker, still running
+    other, requests, in_flight, latency = registry()
+    requests.inc(3, route="/a")
+    in_flight.set(2)
+    latency.observe(0.5)
+    other.write_snapshot(tmp_path, pid=os.getppid())
+
+    this, requests, in_flight, latency = registry()
+    requests.inc(route="/a")
+    requests.inc(route="/b")
+    in_flight.set(1)
+    latency.observe(0.05)
+
+    rendered = samples(this.render(tmp_path))
+    assert float(rendered['requests_total{route="/a"}']) == 4
+    assert float(rendered['requests_total{route="/b"}']) == 1
+    assert float(rendered["in_flight"]) == 3
+    assert rendered['latency_seconds_bucket{le="0.1"}'] == "1"
+    assert rendered['latency_seconds_bucket{le="1.0"}'] == "2"
+    assert rendered["latency_seconds_count"] == "2"
+    # Without the directory, only this process
+    assert float(samples(this.render())['requests_total{route="/a"}']) == 1
+
+
+def test_exited_worker_keeps_its_counts_but_not_its_gauges(tmp_path):
+    exited, requests, in_flight, _ = registry()
+    requests.inc(5, route="/a")
+    in_flight.set(4)
+    exited.write_snapshot(tmp_path, pid=DEAD_PID)
+
+    this, requests, in_flight, _ = registry()
+    requests.inc(route="/a")
+    in_flight.set(1)
+    rendered = samples(this.render(tmp_path))
+    assert float(rendered['requests_total{route="/a"}']) == 6
+    assert float(rendered["in_flight"]) == 1
+
+
+def test_snapshot_is_replaced_whole(tmp_path):
+    this, requests, _, _ = registry()
+    requests.inc(route="/a")
+    this.write_snapshot(tmp_path, pid=DEAD_PID)
+    requests.inc(route="/a")
+    this.write_snapshot(tmp_path, pid=DEAD_PID)
+    assert os.listdir(tmp_path) == [f"{DEAD_PID}.json"]
+    assert json.loads((tmp_path / f"{DEAD_PID}.json").read_text())["requests_total"] == [[["/a"], 2]]
@@ -0,0 +1,110 @@
+import asyncio
+import base64
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import delete
+
+from app.bookings.models import BookingCapacity, Bookings
+from app.bookings.occupancy import CONFIRMED, FREE, PENDING, get_occupancy, pack
+from app.bookings.periods import booking_period, venue_timezone
+from app.database import async_session_maker
+from app.restaurants.models import Restaurant
+from app.users.models import Users
+
+START = date(2029, 9, 10)
+DAYS = 14
+
+
+def test_pack_keeps_the_highest_state_per_cell():
+    cells = [(7, 0, PENDING), (7, 0, CONFIRMED), (7, 0, PENDING), (3, 13, PENDING)]
+    matrix = pack([3, 7], cells, DAYS)
+    assert matrix.shape == (2, DAYS) and matrix.dtype == np.uint8
+    assert matrix[1, 0] == CONFIRMED and matrix[0, 13] == PENDING
+    assert np.count_nonzero(matrix) == 2
+
+
+def test_pack_drops_cells_of_unselected_restaurants():
+    cells = [(1, 2, PENDING), (5, 3, CONFIRMED), (9, 4, CONFIRMED), (4, 5, PENDING)]
+    matrix = pack([2, 5, 8], cells, DAYS)
+    assert matrix[1, 3] == CONFIRMED
+    assert np.count_nonzero(matrix) == 1
+    assert not pack([], cells, DAYS).size
+    assert not pack([2, 5], [], DAYS).any()
+
+
+def at(day, hour=0):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=venue_timezone())
+
+
+def day(offset):
+    return START + timedelta(days=offset)
+
+
+@pytest.fixture
+def venues(postgres):
+    async def create():
+        async with async_session_maker() as db:
+            user = Users(username="occupancy-test", hashed_password="x", phone="occupancy-test")
+            db.add(user)
+            await db.flush()
+            hire = Restaurant(name="occupancy-hire", owner_id=user.id, capacity=50)
+            shared = Restaurant(name="occupancy-shared", owner_id=user.id, capacity=5, booking_mode="shared")
+            db.add_all([hire, shared])
+            await db.flush()
+
+            def booking(restaurant, status, period, shared=False):
+                starts_at, ends_at = period
+                first_day = starts_at.astimezone(venue_timezone()).date()
+                db.add(Bookings(user_id=user.id, restaurant_id=restaurant.id, booking_date=first_day,
+                                starts_at=starts_at, ends_at=ends_at, status=status, shared=shared))
+
+            booking(hire, "confirmed", booking_period(day(-2), end_date=day(0)))  # Started before the window
+            booking(hire, "pending", booking_period(day(1)))
+            booking(hire, "confirmed", booking_period(day(2), end_date=day(4)))
+            booking(hire, "pending", booking_period(day(3)))  # Under a confirmed day: stays confirmed
+            booking(hire, "confirmed", (at(day(6), 22), at(day(7), 2)))  # Past midnight
+            booking(hire, "rejected", booking_period(day(9)))
+            booking(hire, "pending", booking_period(day(13), end_date=day(15)))  # Runs past the window
+            booking(shared, "confirmed", booking_period(day(1)), shared=True)
+            db.add(BookingCapacity(restaurant_id=shared.id, day=day(5), booked=5))
+            await db.commit()
+            return user.id, hire.id, shared.id
+
+    async def drop(user_id, *restaurant_ids):
+        async with async_session_maker() as db:
+            await db.execute(delete(BookingCapacity).where(BookingCapacity.restaurant_id.in_(restaurant_ids)))
+            await db.execute(delete(Bookings).where(Bookings.restaurant_id.in_(restaurant_ids)))
+            await db.execute(delete(Restaurant).where(Restaurant.id.in_(restaurant_ids)))
+            await db.execute(delete(Users).where(Users.id == user_id))
+            await db.commit()
+
+    ids = asyncio.run(create())
+    yield ids[1:]
+    asyncio.run(drop(*ids))
+
+
+def unpack(bitset, rows):
+    packed = np.frombuffer(base64.b64decode(bitset), dtype=np.uint8).reshape(rows, -1)
+    return np.unpackbits(packed, axis=1)[:, :DAYS].astype(bool)
+
+
+def test_occupancy_cells_match_the_bookings(venues):
+    hire, shared = venues
+
+    async def run():
+        async with async_session_maker() as db:
+            return await get_occupancy(db, START, day(DAYS - 1), restaurant_ids=[shared, hire])
+
+    response = asyncio.run(run())
+    assert response.restaurant_ids == sorted([hire, shared]) and response.row_bytes == 2
+
+    states = np.full((2, DAYS), FREE)
+    states[unpack(response.pending, 2)] = PENDING
+    states[unpack(response.confirmed, 2)] = CONFIRMED
+    by_id = dict(zip(response.restaurant_ids, states))
+    C, P, F = CONFIRMED, PENDING, FREE
+    assert list(by_id[hire]) == [C, P, C, C, C, F, C, C, F, F, F, F, F, P]
+    # A shared booking leaves the day partly free; a full counter takes it
+    assert list(by_id[shared]) == [F, P, F, F, F, C, F, F, F, F, F, F, F, F]
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.overload.deadlines import deadline
+from app.overload.middleware import ConcurrencyLimiter, route_class
+
+
+def limiter(max_limit=2, max_queue=1, adaptive=False) -> ConcurrencyLimiter:
+    return ConcurrencyLimiter("test", max_limit=max_limit, max_queue=max_queue, target_latency=0.1, adaptive=adaptive)
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("GET", "/rest/restaurants/", "read"),
+    ("POST", "/bookings/", "write"),
+    ("POST", "/rest/restaurants/1/upload-image/", "upload"),
+])
+def test_route_class(method, path, expected):
+    assert route_class(method, path) == expected
+
+
+def test_sheds_when_the_queue_is_full():
+    async def run():
+        slots = limiter(max_limit=1, max_queue=1)
+        assert await slots.acquire(1) is None
+        queued = asyncio.ensure_future(slots.acquire(1))
+        await asyncio.sleep(0)
+        assert await slots.acquire(1) == "queue_full"
+        slots.release(0.01)
+        assert await queued is None
+        assert slots.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_queued_request_times_out():
+    async def run():
+        slots = limiter(max_limit=1, max_queue=5)
+        await slots.acquire(1)
+        assert await slots.acquire(0.01) == "queue_timeout"
+        assert slots.in_flight == 1 and not slots._waiters
+
+    asyncio.run(run())
+
+
+def test_waiters_are_served_in_order():
+    async def run():
+        slots = limiter(max_limit=1, max_queue=5)
+        await slots.acquire(1)
+        order = []
+
+        async def wait(name):
+            await slots.acquire(1)
+            order.append(name)
+
+        waiting = [asyncio.ensure_future(wait(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        slots.release(None)
+        await asyncio.sleep(0)
+        slots.release(None)
+        await asyncio.gather(*waiting)
+        assert order == ["first", "second"]
+
+    asyncio.run(run())
+
+
+def test_adaptive_limit_backs_off_and_recovers():
+    slots = limiter(max_limit=10, adaptive=True)
+    for _ in range(5):
+        slots.in_flight += 1
+        slots.release(1.0)  # Slower than target_latency
+    assert slots.limit == pytest.approx(10 * 0.9 ** 5)
+
+    for _ in range(200):
+        slots.in_flight += 1
+        slots.release(0.01)
+    assert slots.limit == 10
+
+
+def test_deadline_sets_the_timeout_without_growing_the_statement_cache(postgres):
+    from app.database import engine
+
+    async def run():
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            cache = raw.dbapi_connection._prepared_statement_cache
+            sizes, timeouts = [], []
+            for seconds in (5, 3.21, 0.75, 8, 1.5):
+                with deadline(seconds):
+                    async with conn.begin():
+                        timeouts.append((await conn.execute(text("SHOW statement_timeout"))).scalar())
+                sizes.append(len(cache))
+            return sizes, timeouts
+
+    sizes, timeouts = asyncio.run(run())
+    assert len(set(sizes[1:])) == 1  # The first transaction prepares the statements, later ones reuse them
+    assert [int(value.removesuffix("ms")) for value in timeouts[1:3]] == pytest.approx([3210, 750], abs=50)
@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.bookings.periods import booking_period, days_covered, series_dates, venue_timezone
+from app.config import settings
+
+DAY = date(2027, 3, 10)
+
+
+def local(day, hour=0, minute=0):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=venue_timezone())
+
+
+def test_full_day_runs_midnight_to_midnight():
+    assert booking_period(DAY) == (local(DAY), local(DAY + timedelta(days=1)))
+    assert days_covered(*booking_period(DAY)) == [DAY]
+
+
+def test_multi_day_booking_includes_its_end_date():
+    end = DAY + timedelta(days=2)
+    starts_at, ends_at = booking_period(DAY, end_date=end)
+    assert (starts_at, ends_at) == (local(DAY), local(end + timedelta(days=1)))
+    assert days_covered(starts_at, ends_at) == [DAY, DAY + timedelta(days=1), end]
+
+
+def test_booking_length_is_capped_at_booking_max_days():
+    longest = DAY + timedelta(days=settings.BOOKING_MAX_DAYS - 1)
+    assert len(days_covered(*booking_period(DAY, end_date=longest))) == settings.BOOKING_MAX_DAYS
+    with pytest.raises(ValueError, match=f"at most {settings.BOOKING_MAX_DAYS} days"):
+        booking_period(DAY, end_date=longest + timedelta(days=1))
+
+
+@pytest.mark.parametrize("slot, end_date, message", [
+    ("day", DAY - timedelta(days=1), "before booking_date"),
+    ("brunch", None, "Unknown slot"),
+    ("lunch", DAY + timedelta(days=1), "Only full-day bookings"),
+])
+def test_invalid_requests(slot, end_date, message):
+    with pytest.raises(ValueError, match=message):
+        booking_period(DAY, slot, end_date)
+
+
+def test_slots_use_the_configured_hours(monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_SLOTS", {"lunch": ["11:00", "16:00"], "late": ["22:00", "02:00"]})
+    assert booking_period(DAY, "lunch") == (local(DAY, 11), local(DAY, 16))
+    assert booking_period(DAY, "lunch", DAY) == (local(DAY, 11), local(DAY, 16))
+
+    # A slot closing "before" it opens runs into the next day, which it then also touches
+    late = booking_period(DAY, "late")
+    assert late == (local(DAY, 22), local(DAY + timedelta(days=1), 2))
+    assert days_covered(*late) == [DAY, DAY + timedelta(days=1)]
+
+
+def test_days_covered_is_in_venue_time():
+    # 20:00 UTC is already the next day in the venue's timezone
+    utc_evening = datetime.fromisoformat(f"{DAY}T20:00:00+00:00")
+    assert days_covered(utc_evening, utc_evening + timedelta(hours=1)) == [DAY + timedelta(days=1)]
+
+
+def test_series_from_explicit_dates_is_sorted_and_distinct():
+    assert series_dates([DAY + timedelta(days=7), DAY, DAY]) == [DAY, DAY + timedelta(days=7)]
+
+
+@pytest.mark.parametrize("recurrence, expected", [
+    ("FREQ=WEEKLY;COUNT=3", [DAY, DAY + timedelta(days=7), DAY + timedelta(days=14)]),
+    ("FREQ=DAILY;UNTIL=20270312", [DAY, DAY + timedelta(days=1), DAY + timedelta(days=2)]),
+    ("RRULE:FREQ=MONTHLY;BYMONTHDAY=10,20;COUNT=3", [DAY, date(2027, 3, 20), date(2027, 4, 10)]),
+    # Several times a day still books each date once, and counts against the limit once
+    ("FREQ=DAILY;BYHOUR=9,12,18;COUNT=6", [DAY, DAY + timedelta(days=1)]),
+])
+def test_series_from_recurrence(recurrence, expected):
+    assert series_dates(start_date=DAY, recurrence=recurrence) == expected
+
+
+def test_series_limit_counts_dates_not_occurrences():
+    dates = series_dates(start_date=DAY, recurrence="FREQ=DAILY;BYHOUR=9,12,18;UNTIL=20270319T235959", limit=10)
+    assert len(dates) == 10
+    with pytest.raises(ValueError, match="at most 10 dates"):
+        series_dates(start_date=DAY, recurrence="FREQ=DAILY;BYHOUR=9,12,18;UNTIL=20270320T235959", limit=10)
+
+
+@pytest.mark.parametrize("recurrence, message", [
+    ("FREQ=HOURLY;COUNT=5", "FREQ must be one of"),
+    ("FREQ=MINUTELY;UNTIL=20270311", "FREQ must be one of"),
+    ("FREQ=WEEKLY", "needs COUNT or UNTIL"),
+    ("RRULE:FREQ=DAILY;COUNT=2\nRDATE:20270401", "single RRULE"),
+    ("FREQ=FORTNIGHTLY;COUNT=2", "Invalid recurrence"),
+])
+def test_series_rejects_unbounded_or_sub_daily_rules(recurrence, message):
+    with pytest.raises(ValueError, match=message):
+        series_dates(start_date=DAY, recurrence=recurrence)
+
+
+def test_series_needs_exactly_one_source():
+    with pytest.raises(ValueError, match="either dates or recurrence"):
+        series_dates([DAY], DAY, "FREQ=DAILY;COUNT=2")
+    with pytest.raises(ValueError, match="needs a start_date"):
+        series_dates(recurrence="FREQ=DAILY;COUNT=2")
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.bookings.models import Bookings
+from app.bookings.periods import booking_period
+from app.config import settings
+from app.database import async_session_maker
+from app.popularity.dao import PopularityDAO, popularity_score
+from app.popularity.models import RestaurantPopularity
+from app.restaurants.models import Restaurant
+from app.users.models import Users
+
+REFRESHED_ON = date(2029, 6, 1)
+
+
+def test_few_reviews_are_pulled_towards_the_prior():
+    one_perfect, _ = popularity_score(1, 5, 0, 0, 0)
+    many_good, _ = popularity_score(200, 900, 0, 0, 0)
+    assert popularity_score(0, 0, 0, 0, 0)[0] == settings.POPULARITY_PRIOR_RATING
+    assert settings.POPULARITY_PRIOR_RATING < one_perfect < many_good < 4.5
+
+
+def test_score_grows_with_bookings_but_slower_than_linearly():
+    scores = [popularity_score(10, 40, 0, last_30, last_30)[1] for last_30 in (0, 10, 20, 40)]
+    assert scores == sorted(scores)
+    assert scores[3] - scores[2] < 2 * (scores[2] - scores[1])
+    # Upcoming and last-30-day bookings weigh the same
+    assert popularity_score(10, 40, 5, 0, 0)[1] == popularity_score(10, 40, 0, 5, 0)[1]
+
+
+def counters(days, today):
+    """What refresh() would count on `today`, computed by hand."""
+    return (
+        sum(day > today for day in days),
+        sum(today - timedelta(days=29) <= day <= today for day in days),
+        sum(today - timedelta(days=365) < day <= today for day in days),
+    )
+
+
+# An upcoming booking, one just outside the 30-day window and one near the end of the year
+BOOKED = [REFRESHED_ON + timedelta(days=offset) for offset in (10, -40, -300)]
+
+
+@pytest.fixture
+def venue(postgres):
+    async def create():
+        async with async_session_maker() as db:
+            user = Users(username="popularity-test", hashed_password="x", phone="popularity-test")
+            db.add(user)
+            await db.flush()
+            restaurant = Restaurant(name="popularity-test", owner_id=user.id, capacity=10)
+            db.add(restaurant)
+            await db.flush()
+            for day in BOOKED:
+                starts_at, ends_at = booking_period(day)
+                db.add(Bookings(user_id=user.id, restaurant_id=restaurant.id, booking_date=day,
+                                starts_at=starts_at, ends_at=ends_at, status="confirmed"))
+            await db.commit()
+            return user.id, restaurant.id
+
+    async def drop(user_id, restaurant_id):
+        async with async_session_maker() as db:
+            await db.execute(delete(RestaurantPopularity).where(RestaurantPopularity.restaurant_id == restaurant_id))
+            await db.execute(delete(Bookings).where(Bookings.restaurant_id == restaurant_id))
+            await db.execute(delete(Restaurant).where(Restaurant.id == restaurant_id))
+            await db.execute(delete(Users).where(Users.id == user_id))
+            await db.commit()
+
+    user_id, restaurant_id = asyncio.run(create())
+    yield restaurant_id
+    asyncio.run(drop(user_id, restaurant_id))
+
+
+def test_get_stale_flags_exactly_the_days_a_window_moves(venue):
+    # Days a booking crosses an edge (upcoming -> past, out of 30 days, out of 365), and their neighbours
+    offsets = [1, 9, 10, 11, 39, 40, 41, 64, 65, 66, 324, 325, 326, 375]
+
+    async def stale_on(today, refreshed_on):
+        async with async_session_maker() as db:
+            await PopularityDAO.refresh(db, [venue], refreshed_on)
+            return venue in await PopularityDAO.get_stale(db, today)
+
+    for offset in offsets:
+        today = REFRESHED_ON + timedelta(days=offset)
+        yesterday = today - timedelta(days=1)
+        expected = counters(BOOKED, today) != counters(BOOKED, yesterday)
+        assert asyncio.run(stale_on(today, yesterday)) == expected, offset
+
+    # Several days at once: nothing moves until the upcoming booking is in the past
+    assert not asyncio.run(stale_on(REFRESHED_ON + timedelta(days=9), REFRESHED_ON))
+    assert asyncio.run(stale_on(REFRESHED_ON + timedelta(days=10), REFRESHED_ON))
@@ -0,0 +1,112 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.ratelimit import stores
+from app.ratelimit.middleware import RateLimitMiddleware, client_key, parse_rule
+from app.ratelimit.stores import MemoryStore
+from app.users.auth import create_access_token
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(stores.time, "monotonic", clock)
+    return clock
+
+
+def take(store, key="k", rate=1.0, burst=2.0, cost=1):
+    return asyncio.run(store.take(key, rate, burst, cost))
+
+
+def token(user_id: str, **kwargs) -> str:
+    return asyncio.run(create_access_token({"sub": user_id}, **kwargs))
+
+
+def scope(headers=(), client=("10.0.0.1", 5000), method="POST", path="/auth/login"):
+    return {"type": "http", "method": method, "path": path, "headers": list(headers), "client": client}
+
+
+def test_parse_rule():
+    rule = parse_rule("post /auth/login", "10/minute burst 20")
+    assert (rule.method, rule.rate, rule.burst) == ("POST", 10 / 60, 20.0)
+    assert rule.pattern.match("/auth/login")
+    assert parse_rule("GET /rest/restaurants/{restaurant_id}", "5/second").burst == 5.0
+    with pytest.raises(ValueError):
+        parse_rule("GET /x", "lots")
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    store = MemoryStore(max_keys=10)
+    assert take(store) == (True, 0.0)
+    assert take(store) == (True, 0.0)
+    allowed, retry_after = take(store)
+    assert not allowed and retry_after == pytest.approx(1.0)
+
+    clock.now += 0.5
+    allowed, retry_after = take(store)
+    assert not allowed and retry_after == pytest.approx(0.5)
+    clock.now += 0.5
+    assert take(store)[0]
+
+
+def test_bucket_never_exceeds_burst(clock):
+    store = MemoryStore(max_keys=10)
+    take(store)
+    clock.now += 3600
+    assert [take(store)[0] for _ in range(3)] == [True, True, False]
+
+
+def test_least_recently_used_buckets_are_dropped(clock):
+    store = MemoryStore(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        take(store, key, burst=1)
+    assert list(store._buckets) == ["a", "c"]
+    assert take(store, "b", burst=1)[0]  # Dropped, so full again
+
+
+def test_client_key_prefers_the_bearer_token():
+    headers = [(b"authorization", f"Bearer {token('7')}".encode()), (b"cookie", f"booking_access_token={token('8')}".encode())]
+    assert client_key(scope(headers)) == "user:7"
+
+
+def test_client_key_falls_back_to_cookie_then_ip():
+    assert client_key(scope([(b"cookie", f"booking_access_token={token('8')}".encode())])) == "user:8"
+    assert client_key(scope([(b"authorization", b"Bearer not-a-token")])) == "ip:10.0.0.1"
+    expired = token("9", expires_delta=timedelta(minutes=-1))
+    assert client_key(scope([(b"authorization", f"Bearer {expired}".encode())])) == "ip:10.0.0.1"
+    assert client_key(scope(client=None)) == "ip:unknown"
+
+
+def test_middleware_answers_429_with_retry_after(clock):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+
+    async def run(request):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(request, None, send)
+        return sent
+
+    middleware = RateLimitMiddleware(app, rules=[parse_rule("POST /auth/login", "1/minute")], store=MemoryStore(10))
+    headers = [(b"authorization", f"Bearer {token('7')}".encode())]
+    assert asyncio.run(run(scope(headers))) == []
+    response = asyncio.run(run(scope(headers)))
+    assert response[0]["status"] == 429 and (b"retry-after", b"60") in response[0]["headers"]
+    # Another user behind the same address has a bucket of their own
+    assert asyncio.run(run(scope([(b"authorization", f"Bearer {token('8')}".encode())]))) == []
+    assert len(calls) == 2
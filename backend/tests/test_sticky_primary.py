@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi import Request
+from sqlalchemy import delete
+
+from app import database
+from app.database import PinCache, PrimaryPin, StickyPrimaryMiddleware, reads_from_primary
+from app.monitoring.queries import track_queries
+from app.users.auth import create_access_token
+
+USER_ID = 990001
+
+
+def request(user_id=None, cookies=""):
+    headers = []
+    if user_id is not None:
+        token = asyncio.run(create_access_token({"sub": str(user_id)}))
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    if cookies:
+        headers.append((b"cookie", cookies.encode()))
+    return {"type": "http", "method": "POST", "path": "/bookings", "headers": headers, "client": ("10.0.0.1", 5000)}
+
+
+def write(scope, status=201):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(StickyPrimaryMiddleware(app)(scope, None, send))
+    return sent[0]
+
+
+@pytest.fixture(autouse=True)
+def fresh_pins(monkeypatch):
+    monkeypatch.setattr(database, "primary_pins", PinCache())
+
+
+def unpin():
+    async def run():
+        async with database.engine.begin() as conn:
+            await conn.execute(delete(PrimaryPin).where(PrimaryPin.user_id == USER_ID))
+
+    asyncio.run(run())
+
+
+def test_bearer_write_pins_reads_without_the_cookie(postgres, monkeypatch):
+    monkeypatch.setattr(database, "replica_engines", [object()])
+    unpin()
+    try:
+        assert not asyncio.run(reads_from_primary(Request(request(USER_ID))))
+        write(request(USER_ID))
+        # The client never sends the cookie back; the Bearer token alone finds the pin
+        assert asyncio.run(reads_from_primary(Request(request(USER_ID))))
+        assert not asyncio.run(reads_from_primary(Request(request(USER_ID + 1))))
+        assert not asyncio.run(reads_from_primary(Request(request())))
+    finally:
+        unpin()
+
+
+def test_failed_write_does_not_pin(postgres, monkeypatch):
+    monkeypatch.setattr(database, "replica_engines", [object()])
+    unpin()
+    start = write(request(USER_ID), status=409)
+    assert not any(name == b"set-cookie" for name, _ in start["headers"])
+    assert not asyncio.run(reads_from_primary(Request(request(USER_ID))))
+
+
+def test_cookie_still_pins_anonymous_clients():
+    assert not asyncio.run(reads_from_primary(Request(request(cookies=f"{database.STICKY_COOKIE}=1"))))
+    assert asyncio.run(reads_from_primary(Request(request(cookies=f"{database.STICKY_COOKIE}=99999999999"))))
+
+
+def test_pins_of_other_workers_are_seen_after_a_refresh(postgres, monkeypatch):
+    monkeypatch.setattr(database, "replica_engines", [object()])
+    monkeypatch.setattr(database.settings, "DB_PRIMARY_PINS_REFRESH_SECONDS", 60)
+    unpin()
+    try:
+        scope = request(USER_ID)
+
+        async def scenario():
+            reads = []
+            assert not await reads_from_primary(Request(scope))
+            with track_queries() as query_log:
+                for _ in range(3):
+                    reads.append(await reads_from_primary(Request(scope)))
+            await database.pin_to_primary(USER_ID, 5)
+            # As if the write went through another worker: this process hasn't heard of it
+            database.primary_pins.until.clear()
+            reads.append(await reads_from_primary(Request(scope)))
+            await database.primary_pins.refresh()
+            reads.append(await reads_from_primary(Request(scope)))
+            return reads, query_log.total
+
+        reads, queries = asyncio.run(scenario())
+        assert queries == 0  # Within the refresh interval reads don't touch the primary
+        assert reads == [False, False, False, False, True]
+    finally:
+        unpin()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app.recommendations.vectors import encode, top_k
+
+
+def unit_rows(n, dim=8, seed=0):
+    matrix = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def brute_force(matrix, row, k):
+    scores = matrix @ matrix[row]
+    scores[row] = -np.inf
+    return list(np.argsort(-scores, kind="stable")[:k])
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 100])
+def test_top_k_matches_brute_force_whatever_the_batch_size(batch_size):
+    matrix = unit_rows(50)
+    results = list(top_k(matrix, range(50), k=5, batch_size=batch_size))
+
+    assert [row for row, _, _ in results] == list(range(50))
+    for row, neighbours, scores in results:
+        assert list(neighbours) == brute_force(matrix, row, 5)
+        assert row not in neighbours
+        assert list(scores) == sorted(scores, reverse=True)
+        np.testing.assert_allclose(scores, matrix[neighbours] @ matrix[row], rtol=1e-5)
+
+
+def test_top_k_only_yields_the_rows_asked_for():
+    matrix = unit_rows(20)
+    assert [row for row, _, _ in top_k(matrix, [3, 11], k=4, batch_size=10)] == [3, 11]
+
+
+def test_top_k_caps_k_at_the_other_rows():
+    matrix = unit_rows(4)
+    for row, neighbours, _ in top_k(matrix, range(4), k=10, batch_size=2):
+        assert sorted(neighbours) == sorted(set(range(4)) - {row})
+    assert list(top_k(unit_rows(1), [0], k=5, batch_size=2)) == []
+
+
+def venue(category="cafe", cuisines="italian", features="wifi", price_range="20", capacity=40):
+    return {"category": category, "cuisines": cuisines, "features": features,
+            "price_range": price_range, "capacity": capacity}
+
+
+def test_encode_prefers_similar_price_and_size():
+    matrix = encode([venue(), venue(price_range="25 $", capacity=50), venue(price_range="600", capacity=1000)])
+
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1, rtol=1e-5)
+    assert matrix[0] @ matrix[1] > matrix[0] @ matrix[2]
+
+
+def test_encode_similarity_ignores_unrelated_venues():
+    alone = encode([venue(), venue(cuisines="italian,pizza")])
+    crowded = encode([venue(), venue(cuisines="italian,pizza"), venue("bar", "thai", "terrace,music", None, None)])
+    assert alone[0] @ alone[1] == pytest.approx(crowded[0] @ crowded[1])